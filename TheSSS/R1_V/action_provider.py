@@ -0,0 +1,200 @@
+import os
+import re
+import json
+import logging
+
+ACTIONS = ("BUY", "SELL", "HOLD")
+_ACTION_PATTERN = re.compile(r"\b(BUY|SELL|HOLD)\b")
+_THINK_PATTERN = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+
+logger = logging.getLogger('RLTrader')
+
+
+def rule_based_action(state):
+    # RSI threshold fallback used whenever a backend cannot answer
+    rsi = state.get('rsi')
+    if rsi is None:
+        return "HOLD"
+    if rsi < 30:
+        return "BUY"
+    elif rsi > 70:
+        return "SELL"
+    return "HOLD"
+
+
+class ActionProvider:
+    """Base class for backends that map a batch of market states to BUY/SELL/HOLD actions."""
+
+    # True when get_actions also takes an (n, STATE_FIELDS) observation array
+    accepts_arrays = False
+    # True when a state always gets the same action, so decisions may be cached
+    deterministic = True
+
+    def get_actions(self, states):
+        raise NotImplementedError
+
+    def get_action(self, state):
+        return self.get_actions([state])[0]
+
+    def ensure_ready(self):
+        return True
+
+    def train(self, prompt, log_path=None, experience=None):
+        # `experience` is the trader's ReplayBuffer; backends that learn from transitions read it
+        return True
+
+    def close(self):
+        pass
+
+
+class RuleActionProvider(ActionProvider):
+    """Deterministic RSI threshold policy with no external backend."""
+
+    def get_actions(self, states):
+        return [rule_based_action(state) for state in states]
+
+
+class MockActionProvider(ActionProvider):
+    """
+    In-process backend for tests. Replays `actions` cyclically when given,
+    otherwise answers with the RSI rule. Every batch and training prompt is recorded.
+    """
+
+    def __init__(self, actions=None):
+        self.actions = list(actions) if actions else None
+        # Replayed actions ignore the state
+        self.deterministic = self.actions is None
+        self.batches = []
+        self.training_prompts = []
+        self._cursor = 0
+
+    def get_actions(self, states):
+        states = list(states)
+        self.batches.append(states)
+        if self.actions is None:
+            return [rule_based_action(state) for state in states]
+        result = []
+        for _ in states:
+            result.append(self.actions[self._cursor % len(self.actions)])
+            self._cursor += 1
+        return result
+
+    def train(self, prompt, log_path=None, experience=None):
+        self.training_prompts.append(prompt)
+        return True
+
+
+class OllamaActionProvider(ActionProvider):
+    """
+    Long-lived client for an `ollama serve` instance. The HTTP session and the
+    loaded model (via keep_alive) persist across calls, and each call sends a
+    whole batch of states in a single prompt instead of spawning `ollama run`.
+    """
+
+    def __init__(self, model=None, host=None, keep_alive="30m", timeout=15,
+                 train_timeout=480, max_batch_size=64):
+        import requests
+
+        self.model = model or os.getenv("OLLAMA_MODEL", "deepseek-r1:1.5b")
+        self.host = (host or os.getenv("OLLAMA_HOST", "http://localhost:11434")).rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.train_timeout = train_timeout
+        self.max_batch_size = max_batch_size
+        self.session = requests.Session()
+        self._request_error = requests.RequestException
+
+    def _generate(self, prompt, timeout):
+        response = self.session.post(
+            f"{self.host}/api/generate",
+            json={
+                'model': self.model,
+                'prompt': prompt,
+                'stream': False,
+                'keep_alive': self.keep_alive,
+                'options': {'temperature': 0},
+            },
+            timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json().get('response', '')
+
+    def _batch_prompt(self, states):
+        lines = [
+            "ACTION_QUERY_BATCH:",
+            f"Answer with exactly {len(states)} lines, one of BUY, SELL or HOLD per state, in order.",
+        ]
+        for i, state in enumerate(states, 1):
+            lines.append(f"{i}: {json.dumps(state, default=float)}")
+        return "\n".join(lines)
+
+    def _parse_actions(self, text, states):
+        tokens = _ACTION_PATTERN.findall(_THINK_PATTERN.sub("", text).upper())
+        actions = tokens[:len(states)]
+        # Pad a short answer with the rule-based decision for the remaining states
+        actions.extend(rule_based_action(state) for state in states[len(actions):])
+        return actions
+
+    def get_actions(self, states):
+        states = list(states)
+        actions = []
+        for start in range(0, len(states), self.max_batch_size):
+            chunk = states[start:start + self.max_batch_size]
+            try:
+                text = self._generate(self._batch_prompt(chunk), self.timeout)
+                actions.extend(self._parse_actions(text, chunk))
+            except (self._request_error, ValueError) as e:
+                logger.warning("Ollama action query failed, using RSI fallback: %s", e)
+                actions.extend(rule_based_action(state) for state in chunk)
+        return actions
+
+    def ensure_ready(self):
+        # An empty generate request loads the model and pins it for keep_alive
+        try:
+            response = self.session.post(
+                f"{self.host}/api/generate",
+                json={'model': self.model, 'keep_alive': self.keep_alive},
+                timeout=120
+            )
+            response.raise_for_status()
+            return True
+        except self._request_error as e:
+            logger.error("Ollama model %s not available: %s", self.model, e)
+            return False
+
+    def train(self, prompt, log_path=None, experience=None):
+        try:
+            text = self._generate(prompt, self.train_timeout)
+        except (self._request_error, ValueError) as e:
+            logger.error("Training request failed: %s", e)
+            return False
+        if log_path:
+            with open(log_path, 'w', encoding='utf-8') as logfile:
+                logfile.write(text)
+        return True
+
+    def close(self):
+        self.session.close()
+
+
+PROVIDERS = {
+    'ollama': OllamaActionProvider,
+    'rule': RuleActionProvider,
+    'mock': MockActionProvider,
+}
+
+
+def _native_provider(**kwargs):
+    # Imported on demand: native_policy builds on this module
+    from TheSSS.R1_V.native_policy import NativeActionProvider
+    return NativeActionProvider(**kwargs)
+
+
+PROVIDERS['native'] = _native_provider
+
+
+def create_action_provider(name=None, **kwargs):
+    name = (name or os.getenv("ACTION_PROVIDER", "ollama")).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown action provider: {name}")
+    return PROVIDERS[name](**kwargs)
@@ -0,0 +1,90 @@
+import math
+import time
+from collections import OrderedDict
+
+DEFAULT_BUCKETS = {'rsi': 5.0, 'macd': 0.0001, 'price': 0.001}
+
+
+class DecisionCache:
+    """
+    Bounded LRU cache of actions keyed on a quantized market state. Each field
+    in `buckets` is floored to a multiple of its width (fields mapped to None
+    are ignored), so near-identical states share one answer. Entries older
+    than `ttl` seconds are treated as misses. clear() drops every entry, e.g.
+    when the policy that produced them is replaced.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, buckets=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.buckets = {k: v for k, v in (buckets or DEFAULT_BUCKETS).items() if v}
+        self.clock = clock
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, state):
+        key = []
+        for field in sorted(self.buckets):
+            value = state.get(field)
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                key.append(None)
+            else:
+                key.append(math.floor(value / self.buckets[field]))
+        return tuple(key)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        action, stored_at = entry
+        if self.ttl is not None and self.clock() - stored_at > self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return action
+
+    def put(self, key, action):
+        self._entries[key] = (action, self.clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, state, compute):
+        key = self.key(state)
+        action = self.get(key)
+        if action is None:
+            action = compute(state)
+            self.put(key, action)
+        return action
+
+    def clear(self):
+        self._entries.clear()
+        self.invalidations += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,208 @@
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from TheSSS.market_data import load_ohlcv
+from TheSSS.R1_V.features import add_indicator_columns, FEATURE_COLUMNS
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.native_policy import POLICY_ACTIONS, PPOConfig, SoftmaxPolicy, sample_actions
+from TheSSS.R1_V.replay_buffer import ReplayBuffer
+from TheSSS.R1_V.rewards import RewardConfig
+from TheSSS.R1_V.vector_env import VectorEnv, env_tables
+
+# Set once per worker process by the pool initializer; rounds reuse the attached data, env and buffer
+_worker_shm = None
+_worker_env = None
+_worker_buffer = None
+_worker_probs = None
+
+
+class SharedMarket:
+    """
+    A MarketArrays values matrix, followed by the market's VectorEnv
+    env_tables, placed in one multiprocessing.shared_memory block. `spec` is
+    a small picklable description that workers pass to attach() to get a
+    zero-copy MarketArrays, and to attach_tables() to get zero-copy tables
+    for VectorEnv, over the same memory.
+    """
+
+    def __init__(self, market):
+        values = market.values
+        tables = env_tables(market)
+        # Every array is 8-byte items, so packing them back to back keeps each one aligned
+        layout, offset = [], values.nbytes
+        for name, array in tables.items():
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        shared = np.ndarray(values.shape, dtype=np.float64, buffer=self.shm.buf)
+        shared[:] = values
+        for name, dtype, shape, start in layout:
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=start)[...] = tables[name]
+        self.spec = {'name': self.shm.name, 'names': market.names, 'shape': values.shape, 'spread': market.spread,
+                     'tables': layout}
+
+    @staticmethod
+    def attach(spec):
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        values = np.ndarray(spec['shape'], dtype=np.float64, buffer=shm.buf)
+        market = MarketArrays(np.arange(spec['shape'][1]), spec['names'], values, spread=spec['spread'])
+        return shm, market
+
+    @staticmethod
+    def attach_tables(shm, spec):
+        # Views of the env tables in an attached block, for VectorEnv(..., tables=...)
+        return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                for name, dtype, shape, offset in spec['tables']}
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _init_worker(spec, num_envs, episode_length, reward_config, buffer_capacity, seed, counter):
+    global _worker_shm, _worker_env, _worker_buffer, _worker_probs
+    _worker_shm, _ = SharedMarket.attach(spec)
+    # Workers number themselves 0..n-1 as they start; worker i always gets child i of the seed,
+    # so workers explore different start offsets and the same seed gives the same set of streams
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    env_seed, buffer_seed = np.random.SeedSequence(seed, spawn_key=(index,)).spawn(2)
+    _worker_env = VectorEnv(None, num_envs, episode_length=episode_length, config=reward_config, seed=env_seed,
+                            tables=SharedMarket.attach_tables(_worker_shm, spec))
+    _worker_buffer = ReplayBuffer(buffer_capacity, seed=buffer_seed)
+    # Behaviour-policy probabilities of each buffer slot, for the PPO ratio of older transitions
+    _worker_probs = np.full((_worker_buffer.capacity, len(POLICY_ACTIONS)), 1.0 / len(POLICY_ACTIONS))
+
+
+def _rollout_gradients(policy, config, steps, seed):
+    # Runs in a worker: roll the current policy through the lockstep env, then compute one PPO gradient
+    rng = np.random.default_rng(seed)
+    env, buffer = _worker_env, _worker_buffer
+    obs = env.obs
+    seen = []
+    rewards_total = 0.0
+    finished_before = len(env.finished)
+    for _ in range(steps):
+        probs = policy.probabilities(obs)
+        actions = sample_actions(probs, greedy=False, rng=rng) - 1
+        next_obs, rewards, _ = env.step(actions)
+        _worker_probs[(buffer.cursor + np.arange(len(obs))) % buffer.capacity] = probs
+        buffer.add_batch(obs, actions, rewards, next_obs)
+        seen.append(obs)
+        rewards_total += float(rewards.sum())
+        obs = env.obs
+
+    batch = buffer.sample(config.batch_size, recent=config.experience_window)
+    # The window also holds transitions from earlier rounds' policies, so the ratio is taken
+    # against the probabilities each transition was actually sampled with
+    grads, stats = policy.compute_gradients(batch, config, old_probs=_worker_probs[batch['indices']])
+    seen = np.concatenate(seen)
+    episodes = env.finished[finished_before:]
+    return {
+        'grads': grads,
+        'stats': stats,
+        'moments': (len(seen), seen.mean(axis=0), seen.var(axis=0)),
+        'transitions': len(seen),
+        'reward': rewards_total,
+        'episodes': len(episodes),
+        'episode_return': float(np.mean([ret for _, ret, _ in episodes])) if episodes else float('nan'),
+    }
+
+
+def average_gradients(results):
+    # Every worker draws the same minibatch size, so the plain mean is the per-sample average
+    names = results[0]['grads'].keys()
+    return {name: np.mean([r['grads'][name] for r in results], axis=0) for name in names}
+
+
+def train_distributed(market, num_workers=None, rounds=100, num_envs=8, steps_per_round=32, episode_length=None,
+                      policy=None, config=None, reward_config=None, buffer_capacity=50000, seed=None):
+    """
+    Synchronous data-parallel PPO. The market arrays and their env tables are
+    copied into shared memory once and every worker's VectorEnv steps over
+    them zero-copy. Each round the
+    coordinator sends the current policy to `num_workers` workers, each rolls
+    out `num_envs` x `steps_per_round` transitions and returns a gradient;
+    the coordinator averages the gradients, merges the workers' observation
+    statistics into the normalizer and applies one update. Returns
+    (policy, per-round history table).
+    """
+    config = config or PPOConfig.from_env()
+    reward_config = reward_config or RewardConfig.from_env()
+    policy = policy.copy() if policy is not None else SoftmaxPolicy(hidden_size=config.hidden_size, seed=seed)
+    num_workers = num_workers or os.cpu_count() or 1
+    history = []
+
+    with SharedMarket(market) as shared:
+        initargs = (shared.spec, num_envs, episode_length, reward_config, buffer_capacity, seed,
+                    multiprocessing.Value('i', 0))
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=initargs) as pool:
+            for round_id in range(rounds):
+                started = time.perf_counter()
+                base = None if seed is None else seed * 1000003 + round_id * num_workers
+                futures = [pool.submit(_rollout_gradients, policy, config, steps_per_round,
+                                       None if base is None else base + w)
+                           for w in range(num_workers)]
+                results = [future.result() for future in futures]
+
+                policy.apply_gradients(average_gradients(results), config.learning_rate, config.max_grad_norm)
+                for r in results:
+                    policy.normalizer.update_from_moments(*r['moments'])
+
+                transitions = sum(r['transitions'] for r in results)
+                history.append({
+                    'round': round_id,
+                    'transitions': transitions,
+                    'reward_per_step': sum(r['reward'] for r in results) / transitions,
+                    'episodes': sum(r['episodes'] for r in results),
+                    'loss': float(np.mean([r['stats']['loss'] for r in results])),
+                    'entropy': float(np.mean([r['stats']['entropy'] for r in results])),
+                    'seconds': time.perf_counter() - started,
+                })
+    return policy, pd.DataFrame(history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed native-policy PPO training over shared-memory history")
+    parser.add_argument('--data', default=os.getenv("HISTORICAL_DATA_PATH"))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--envs', type=int, default=8, help="lockstep episodes per worker")
+    parser.add_argument('--steps', type=int, default=32, help="steps per worker per round")
+    parser.add_argument('--episode-length', type=int, default=None)
+    parser.add_argument('--output', default=os.getenv("NATIVE_POLICY_PATH") or None)
+    args = parser.parse_args()
+
+    # Loaded, validated and featurized once in the coordinator; workers never touch the CSV
+    data = load_ohlcv(args.data, index_col='timestamp')
+    reward_config = RewardConfig.from_env()
+    if not all(col in data.columns for col in FEATURE_COLUMNS):
+        data = add_indicator_columns(data, volatility_window=reward_config.volatility_window)
+    market = MarketArrays.from_frame(data)
+
+    policy, history = train_distributed(market, num_workers=args.workers, rounds=args.rounds, num_envs=args.envs,
+                                        steps_per_round=args.steps, episode_length=args.episode_length,
+                                        reward_config=reward_config)
+    print(history.to_string(index=False))
+    transitions = history['transitions'].sum()
+    print(f"\n{transitions} transitions in {history['seconds'].sum():.2f}s "
+          f"({transitions / history['seconds'].sum():.0f}/s)")
+    if args.output:
+        policy.save(args.output)
+        print(f"Policy written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+VOLATILITY_WINDOW = 14
+
+FEATURE_COLUMNS = ('rsi', 'macd', 'macd_signal', 'macd_hist', 'volatility')
+
+
+def rolling_rsi(close, period=RSI_PERIOD):
+    """Per-bar RSI from the rolling mean of gains and losses over `period` bars."""
+    close = pd.Series(close, dtype='float64')
+    deltas = close.diff()
+    gains = deltas.clip(lower=0.0)
+    losses = -deltas.clip(upper=0.0)
+
+    avg_gain = gains.rolling(period, min_periods=period).mean()
+    avg_loss = losses.rolling(period, min_periods=period).mean()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain.to_numpy() / avg_loss.to_numpy()
+        rsi = 100.0 - (100.0 / (1.0 + rs))
+    # A window without losses is fully overbought; flat or warm-up windows are neutral.
+    rsi = np.where(avg_loss.to_numpy() == 0.0, np.where(avg_gain.to_numpy() > 0.0, 100.0, 50.0), rsi)
+    return pd.Series(np.nan_to_num(rsi, nan=50.0), index=close.index, name='rsi')
+
+
+def rolling_macd(close, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    """Per-bar MACD line, signal line and histogram using the same EMAs as RLTrader.calculate_macd."""
+    close = pd.Series(close, dtype='float64')
+    exp_fast = close.ewm(span=fast, adjust=False, min_periods=fast).mean()
+    exp_slow = close.ewm(span=slow, adjust=False, min_periods=slow).mean()
+
+    macd = exp_fast - exp_slow
+    macd_signal = macd.ewm(span=signal, adjust=False, min_periods=signal).mean()
+    macd_hist = macd - macd_signal
+    return (
+        macd.fillna(0.0).rename('macd'),
+        macd_signal.fillna(0.0).rename('macd_signal'),
+        macd_hist.fillna(0.0).rename('macd_hist'),
+    )
+
+
+def rolling_volatility(close, window=VOLATILITY_WINDOW):
+    """Per-bar standard deviation of simple returns over `window` bars."""
+    close = pd.Series(close, dtype='float64')
+    returns = close.pct_change()
+    volatility = returns.rolling(window, min_periods=2).std()
+    return volatility.fillna(0.0).rename('volatility')
+
+
+def add_indicator_columns(df, rsi_period=RSI_PERIOD, volatility_window=VOLATILITY_WINDOW):
+    """
+    Return a copy of `df` with the per-bar indicator columns in FEATURE_COLUMNS.
+    Every column is computed in a single vectorized pass over `close`, so the
+    training loop can read indicators per row instead of recomputing them.
+    """
+    if 'close' not in df.columns:
+        raise ValueError("Missing required column: 'close'")
+
+    out = df.copy()
+    close = out['close']
+    out['rsi'] = rolling_rsi(close, period=rsi_period)
+    out['macd'], out['macd_signal'], out['macd_hist'] = rolling_macd(close)
+    out['volatility'] = rolling_volatility(close, window=volatility_window)
+    return out
+
+
+def iter_indicator_chunks(chunks, warmup=1000, rsi_period=RSI_PERIOD, volatility_window=VOLATILITY_WINDOW):
+    """
+    Add indicator columns to a stream of time-ordered chunks. The last `warmup`
+    raw rows are carried into the next chunk so rolling windows span the
+    boundary; the EMA seed contribution decays below float precision well
+    within the default warmup.
+    """
+    tail = None
+    for chunk in chunks:
+        frame = chunk if tail is None else pd.concat([tail, chunk])
+        out = add_indicator_columns(frame, rsi_period=rsi_period, volatility_window=volatility_window)
+        yield out.iloc[len(frame) - len(chunk):]
+        tail = frame.iloc[-warmup:]
@@ -0,0 +1,89 @@
+import numpy as np
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+DEFAULT_SPREAD = 0.0002
+
+
+class MarketArrays:
+    """
+    Column-major float64 view of a history frame. Each column is a contiguous
+    row of `values`, so the training loop indexes plain arrays instead of
+    materializing a pandas Series per bar.
+    """
+
+    def __init__(self, index, names, values, spread=DEFAULT_SPREAD):
+        self.index = index
+        self.names = tuple(names)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.spread = spread
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_frame(cls, df, columns=None, spread=DEFAULT_SPREAD):
+        if columns is None:
+            columns = [c for c in df.columns if np.issubdtype(df[c].dtype, np.number)]
+        values = df[list(columns)].to_numpy(dtype=np.float64).T
+        return cls(df.index.to_numpy(), columns, values, spread=spread)
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def column(self, name):
+        return self.values[self._positions[name]]
+
+    def slice(self, start, stop):
+        return MarketArrays(self.index[start:stop], self.names, self.values[:, start:stop], spread=self.spread)
+
+    def _state_columns(self):
+        close = self.column('close')
+        volume = self.column('volume') if 'volume' in self else np.zeros_like(close)
+        rsi = self.column('rsi') if 'rsi' in self else np.full_like(close, 50.0)
+        macd = self.column('macd') if 'macd' in self else np.zeros_like(close)
+        volatility = self.column('volatility') if 'volatility' in self else np.zeros_like(close)
+        return close, volume, rsi, macd, volatility
+
+    def state(self, i):
+        close, volume, rsi, macd, volatility = self._state_columns()
+        return {
+            'price': float(close[i]),
+            'spread': self.spread,
+            'volume': float(volume[i]),
+            'rsi': float(rsi[i]),
+            'macd': float(macd[i]),
+            'volatility': float(volatility[i])
+        }
+
+    def iter_states(self, block_size=4096):
+        # Convert one block at a time to Python floats so memory stays bounded
+        columns = self._state_columns()
+        spread = self.spread
+        for start in range(0, len(self), block_size):
+            block = [col[start:start + block_size].tolist() for col in columns]
+            for price, volume, rsi, macd, volatility in zip(*block):
+                yield {'price': price, 'spread': spread, 'volume': volume, 'rsi': rsi, 'macd': macd,
+                       'volatility': volatility}
+
+    def iter_transitions(self, block_size=4096):
+        # Yield (state, next_state) pairs; the final bar transitions onto itself
+        previous = None
+        for state in self.iter_states(block_size):
+            if previous is not None:
+                yield previous, state
+            previous = state
+        if previous is not None:
+            yield previous, previous
+
+
+def iter_frame_transitions(frames, spread=DEFAULT_SPREAD, block_size=4096):
+    # Stitch (state, next_state) pairs across a stream of frames without holding more than one
+    previous = None
+    for frame in frames:
+        for state in MarketArrays.from_frame(frame, spread=spread).iter_states(block_size):
+            if previous is not None:
+                yield previous, state
+            previous = state
+    if previous is not None:
+        yield previous, previous
@@ -0,0 +1,279 @@
+import os
+from dataclasses import dataclass
+import numpy as np
+from TheSSS.R1_V.action_provider import ActionProvider, logger
+from TheSSS.R1_V.replay_buffer import STATE_FIELDS
+
+# Index i of the policy output is action code i - 1 (see rewards.ACTION_CODES)
+POLICY_ACTIONS = ('SELL', 'HOLD', 'BUY')
+
+
+@dataclass(frozen=True)
+class PPOConfig:
+    clip_range: float = 0.1
+    entropy_coeff: float = 0.02
+    batch_size: int = 16
+    gamma: float = 0.90
+    experience_window: int = 500
+    learning_rate: float = 0.01
+    update_epochs: int = 4
+    value_coeff: float = 0.5
+    max_grad_norm: float = 0.5
+    hidden_size: int = 16
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            clip_range=float(os.getenv("PPO_CLIP_RANGE", "0.1")),
+            entropy_coeff=float(os.getenv("PPO_ENTROPY_COEFF", "0.02")),
+            batch_size=int(os.getenv("PPO_BATCH_SIZE", "16")),
+            gamma=float(os.getenv("PPO_GAMMA", "0.90")),
+            experience_window=int(os.getenv("PPO_EXPERIENCE_WINDOW", "500")),
+            learning_rate=float(os.getenv("PPO_LEARNING_RATE", "0.01")),
+            update_epochs=int(os.getenv("PPO_UPDATE_EPOCHS", "4")),
+            hidden_size=int(os.getenv("NATIVE_POLICY_HIDDEN", "16")),
+        )
+
+
+def state_matrix(states, fields=STATE_FIELDS):
+    # Stack state records (or pass through an existing array) into a (n, fields) float matrix
+    # Missing indicator values (NaN/None during warm-up) are zeroed so they cannot poison the weights
+    if isinstance(states, np.ndarray):
+        return np.nan_to_num(states.astype(np.float64, copy=False))
+    rows = [[state.get(field, 0.0) for field in fields] for state in states]
+    return np.nan_to_num(np.array(rows, dtype=np.float64).reshape(-1, len(fields)))
+
+
+def sample_actions(probs, greedy=True, rng=None):
+    # Action indices for rows of action probabilities: the most likely one, or one drawn per row
+    if greedy:
+        return probs.argmax(axis=1)
+    # Inverse-CDF sampling of one action per row
+    draws = (rng or np.random.default_rng()).random((len(probs), 1))
+    return np.minimum((probs.cumsum(axis=1) < draws).sum(axis=1), len(POLICY_ACTIONS) - 1)
+
+
+class RunningNormalizer:
+    """Per-feature running mean/variance (Chan et al. batch merge) used to standardize policy inputs."""
+
+    def __init__(self, dim):
+        self.count = 0.0
+        self.mean = np.zeros(dim)
+        self.var = np.ones(dim)
+
+    def update(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if len(x):
+            self.update_from_moments(len(x), x.mean(axis=0), x.var(axis=0))
+
+    def update_from_moments(self, batch_count, batch_mean, batch_var):
+        # Merge the count/mean/variance of a batch seen elsewhere (e.g. in a training worker)
+        total = self.count + batch_count
+        delta = batch_mean - self.mean
+        m2 = self.var * self.count + batch_var * batch_count + delta ** 2 * self.count * batch_count / total
+        self.mean = self.mean + delta * batch_count / total
+        self.var = m2 / total
+        self.count = total
+
+    def __call__(self, x):
+        return np.clip((x - self.mean) / np.sqrt(self.var + 1e-8), -5.0, 5.0)
+
+    def copy(self):
+        clone = RunningNormalizer(len(self.mean))
+        clone.count, clone.mean, clone.var = self.count, self.mean.copy(), self.var.copy()
+        return clone
+
+
+class SoftmaxPolicy:
+    """
+    Small CPU actor-critic: a tanh MLP (or a linear map when hidden_size=0)
+    producing SELL/HOLD/BUY logits, plus a linear state-value head. Every
+    method works on whole (n, state_dim) batches. Training is split into
+    compute_gradients/apply_gradients so gradients can be averaged across
+    workers before they are applied.
+    """
+
+    def __init__(self, state_dim=len(STATE_FIELDS), hidden_size=16, seed=None):
+        rng = np.random.default_rng(seed)
+        self.state_dim = state_dim
+        self.hidden_size = hidden_size
+        n_actions = len(POLICY_ACTIONS)
+        self.params = {}
+        if hidden_size:
+            self.params['W1'] = rng.normal(0.0, 1.0 / np.sqrt(state_dim), (state_dim, hidden_size))
+            self.params['b1'] = np.zeros(hidden_size)
+        self.params['W2'] = rng.normal(0.0, 0.01, (hidden_size or state_dim, n_actions))
+        self.params['b2'] = np.zeros(n_actions)
+        self.params['v'] = np.zeros(state_dim)
+        self.params['c'] = np.zeros(1)
+        self.normalizer = RunningNormalizer(state_dim)
+
+    def copy(self):
+        clone = SoftmaxPolicy.__new__(SoftmaxPolicy)
+        clone.state_dim = self.state_dim
+        clone.hidden_size = self.hidden_size
+        clone.params = {name: value.copy() for name, value in self.params.items()}
+        clone.normalizer = self.normalizer.copy()
+        return clone
+
+    def _forward(self, x):
+        hidden = np.tanh(x @ self.params['W1'] + self.params['b1']) if self.hidden_size else x
+        logits = hidden @ self.params['W2'] + self.params['b2']
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs, hidden
+
+    def probabilities(self, states):
+        return self._forward(self.normalizer(state_matrix(states)))[0]
+
+    def values(self, states):
+        return self.normalizer(state_matrix(states)) @ self.params['v'] + self.params['c'][0]
+
+    def act(self, states, greedy=True, rng=None):
+        return sample_actions(self.probabilities(states), greedy=greedy, rng=rng)
+
+    def compute_gradients(self, batch, config, old_probs=None):
+        """
+        PPO clipped-surrogate gradients for one replay minibatch (dict with
+        states, actions as -1/0/1 codes, rewards, next_states and optional
+        weights). Advantages are one-step TD errors r + gamma*V(s') - V(s).
+        `old_probs` are the behaviour policy's probabilities; without them
+        the ratio starts at 1. Returns (grads, stats).
+        """
+        x = self.normalizer(state_matrix(batch['states']))
+        x_next = self.normalizer(state_matrix(batch['next_states']))
+        actions = np.asarray(batch['actions']).astype(np.int64) + 1
+        rewards = np.asarray(batch['rewards'], dtype=np.float64)
+        weights = np.asarray(batch.get('weights', np.ones(len(x))), dtype=np.float64)
+        weights = weights / weights.sum()
+        rows = np.arange(len(x))
+
+        probs, hidden = self._forward(x)
+        if old_probs is None:
+            old_probs = probs
+        ratio = probs[rows, actions] / np.maximum(old_probs[rows, actions], 1e-12)
+
+        value = x @ self.params['v'] + self.params['c'][0]
+        target = rewards + config.gamma * (x_next @ self.params['v'] + self.params['c'][0])
+        advantages = target - value
+        if len(advantages) > 1:
+            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+
+        clipped = np.clip(ratio, 1 - config.clip_range, 1 + config.clip_range)
+        surrogate = np.minimum(ratio * advantages, clipped * advantages)
+        # The clipped branch is flat, so only unclipped samples carry policy gradient
+        active = ~(((advantages > 0) & (ratio > 1 + config.clip_range)) |
+                   ((advantages < 0) & (ratio < 1 - config.clip_range)))
+        log_probs = np.log(np.maximum(probs, 1e-12))
+        entropy = -(probs * log_probs).sum(axis=1)
+
+        onehot = np.zeros_like(probs)
+        onehot[rows, actions] = 1.0
+        d_logits = -(weights * advantages * ratio * active)[:, None] * (onehot - probs)
+        d_logits += config.entropy_coeff * weights[:, None] * probs * (log_probs + entropy[:, None])
+
+        grads = {'W2': hidden.T @ d_logits, 'b2': d_logits.sum(axis=0)}
+        if self.hidden_size:
+            d_pre = (d_logits @ self.params['W2'].T) * (1.0 - hidden ** 2)
+            grads['W1'] = x.T @ d_pre
+            grads['b1'] = d_pre.sum(axis=0)
+        value_error = config.value_coeff * weights * (value - target)
+        grads['v'] = x.T @ value_error
+        grads['c'] = np.array([value_error.sum()])
+
+        stats = {
+            'policy_loss': float(-(weights * surrogate).sum()),
+            'value_loss': float(0.5 * config.value_coeff * (weights * (value - target) ** 2).sum()),
+            'entropy': float((weights * entropy).sum()),
+            'clip_fraction': float((~active).mean()),
+        }
+        stats['loss'] = stats['policy_loss'] + stats['value_loss'] - config.entropy_coeff * stats['entropy']
+        return grads, stats
+
+    def apply_gradients(self, grads, learning_rate, max_grad_norm=None):
+        # Plain SGD with global-norm clipping
+        scale = 1.0
+        if max_grad_norm:
+            norm = np.sqrt(sum(float((g ** 2).sum()) for g in grads.values()))
+            if norm > max_grad_norm:
+                scale = max_grad_norm / norm
+        for name, grad in grads.items():
+            self.params[name] -= learning_rate * scale * grad
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.savez(f, hidden_size=self.hidden_size, norm_count=self.normalizer.count,
+                     norm_mean=self.normalizer.mean, norm_var=self.normalizer.var, **self.params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            policy = cls(state_dim=len(archive['v']), hidden_size=int(archive['hidden_size']))
+            for name in policy.params:
+                policy.params[name] = archive[name].copy()
+            policy.normalizer.count = float(archive['norm_count'])
+            policy.normalizer.mean = archive['norm_mean'].copy()
+            policy.normalizer.var = archive['norm_var'].copy()
+        return policy
+
+
+class NativeActionProvider(ActionProvider):
+    """
+    In-process NumPy policy backend. Decisions are one batched forward pass;
+    train() runs PPO updates on a copy of the policy from the trader's replay
+    buffer and returns a new provider, which RLTrader swaps in when it is done.
+    """
+
+    accepts_arrays = True
+
+    def __init__(self, policy=None, config=None, greedy=None, path=None, seed=None):
+        self.config = config or PPOConfig.from_env()
+        self.path = path if path is not None else (os.getenv("NATIVE_POLICY_PATH") or None)
+        if policy is None and self.path and os.path.exists(self.path):
+            policy = SoftmaxPolicy.load(self.path)
+        self.policy = policy or SoftmaxPolicy(hidden_size=self.config.hidden_size, seed=seed)
+        if greedy is None:
+            greedy = os.getenv("NATIVE_POLICY_GREEDY", "0").lower() in ("1", "true", "yes")
+        self.greedy = greedy
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def deterministic(self):
+        # Sampled actions differ between calls for the same state
+        return self.greedy
+
+    def get_actions(self, states):
+        states = states if isinstance(states, np.ndarray) else list(states)
+        indices = self.policy.act(state_matrix(states), greedy=self.greedy, rng=self.rng)
+        return [POLICY_ACTIONS[i] for i in indices]
+
+    def update(self, experience):
+        """Run config.update_epochs PPO minibatch updates; returns the updated copy and the last stats."""
+        config = self.config
+        policy = self.policy.copy()
+        window = min(config.experience_window, len(experience))
+        policy.normalizer.update(experience.states[experience.recent_slots(window)])
+        stats = {}
+        for _ in range(config.update_epochs):
+            batch = experience.sample(config.batch_size, recent=window)
+            old_probs = self.policy.probabilities(batch['states'])
+            grads, stats = policy.compute_gradients(batch, config, old_probs=old_probs)
+            policy.apply_gradients(grads, config.learning_rate, config.max_grad_norm)
+        return policy, stats
+
+    def train(self, prompt=None, log_path=None, experience=None):
+        if experience is None or len(experience) < self.config.batch_size:
+            return True
+        policy, stats = self.update(experience)
+        if log_path:
+            with open(log_path, 'w', encoding='utf-8') as logfile:
+                logfile.write("\n".join(f"{key}={value:.6f}" for key, value in stats.items()) + "\n")
+        logger.debug("Native PPO update: %s", stats)
+        successor = NativeActionProvider(policy=policy, config=self.config, greedy=self.greedy, path=self.path)
+        successor.rng = self.rng
+        return successor
+
+    def close(self):
+        if self.path:
+            self.policy.save(self.path)
@@ -0,0 +1,178 @@
+import os
+import json
+import numpy as np
+from TheSSS.R1_V.rewards import encode_actions
+
+STATE_FIELDS = ('price', 'spread', 'volume', 'rsi', 'macd', 'volatility')
+_ARRAYS = ('states', 'actions', 'rewards', 'next_states', 'priorities')
+_META_FILE = 'meta.json'
+
+
+def state_vector(state, fields=STATE_FIELDS):
+    # Flatten a MarketArrays state record into a fixed-order float vector
+    return np.array([state.get(field, 0.0) for field in fields], dtype=np.float64)
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring of (state, action, reward, next_state) transitions held
+    in preallocated NumPy arrays. Inserts overwrite the oldest slot in O(1);
+    sampling draws whole minibatches with one fancy-index per array, either
+    uniformly or in proportion to priority**alpha. A buffer is not
+    thread-safe: only the thread that inserts into it may read it, and other
+    threads (e.g. a background retrain) work on a snapshot().
+    """
+
+    def __init__(self, capacity, state_dim=len(STATE_FIELDS), alpha=0.6, seed=None):
+        self.capacity = int(capacity)
+        self.state_dim = state_dim
+        self.alpha = alpha
+        self.rng = np.random.default_rng(seed)
+        self.states = np.zeros((self.capacity, state_dim), dtype=np.float64)
+        self.actions = np.zeros(self.capacity, dtype=np.int8)
+        self.rewards = np.zeros(self.capacity, dtype=np.float64)
+        self.next_states = np.zeros((self.capacity, state_dim), dtype=np.float64)
+        self.priorities = np.zeros(self.capacity, dtype=np.float64)
+        self.cursor = 0
+        self.size = 0
+        self.path = None
+        # Running max of every priority stored so far, so inserts never scan the priorities
+        self._max_priority = 1.0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, priority=None):
+        i = self.cursor
+        self.states[i] = state_vector(state) if isinstance(state, dict) else state
+        self.actions[i] = encode_actions([action])[0]
+        self.rewards[i] = reward
+        self.next_states[i] = state_vector(next_state) if isinstance(next_state, dict) else next_state
+        # New experience gets the current max priority so it is sampled at least once
+        priority = self._max_priority if priority is None else float(priority)
+        self.priorities[i] = priority
+        self._max_priority = max(self._max_priority, priority)
+        self.cursor = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, priorities=None):
+        states = np.asarray(states, dtype=np.float64)
+        n = len(states)
+        if n > self.capacity:
+            # Only the newest `capacity` transitions would survive anyway
+            cut = n - self.capacity
+            states, actions, rewards, next_states = states[cut:], actions[cut:], rewards[cut:], next_states[cut:]
+            priorities = None if priorities is None else priorities[cut:]
+            n = self.capacity
+        if priorities is None:
+            priorities = np.full(n, self._max_priority)
+        elif n:
+            self._max_priority = max(self._max_priority, float(np.max(priorities)))
+        slots = (self.cursor + np.arange(n)) % self.capacity
+        self.states[slots] = states
+        self.actions[slots] = encode_actions(actions)
+        self.rewards[slots] = rewards
+        self.next_states[slots] = next_states
+        self.priorities[slots] = priorities
+        self.cursor = int((self.cursor + n) % self.capacity)
+        self.size = min(self.size + n, self.capacity)
+
+    def recent_slots(self, n=None):
+        # Slots of the newest `n` transitions, newest first (every stored slot when n is None)
+        n = self.size if n is None else min(n, self.size)
+        return (self.cursor - 1 - np.arange(n)) % self.capacity
+
+    def snapshot(self, n=None):
+        """
+        Copy the newest `n` transitions (every stored one when n is None) into
+        a new in-memory buffer, oldest first, so recent_slots and sample see
+        the same window. The copy draws from its own child of this buffer's rng.
+        """
+        slots = self.recent_slots(n)[::-1]
+        copy = ReplayBuffer(max(len(slots), 1), self.state_dim, self.alpha, seed=self.rng.spawn(1)[0])
+        for name in _ARRAYS:
+            getattr(copy, name)[:len(slots)] = getattr(self, name)[slots]
+        copy.size = len(slots)
+        copy.cursor = len(slots) % copy.capacity
+        copy._max_priority = self._max_priority
+        return copy
+
+    def sample(self, batch_size, prioritized=False, beta=0.4, recent=None):
+        """
+        Draw `batch_size` transitions with replacement, optionally only from the
+        newest `recent` ones. Returns a dict of arrays plus the slot `indices`
+        (for update_priorities) and importance `weights` (all ones for uniform sampling).
+        """
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        slots = self.recent_slots(recent) if recent is not None and recent < self.size else None
+        n = self.size if slots is None else len(slots)
+        if prioritized:
+            scaled = (self.priorities[:n] if slots is None else self.priorities[slots]) ** self.alpha
+            total = scaled.sum()
+            probs = scaled / total if total > 0 else np.full(n, 1.0 / n)
+            picks = self.rng.choice(n, size=batch_size, p=probs)
+            weights = (n * probs[picks]) ** -beta
+            weights /= weights.max()
+        else:
+            picks = self.rng.integers(0, n, size=batch_size)
+            weights = np.ones(batch_size)
+        indices = picks if slots is None else slots[picks]
+        return {
+            'states': self.states[indices],
+            'actions': self.actions[indices],
+            'rewards': self.rewards[indices],
+            'next_states': self.next_states[indices],
+            'indices': indices,
+            'weights': weights,
+        }
+
+    def update_priorities(self, indices, priorities):
+        priorities = np.maximum(np.abs(priorities), 1e-6)
+        self.priorities[indices] = priorities
+        if priorities.size:
+            self._max_priority = max(self._max_priority, float(priorities.max()))
+
+    def save(self, path):
+        """Write each array as .npy plus meta.json (written last, so a partial save is never loaded)."""
+        os.makedirs(path, exist_ok=True)
+        meta_file = os.path.join(path, _META_FILE)
+        if os.path.exists(meta_file):
+            os.remove(meta_file)
+        for name in _ARRAYS:
+            array = getattr(self, name)
+            if isinstance(array, np.memmap) and self.path == os.path.abspath(path):
+                array.flush()
+            else:
+                np.save(os.path.join(path, f"{name}.npy"), array)
+        meta = {'capacity': self.capacity, 'state_dim': self.state_dim, 'alpha': self.alpha,
+                'cursor': int(self.cursor), 'size': int(self.size), 'max_priority': self._max_priority}
+        tmp_file = meta_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, meta_file)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r+', seed=None):
+        """
+        Reopen a saved buffer. With the default mmap_mode the arrays stay on
+        disk and new inserts write through to the files; pass None to copy into memory.
+        """
+        with open(os.path.join(path, _META_FILE), 'r') as f:
+            meta = json.load(f)
+        buffer = cls.__new__(cls)
+        buffer.capacity = meta['capacity']
+        buffer.state_dim = meta['state_dim']
+        buffer.alpha = meta['alpha']
+        buffer.rng = np.random.default_rng(seed)
+        for name in _ARRAYS:
+            setattr(buffer, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+        buffer.cursor = meta['cursor']
+        buffer.size = meta['size']
+        buffer.path = os.path.abspath(path) if mmap_mode else None
+        if 'max_priority' in meta:
+            buffer._max_priority = meta['max_priority']
+        else:
+            # Saved before the running max was kept: one scan on load
+            buffer._max_priority = float(buffer.priorities[:buffer.size].max()) if buffer.size else 1.0
+        return buffer
@@ -0,0 +1,99 @@
+import logging
+import threading
+
+logger = logging.getLogger('RLTrader')
+
+
+class RetrainScheduler:
+    """
+    Runs retraining on one background thread so the trading loop never waits.
+    At most one retrain is in flight and at most one request is pending: a
+    new request replaces the pending one (the stale snapshot is dropped), and
+    request() never blocks. `retrain_fn(snapshot)` does the work and
+    `on_complete(result, snapshot)` is called from the worker when it finishes.
+    """
+
+    def __init__(self, retrain_fn, on_complete=None, name='rl-retrain'):
+        self.retrain_fn = retrain_fn
+        self.on_complete = on_complete
+        self.name = name
+        self._condition = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._in_flight = False
+        self._stopped = False
+        self._thread = None
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def request(self, snapshot):
+        # Returns False when the request replaced (coalesced with) a pending one
+        with self._condition:
+            if self._stopped:
+                return False
+            self.submitted += 1
+            replaced = self._has_pending
+            if replaced:
+                self.dropped += 1
+            self._pending = snapshot
+            self._has_pending = True
+            self._condition.notify_all()
+        if self._thread is None:
+            self.start()
+        return not replaced
+
+    @property
+    def busy(self):
+        with self._condition:
+            return self._in_flight or self._has_pending
+
+    def wait_idle(self, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(lambda: not (self._in_flight or self._has_pending), timeout)
+
+    def stop(self, wait=True, timeout=None):
+        with self._condition:
+            self._stopped = True
+            self._pending = None
+            self._has_pending = False
+            self._condition.notify_all()
+        if wait and self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._has_pending or self._stopped)
+                if self._stopped:
+                    return
+                snapshot = self._pending
+                self._pending = None
+                self._has_pending = False
+                self._in_flight = True
+
+            result = None
+            try:
+                result = self.retrain_fn(snapshot)
+                if self.on_complete is not None:
+                    self.on_complete(result, snapshot)
+            except Exception as e:
+                logger.error("Background retrain failed: %s", e, exc_info=True)
+                result = False
+
+            with self._condition:
+                self._in_flight = False
+                if result is False:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self._condition.notify_all()
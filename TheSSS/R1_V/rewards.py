@@ -0,0 +1,78 @@
+import os
+from dataclasses import dataclass
+import numpy as np
+
+ACTION_CODES = {'SELL': -1, 'HOLD': 0, 'BUY': 1}
+PIP_SCALE = 10000
+REWARD_BOUND = 1000.0
+
+
+@dataclass(frozen=True)
+class RewardConfig:
+    transaction_cost: float = 0.0005
+    risk_factor: float = 0.15
+    volatility_window: int = 14
+    min_position_size: float = 0.01
+    max_position_size: float = 1.0
+    default_reward: float = -0.1
+
+    @classmethod
+    def from_env(cls):
+        # Parsed once; RLTrader keeps the instance for the whole session
+        return cls(
+            transaction_cost=float(os.getenv("TRANSACTION_COST", "0.0005")),
+            risk_factor=float(os.getenv("RISK_ADJUSTMENT_FACTOR", "0.15")),
+            volatility_window=int(os.getenv("VOLATILITY_WINDOW", "14")),
+            min_position_size=float(os.getenv("MIN_POSITION_SIZE", "0.01")),
+            max_position_size=float(os.getenv("MAX_POSITION_SIZE", "1.0")),
+            default_reward=float(os.getenv("DEFAULT_REWARD", "-0.1")),
+        )
+
+
+def encode_actions(actions):
+    """Map BUY/SELL/HOLD labels (or already-encoded +1/-1/0) to an int8 array."""
+    actions = np.asarray(actions)
+    if actions.dtype.kind in ('U', 'S', 'O'):
+        lookup = np.vectorize(lambda a: ACTION_CODES[str(a).upper()], otypes=[np.int8])
+        return lookup(actions) if actions.size else actions.astype(np.int8)
+    return actions.astype(np.int8)
+
+
+def position_size(volatility, config):
+    return np.clip(config.risk_factor / np.maximum(volatility, 1e-5), config.min_position_size, config.max_position_size)
+
+
+def reward_for_action(action, price_move, volatility, config, spread=0.0002):
+    """Scalar reward for a single action; the reference for vectorized_rewards."""
+    if action == 'HOLD':
+        return config.default_reward
+    cost = spread + config.transaction_cost
+    direction = 1.0 if action == 'BUY' else -1.0
+    pips = (direction * price_move - cost) * PIP_SCALE
+    risk_adjusted = pips * position_size(volatility, config) * (1 - config.risk_factor)
+    return float(np.clip(np.nan_to_num(risk_adjusted, nan=config.default_reward), -REWARD_BOUND, REWARD_BOUND))
+
+
+def vectorized_rewards(actions, price_moves, volatility, config, spread=0.0002):
+    """
+    Score whole arrays of actions against per-bar price moves and rolling volatility.
+    `actions` may be 1-D (one policy) or 2-D (candidate policies x bars); price_moves
+    and volatility broadcast along the last axis.
+    """
+    codes = encode_actions(actions).astype(np.float64)
+    price_moves = np.asarray(price_moves, dtype=np.float64)
+    sizes = position_size(np.asarray(volatility, dtype=np.float64), config)
+
+    cost = np.asarray(spread, dtype=np.float64) + config.transaction_cost
+    pips = (codes * price_moves - cost) * PIP_SCALE
+    rewards = pips * sizes * (1 - config.risk_factor)
+    rewards = np.clip(np.nan_to_num(rewards, nan=config.default_reward), -REWARD_BOUND, REWARD_BOUND)
+    return np.where(codes == 0, config.default_reward, rewards)
+
+
+def next_price_moves(close):
+    # Move from each bar to the next; the final bar transitions onto itself
+    close = np.asarray(close, dtype=np.float64)
+    moves = np.zeros_like(close)
+    moves[:-1] = np.diff(close)
+    return moves
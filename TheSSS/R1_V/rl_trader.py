@@ -1,191 +1,168 @@
 import time
-import subprocess
 import json
 import os
 import logging
 from datetime import datetime
 import numpy as np
-from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
+from TheSSS.market_data import load_ohlcv, iter_ohlcv_chunks
+from TheSSS.R1_V.features import add_indicator_columns, iter_indicator_chunks, FEATURE_COLUMNS
+from TheSSS.R1_V.action_provider import ActionProvider, create_action_provider
+from TheSSS.R1_V.retrain_scheduler import RetrainScheduler
+from TheSSS.R1_V.replay_buffer import ReplayBuffer
+from TheSSS.R1_V.native_policy import PPOConfig, NativeActionProvider
+from TheSSS.R1_V.distributed import train_distributed
+from TheSSS.R1_V.market_arrays import MarketArrays, iter_frame_transitions
+from TheSSS.R1_V.vector_env import VectorEnv, state_records
+from TheSSS.R1_V.trader_logging import configure_logger, StepSampler, ImprovementWriter
+from TheSSS.R1_V.rewards import RewardConfig, reward_for_action, vectorized_rewards, next_price_moves
+
+# The repository's config/.env; variables already set in the environment take precedence
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'config', '.env')
 
 class RLTrader:
-    def __init__(self, train_interval=1):
+    def __init__(self, train_interval=1, action_provider=None, chunk_size=None, data=None, retrain_mode=None):
         # Load environment variables
-        load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'config', '.env'))
+        load_dotenv(ENV_PATH)
         
         # Configure logging
         self.log_dir = os.path.expanduser(os.getenv("LOG_DIR", "~/Downloads/rl_trader_logs"))
         os.makedirs(self.log_dir, exist_ok=True)
-        self.logger = logging.getLogger('RLTrader')
-        self.logger.setLevel(logging.DEBUG)
-        handler = RotatingFileHandler(
-            os.path.join(self.log_dir, 'rl_trader.log'),
-            maxBytes=1e6,
-            backupCount=3
-        )
-        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(handler)
+        # LOG_MODE=async queues records to a listener thread and samples per-step lines; sync logs every step inline
+        self.log_mode = os.getenv("LOG_MODE", "async").lower()
+        self.logger = configure_logger(self.log_dir, mode=self.log_mode)
+        if self.log_mode == "sync":
+            self.log_sampler = StepSampler(every=1)
+            self.improvements = ImprovementWriter(os.path.join(self.log_dir, "improvements.log"), flush_interval=0)
+        else:
+            self.log_sampler = StepSampler.from_env()
+            self.improvements = ImprovementWriter(os.path.join(self.log_dir, "improvements.log"))
+        self._log_step = False
         
         # Initialize trading parameters
         self.data_path = os.getenv("HISTORICAL_DATA_PATH", 
                                  "TheSSS/trading-backtrader-azure/data/historical_data.csv")
         self.train_interval = train_interval
-        self.historical_data = self.load_historical_data()
+        self.reward_config = RewardConfig.from_env()
+        self.ppo_config = PPOConfig.from_env()
+        self.action_provider = action_provider or create_action_provider()
+        # Retraining runs on a background worker unless RETRAIN_MODE (or retrain_mode) is inline
+        if (retrain_mode or os.getenv("RETRAIN_MODE", "async")).lower() == "inline":
+            self.retrain_scheduler = None
+        else:
+            self.retrain_scheduler = RetrainScheduler(self._run_retrain, on_complete=self._on_retrain_complete)
+        # Every transition is kept for policy updates; REPLAY_BUFFER_PATH resumes a saved buffer
+        self.replay_path = os.getenv("REPLAY_BUFFER_PATH") or None
+        if self.replay_path and os.path.exists(os.path.join(self.replay_path, 'meta.json')):
+            self.replay_buffer = ReplayBuffer.load(self.replay_path)
+        else:
+            self.replay_buffer = ReplayBuffer(int(os.getenv("REPLAY_CAPACITY", "100000")))
+        # A chunk size switches to streaming mode: history is read in bounded chunks per epoch
+        self.chunk_size = chunk_size or int(os.getenv("HISTORICAL_CHUNK_SIZE", "0")) or None
+        if isinstance(data, (str, os.PathLike)):
+            # A history file instead of a frame; its first column is the bar time (timestamp or date)
+            self.data_path = os.fspath(data)
+            data = load_ohlcv(self.data_path, index_col=0)
+        if data is not None:
+            # Pre-loaded (e.g. walk-forward window) history; indicators are only added if missing
+            self.chunk_size = None
+            self.historical_data = self.prepare_features(data)
+            self.market = MarketArrays.from_frame(self.historical_data)
+        elif self.chunk_size:
+            self.historical_data = None
+            self.market = None
+        else:
+            self.historical_data = self.prepare_features(self.load_historical_data())
+            self.market = MarketArrays.from_frame(self.historical_data)
         self.episodes = 0
         self.training_start = None
         self.training_end = None
         self.total_reward = 0.0
         self.prev_total_reward = 0.0
 
-    def load_historical_data(self):
-        import pandas as pd
-        
-        df = pd.read_csv(
-            self.data_path,
-            parse_dates=['timestamp'],
-            index_col='timestamp',
-            dayfirst=False,
-            dtype={'open': 'float64', 'high': 'float64', 'low': 'float64', 'close': 'float64', 'volume': 'float64'}
-        )
-        
-        required_cols = {'open', 'high', 'low', 'close', 'volume'}
-        missing = required_cols - set(df.columns)
-        if missing:
-            raise ValueError(f"Missing required columns: {missing}")
-            
-        df = df[
-            (df['close'] > 0) &
-            (df['volume'] >= 0) &
-            (df['high'] >= df['low']) &
-            (df['high'] >= df['open']) &
-            (df['high'] >= df['close']) &
-            (df['low'] <= df['open']) &
-            (df['low'] <= df['close'])
-        ].dropna()
-        
-        df = df[~df.index.duplicated(keep='first')]
-        self.logger.info("Loaded %d validated historical records", len(df))
-        return df
-    
-    def log_improvement(self, improvement_percentage):
-        log_message = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Episode {self.episodes}: Improvement of {improvement_percentage:.2f}% (Total Reward: {self.total_reward:.2f})\n"
-        log_file = os.path.join(self.log_dir, "improvements.log")
-        
-        try:
-            with open(log_file, "a", encoding="utf-8") as logfile:
-                logfile.write(log_message)
-            self.logger.info(f"Logged improvement: {log_message.strip()}")
-        except Exception as e:
-            self.logger.error(f"Failed to log improvement: {str(e)}")
-
-    def run_trading(self):
-        try:
-            self.training_start = datetime.now()
-            total_rows = len(self.historical_data)
-            self.logger.info(f"Starting training session with {total_rows} historical records")
-import time
-import subprocess
-import json
-import os
-import logging
-from datetime import datetime
-import numpy as np
-from logging.handlers import RotatingFileHandler
-from dotenv import load_dotenv
-
-class RLTrader:
-    def __init__(self, train_interval=1):
-        # Load environment variables
-        load_dotenv(os.path.join(os.path.dirname(__file__), '..', 'config', '.env'))
-        
-        # Configure logging
-        self.log_dir = os.path.expanduser(os.getenv("LOG_DIR", "~/Downloads/rl_trader_logs"))
-        os.makedirs(self.log_dir, exist_ok=True)
-        self.logger = logging.getLogger('RLTrader')
-        self.logger.setLevel(logging.DEBUG)
-        handler = RotatingFileHandler(
-            os.path.join(self.log_dir, 'rl_trader.log'),
-            maxBytes=1e6,
-            backupCount=3
-        )
-        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        self.logger.addHandler(handler)
-        
-        # Initialize trading parameters
-        self.data_path = os.getenv("HISTORICAL_DATA_PATH", 
-                                 "TheSSS/trading-backtrader-azure/data/historical_data.csv")
-        self.train_interval = train_interval
-        self.historical_data = self.load_historical_data()
+    def initialize_trainer(self):
+        # Reset counters and start the clock for a training session driven by an external loop
         self.episodes = 0
-        self.training_start = None
-        self.training_end = None
         self.total_reward = 0.0
         self.prev_total_reward = 0.0
+        self.training_start = datetime.now()
 
     def load_historical_data(self):
-        import pandas as pd
-        
-        df = pd.read_csv(
-            self.data_path,
-            parse_dates=['timestamp'],
-            index_col='timestamp',
-            dayfirst=False,
-            dtype={'open': 'float64', 'high': 'float64', 'low': 'float64', 'close': 'float64', 'volume': 'float64'}
-        )
-        
-        required_cols = {'open', 'high', 'low', 'close', 'volume'}
-        missing = required_cols - set(df.columns)
-        if missing:
-            raise ValueError(f"Missing required columns: {missing}")
-            
-        df = df[
-            (df['close'] > 0) &
-            (df['volume'] >= 0) &
-            (df['high'] >= df['low']) &
-            (df['high'] >= df['open']) &
-            (df['high'] >= df['close']) &
-            (df['low'] <= df['open']) &
-            (df['low'] <= df['close'])
-        ].dropna()
-        
-        df = df[~df.index.duplicated(keep='first')]
+        # Parsed and validated once per source file; later starts read the binary cache
+        df = load_ohlcv(self.data_path, index_col='timestamp')
         print(f"Loaded {len(df)} validated historical records")
         return df
+
+    def prepare_features(self, df):
+        # Precompute per-bar indicators once so get_market_state only reads columns
+        if all(col in df.columns for col in FEATURE_COLUMNS):
+            return df
+        df = add_indicator_columns(df, volatility_window=self.reward_config.volatility_window)
+        self.logger.info("Precomputed indicator columns for %d records", len(df))
+        return df
     
     def log_improvement(self, improvement_percentage):
         log_message = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Episode {self.episodes}: Improvement of {improvement_percentage:.2f}% (Total Reward: {self.total_reward:.2f})\n"
-        log_file = os.path.join(self.log_dir, "improvements.log")
         
         try:
-            with open(log_file, "a", encoding="utf-8") as logfile:
-                logfile.write(log_message)
-            self.logger.info(f"Logged improvement: {log_message.strip()}")
+            self.improvements.write(log_message)
+            self.logger.info("Logged improvement: Episode %d: Improvement of %.2f%% (Total Reward: %.2f)",
+                             self.episodes, improvement_percentage, self.total_reward)
         except Exception as e:
-            self.logger.error(f"Failed to log improvement: {str(e)}")
+            self.logger.error("Failed to log improvement: %s", e)
+
+    def iter_transitions(self):
+        if self.chunk_size is None:
+            return self.market.iter_transitions()
+        chunks = iter_ohlcv_chunks(self.data_path, chunksize=self.chunk_size, index_col='timestamp')
+        frames = iter_indicator_chunks(chunks, volatility_window=self.reward_config.volatility_window)
+        return iter_frame_transitions(frames)
+
+    def run_trading(self, mode=None, max_bars=None, max_epochs=None, target_reward=None, time_limit=1800):
+        """
+        Run the training loop in one of two modes:
+        • offline - steps through history as fast as possible until a bar, epoch or
+          target-reward budget is exhausted (one epoch if no budget is given).
+        • paced - live paper trading; sleeps train_interval per bar and stops after time_limit seconds.
+        """
+        mode = (mode or os.getenv("TRAINING_MODE", "offline")).lower()
+        if mode not in ("offline", "paced"):
+            raise ValueError(f"Unknown training mode: {mode}")
+        paced = mode == "paced"
+        if not paced and max_bars is None and max_epochs is None and target_reward is None:
+            max_epochs = 1
 
-    def run_trading(self):
+        sessions = []
+        self.training_start = datetime.now()
+        current_session = {'start': self.training_start, 'start_reward': self.total_reward, 'mode': mode,
+                           'bars': 0, 'epochs': 0, 'improvements': []}
         try:
-            self.training_start = datetime.now()
-            total_rows = len(self.historical_data)
-            self.logger.info("Training session initialized with %d historical records", total_rows)
-            sessions = []
-            current_session = {'start': self.training_start, 'start_reward': self.total_reward, 'improvements': []}
-
-            while (datetime.now() - self.training_start).total_seconds() < 1800:
-                for timestamp, row in self.historical_data.iterrows():
-                    if (datetime.now() - self.training_start).total_seconds() >= 1800:
-                        self.logger.warning("Training halted after 30 minute limit - Completed %d episodes with final reward %.2f", self.episodes, self.total_reward)
+            if self.market is not None:
+                total_rows = len(self.market)
+                self.logger.info("Training session initialized with %d historical records (%s mode)", total_rows, mode)
+            else:
+                total_rows = None
+                self.logger.info("Training session streaming %s in chunks of %d rows (%s mode)", self.data_path, self.chunk_size, mode)
+
+            stop_reason = None
+            while stop_reason is None:
+                epoch_start_bars = current_session['bars']
+                for idx, (state, next_state) in enumerate(self.iter_transitions()):
+                    if max_bars is not None and current_session['bars'] >= max_bars:
+                        stop_reason = "bar budget"
+                        break
+                    if paced and (datetime.now() - self.training_start).total_seconds() >= time_limit:
+                        stop_reason = "time limit"
                         break
 
-                    self.episodes += 1
-                    episode_reward = self.train(row)
+                    current_session['bars'] += 1
+                    episode_reward = self.train(state, next_state, idx)
                     
-                    if self.episodes % 10 == 0:
+                    if self._log_step:
                         elapsed = datetime.now() - self.training_start
                         self.logger.debug("Episode %d - Reward: %.2f | Elapsed: %s", self.episodes, self.total_reward, elapsed)
-                    
-                    progress = self.episodes / len(self.historical_data) * 100
-                    self.logger.debug("Training progress: %.1f%%", progress)  # More frequent debug logging
+                        if total_rows:
+                            self.logger.debug("Training progress: %.1f%%", self.episodes / total_rows * 100)
 
                     if self.total_reward > self.prev_total_reward:
                         base = max(self.prev_total_reward, 1)
@@ -199,18 +176,30 @@ class RLTrader:
                         })
                         self.prev_total_reward = self.total_reward
 
-                    time.sleep(self.train_interval)
+                    if target_reward is not None and self.total_reward >= target_reward:
+                        stop_reason = "target reward"
+                        break
+
+                    if paced:
+                        time.sleep(self.train_interval)
 
                 else:
+                    current_session['epochs'] += 1
                     self.logger.info("Completed full data cycle - Episode %d | Total Reward: %.2f", self.episodes, self.total_reward)
-                    continue
-                break
+                    if max_epochs is not None and current_session['epochs'] >= max_epochs:
+                        stop_reason = "epoch budget"
+                    elif current_session['bars'] == epoch_start_bars:
+                        stop_reason = "no data"
+
+            self.logger.info("Training halted on %s - Completed %d episodes with final reward %.2f", stop_reason, self.episodes, self.total_reward)
+            current_session['stop_reason'] = stop_reason
 
         except Exception as e:
             print(f"Critical error during training: {str(e)}")
             import traceback
             traceback.print_exc()
         finally:
+            self.improvements.flush()
             self.training_end = datetime.now()
             current_session.update({
                 'end': self.training_end,
@@ -220,14 +209,67 @@ class RLTrader:
             sessions.append(current_session)
             print(f"Final training duration: {self.training_end - self.training_start}")
             print(f"Session Report:\n{json.dumps(sessions, indent=2, default=str)}")
+        return sessions
         
-    def train(self, row):
-        current_state = self.get_market_state(row)
-        action = self.get_action()
-        next_state = self.get_market_state(row)
+    def run_vectorized(self, num_envs=8, steps=1000, episode_length=None, seed=None):
+        """
+        Offline training over `num_envs` episodes stepped in lockstep through
+        a VectorEnv: one batched provider call, one reward computation and one
+        replay insert per step for all envs. Returns the finished episodes as
+        (env, return, length) tuples.
+        """
+        if self.market is None:
+            raise ValueError("Vectorized training needs in-memory history (chunk_size is set)")
+        env = VectorEnv(self.market, num_envs, episode_length=episode_length, config=self.reward_config, seed=seed)
+        self.training_start = self.training_start or datetime.now()
+        obs = env.obs
+        for _ in range(steps):
+            batch = obs if self.action_provider.accepts_arrays else state_records(obs)
+            actions = self.action_provider.get_actions(batch)
+            next_obs, rewards, dones = env.step(actions)
+            self.replay_buffer.add_batch(obs, actions, rewards, next_obs)
+            self.episodes += num_envs
+            self.total_reward = float(np.nan_to_num(self.total_reward + rewards.sum(), nan=0.0, posinf=0.0, neginf=0.0))
+            # One retrain request per lockstep batch; the scheduler coalesces any backlog
+            self.retrain_model(force=True)
+            obs = env.obs
+        self.logger.info("Vectorized run: %d envs x %d steps, %d episodes finished, total reward %.2f",
+                         num_envs, steps, len(env.finished), self.total_reward)
+        return env.finished
+
+    def run_distributed(self, num_workers=None, rounds=100, num_envs=8, steps_per_round=32, episode_length=None,
+                        seed=None):
+        """
+        Train the native policy with train_distributed across a process pool;
+        the history is shared with workers once and the trained policy is
+        swapped in at the end. Returns the per-round history table.
+        """
+        if self.market is None:
+            raise ValueError("Distributed training needs in-memory history (chunk_size is set)")
+        provider = self.action_provider
+        if not isinstance(provider, NativeActionProvider):
+            raise ValueError("Distributed training needs the native policy (ACTION_PROVIDER=native)")
+        policy, history = train_distributed(self.market, num_workers=num_workers, rounds=rounds, num_envs=num_envs,
+                                            steps_per_round=steps_per_round, episode_length=episode_length,
+                                            policy=provider.policy, config=provider.config,
+                                            reward_config=self.reward_config, seed=seed)
+        self.episodes += int(history['transitions'].sum())
+        trained = NativeActionProvider(policy=policy, config=provider.config, greedy=provider.greedy, path=provider.path)
+        self._on_retrain_complete(trained, {'episodes': self.episodes})
+        return history
+
+    def train(self, current_state, next_state=None, idx=None):
+        # States are lightweight records from MarketArrays (or get_market_state for a row); idx is the state's bar.
+        # Every call is one episode, so the retrain cadence holds for any caller.
+        self.episodes += 1
+        self._log_step = self.log_sampler.should_log(self.episodes) and self.logger.isEnabledFor(logging.DEBUG)
+        action = self.get_action(current_state)
+        if next_state is None:
+            next_state = current_state
         
-        episode_reward = self.calculate_reward(action, current_state, next_state)
+        episode_reward = self.calculate_reward(action, current_state, next_state, idx)
         episode_reward = float(np.nan_to_num(episode_reward, nan=0.0))
+        self.replay_buffer.add(current_state, action, episode_reward, next_state)
         self.total_reward = np.nan_to_num(
             self.total_reward + float(episode_reward), 
             nan=0.0, 
@@ -235,7 +277,8 @@ class RLTrader:
             neginf=0.0
         )
         
-        self.logger.debug("""
+        if self._log_step:
+            self.logger.debug("""
 === Training Episode %d ===
 Episode Reward: %.2f
 Total Reward: %.2f
@@ -243,107 +286,75 @@ Elapsed Time: %s
 ============================
 """, self.episodes, episode_reward, self.total_reward, datetime.now() - self.training_start)
         
-        time.sleep(1)
         self.retrain_model()
         return episode_reward
 
-    def retrain_model(self):
-        if self.episodes % 5 != 0:
+    def retrain_model(self, force=False):
+        if not force and self.episodes % 5 != 0:
             return True
 
+        snapshot = {'episodes': self.episodes, 'total_reward': float(self.total_reward),
+                    'experience': len(self.replay_buffer)}
+        if self.retrain_scheduler is None:
+            result = self._run_retrain(snapshot)
+            self._on_retrain_complete(result, snapshot)
+            return result is not False
+        # Non-blocking: the loop keeps the current policy while the worker trains. The loop keeps
+        # inserting into the live buffer, so the worker gets a copy of the recent window instead.
+        snapshot['replay'] = self.replay_buffer.snapshot(self.ppo_config.experience_window)
+        self.retrain_scheduler.request(snapshot)
+        return True
+
+    def _run_retrain(self, snapshot):
         self.logger.info("Starting validated model training cycle")
         try:
-            model_check = subprocess.run(["ollama", "ps"], capture_output=True, text=True, timeout=30)
-            if "deepseek-r1:1.5b" not in model_check.stdout:
-                subprocess.run(["ollama", "run", "deepseek-r1:1.5b"], timeout=120, check=True)
+            if not self.action_provider.ensure_ready():
+                return False
 
-            training_prompt = f"PPO_UPDATE:\nEPISODES={self.episodes}\nTOTAL_REWARD={self.total_reward:.2f}\nHYPERPARAMETERS:\nclip_range=0.1\nentropy_coeff=0.02\nbatch_size=16\ngamma=0.90\nexperience_window=500\n"
+            ppo = self.ppo_config
+            training_prompt = f"PPO_UPDATE:\nEPISODES={snapshot['episodes']}\nTOTAL_REWARD={snapshot['total_reward']:.2f}\nEXPERIENCE={snapshot['experience']}\nHYPERPARAMETERS:\nclip_range={ppo.clip_range}\nentropy_coeff={ppo.entropy_coeff}\nbatch_size={ppo.batch_size}\ngamma={ppo.gamma:.2f}\nexperience_window={ppo.experience_window}\n"
             
             log_path = os.path.join(self.log_dir, f"training_{datetime.now().strftime('%Y%m%d%H%M%S')}.log")
-            success = False
-            proc = None
-            logfile = None
-            
-            try:
-                logfile = open(log_path, 'w')
-                proc = subprocess.Popen(
-                    ["ollama", "run", "deepseek-r1:1.5b"],
-                    stdin=subprocess.PIPE,
-                    stdout=logfile,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
-                
-                try:
-                    proc.stdin.write(training_prompt)
-                    proc.stdin.flush()
-                except (BrokenPipeError, OSError) as e:
-                    self.logger.error("Training write failed: %s", str(e), exc_info=True)
-                    return False
-                finally:
-                    proc.stdin.close()
-                
-                try:
-                    exit_code = proc.wait(timeout=480)
-                    success = exit_code == 0
-                except subprocess.TimeoutExpired:
-                    print("Training timeout after 8 minutes", flush=True)
-                    proc.kill()
-                
-            except Exception as e:
-                print(f"Training failed: {str(e)}", flush=True)
-                return False
-            finally:
-                if proc and proc.poll() is None:
-                    proc.terminate()
-                    try:
-                        proc.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        proc.kill()
-                if logfile:
-                    logfile.close()
-                return success
+            experience = snapshot.get('replay', self.replay_buffer)
+            return self.action_provider.train(training_prompt, log_path=log_path, experience=experience)
 
         except Exception as e:
             print(f"Training failure: {str(e)[:500]}")
             return False
 
-    def get_action(self):
-        # Use modulo to wrap index within valid range
-        idx = self.episodes % len(self.historical_data)
-        state = self.get_market_state(self.historical_data.iloc[idx])
-        state = self.clean_state(state)
-    
-        try:
-            result = subprocess.run(
-                ["ollama", "run", "deepseek-r1:1.5b", f"ACTION_QUERY: {json.dumps(state)}"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=15
-            )
-            action = result.stdout.strip().upper()
-            if action in ("BUY", "SELL", "HOLD"):
-                return action
-                
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-            pass
-            
-        if state['rsi'] < 30:
-            return "BUY"
-        elif state['rsi'] > 70:
-            return "SELL"
-        return "HOLD"
+    def _on_retrain_complete(self, result, snapshot):
+        # Providers that train a new policy return it; swapping the reference is atomic for the loop
+        if isinstance(result, ActionProvider):
+            self.action_provider = result
+            self.logger.info("Hot-swapped policy trained at episode %d", snapshot['episodes'])
+
+    def shutdown(self, wait=True):
+        if self.retrain_scheduler is not None:
+            self.retrain_scheduler.stop(wait=wait)
+        if self.replay_path:
+            self.replay_buffer.save(self.replay_path)
+        self.action_provider.close()
+        self.improvements.close()
+
+    def get_action(self, state=None):
+        if state is None:
+            # Use modulo to wrap index within valid range
+            idx = self.episodes % len(self.market)
+            state = self.market.state(idx)
+        return self.get_actions([state])[0]
+
+    def get_actions(self, states):
+        # One provider call per batch keeps the model session warm across decisions
+        states = [self.clean_state(dict(state)) for state in states]
+        return self.action_provider.get_actions(states)
         
     def get_market_state(self, row):
         return {
             'price': row['close'],
             'spread': 0.0002,
             'volume': row['volume'],
-            'rsi': row.get('rsi', self.calculate_rsi(row)),
-            'macd': row.get('macd', self.calculate_macd(row))
+            'rsi': row['rsi'] if 'rsi' in row else self.calculate_rsi(row),
+            'macd': row['macd'] if 'macd' in row else self.calculate_macd(row)
         }
 
     def clean_state(self, state):
@@ -388,15 +399,21 @@ Elapsed Time: %s
             self.logger.error("MACD calculation error: %s", str(e), exc_info=True)
             return 0.0
 
-    def calculate_reward(self, action, state, next_state):
+    def calculate_volatility(self, window, idx=None):
+        # Rolling std of returns ending at bar idx; without loaded history or a known bar there is nothing to measure
+        if self.market is None or idx is None or len(self.market) == 0:
+            return 0.0
+        if window == self.reward_config.volatility_window and 'volatility' in self.market:
+            return float(self.market.column('volatility')[idx])
+        close = self.market.column('close')[max(0, idx - window):idx + 1]
+        if len(close) < 3:
+            return 0.0
+        returns = np.diff(close) / close[:-1]
+        return float(np.nan_to_num(np.std(returns, ddof=1)))
+
+    def calculate_reward(self, action, state, next_state, idx=None):
         try:
-            # Get parameters from environment variables
-            transaction_cost = float(os.getenv("TRANSACTION_COST", "0.0005"))
-            risk_factor = float(os.getenv("RISK_ADJUSTMENT_FACTOR", "0.15"))
-            vol_window = int(os.getenv("VOLATILITY_WINDOW", "14"))
-            min_size = float(os.getenv("MIN_POSITION_SIZE", "0.01"))
-            max_size = float(os.getenv("MAX_POSITION_SIZE", "1.0"))
-            default_reward = float(os.getenv("DEFAULT_REWARD", "-0.1"))
+            config = self.reward_config
 
             # Get price data with validation
             current_price = float(np.nan_to_num(state.get('price', 0.0)))
@@ -404,49 +421,49 @@ Elapsed Time: %s
             
             # Calculate price movement and volatility
             price_move = next_price - current_price
-            volatility = self.calculate_volatility(vol_window)
-            
-            # Transaction cost adjustment
-            spread = float(np.nan_to_num(state.get('spread', 0.0002))) + transaction_cost
-            
-            # Risk-adjusted position sizing
-            position_size = np.clip(
-                risk_factor / max(volatility, 1e-5),  # Prevent division by zero
-                min_size,
-                max_size
-            )
-            
-            # Reward calculation
-            if action == 'BUY':
-                pips = (price_move - spread) * 10000
-            elif action == 'SELL':
-                pips = (-price_move - spread) * 10000
-            else:  # HOLD
-                return default_reward
-                
-            # Apply volatility scaling and risk adjustment
-            scaled_pips = pips * position_size
-            risk_adjusted_reward = scaled_pips * (1 - risk_factor)
-            
-            # Final validation and clipping
-            validated_reward = np.clip(
-                np.nan_to_num(risk_adjusted_reward, nan=default_reward), 
-                -1000.0, 
-                1000.0
-            )
+            volatility = state.get('volatility')
+            if volatility is None:
+                volatility = self.calculate_volatility(config.volatility_window, idx)
+            spread = float(np.nan_to_num(state.get('spread', 0.0002)))
+
+            validated_reward = reward_for_action(action, price_move, volatility, config, spread)
             
-            self.logger.debug(
-                f"Reward calc: Action={action} | PriceMove={price_move:.4f} | "
-                f"Volatility={volatility:.4f} | Size={position_size:.2f} | "
-                f"FinalReward={validated_reward:.2f}"
-            )
+            if self._log_step:
+                self.logger.debug(
+                    "Reward calc: Action=%s | PriceMove=%.4f | Volatility=%.4f | FinalReward=%.2f",
+                    action, price_move, volatility, validated_reward
+                )
             
-            return float(validated_reward)
+            return validated_reward
             
         except KeyError as e:
             self.logger.error(f"Missing state key {e}, defaulting to 0 reward")
             return 0.0
 
+    def batch_rewards(self, actions, start=0, market=None):
+        """Score an array of actions (one policy, or policies x bars) over history from `start` in one call."""
+        market = self.market if market is None else market
+        actions = np.asarray(actions)
+        stop = start + actions.shape[-1]
+        close = market.column('close')[start:stop + 1]
+        moves = next_price_moves(close)[:actions.shape[-1]]
+        volatility = market.column('volatility')[start:stop]
+        return vectorized_rewards(actions, moves, volatility, self.reward_config, market.spread)
+
+    def evaluate(self, market, batch_size=256):
+        """Score the current policy on unseen bars without training; returns (actions, rewards)."""
+        actions = []
+        batch = []
+        for state in market.iter_states():
+            batch.append(state)
+            if len(batch) == batch_size:
+                actions.extend(self.get_actions(batch))
+                batch = []
+        if batch:
+            actions.extend(self.get_actions(batch))
+        actions = np.asarray(actions)
+        return actions, self.batch_rewards(actions, market=market)
+
 if __name__ == "__main__":
     trader = RLTrader(train_interval=1)
     trader.logger.info("Starting RL trading session")
@@ -455,4 +472,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         trader.logger.warning("Training session interrupted by user input")
     finally:
+        trader.shutdown()
         trader.logger.info("Training session completed")
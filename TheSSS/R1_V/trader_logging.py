@@ -0,0 +1,128 @@
+import os
+import time
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# One file handler (and listener in async mode) per logger name, replaced when a trader is reconfigured
+_installed = {}
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues the record untouched. The stock handler
+    merges msg % args in the calling thread; here the listener thread does
+    all formatting, so the hot loop only pays for building the record.
+    Callers must pass immutable args (numbers, strings), as RLTrader does.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logger(log_dir, name='RLTrader', filename='rl_trader.log', mode=None, level=None):
+    """
+    Attach a rotating file handler for `name` in `log_dir`. LOG_MODE=async
+    (the default) routes records through a queue to a background listener;
+    LOG_MODE=sync writes from the calling thread. Calling it again replaces
+    the handlers installed by the previous call instead of stacking them.
+    """
+    mode = (mode or os.getenv("LOG_MODE", "async")).lower()
+    if mode not in ("async", "sync"):
+        raise ValueError(f"Unknown log mode: {mode}")
+    logger = logging.getLogger(name)
+    logger.setLevel(level or os.getenv("LOG_LEVEL", "DEBUG").upper())
+    shutdown_logger(name)
+
+    file_handler = RotatingFileHandler(os.path.join(log_dir, filename), maxBytes=1e6, backupCount=3)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    if mode == "sync":
+        logger.addHandler(file_handler)
+        _installed[name] = (file_handler, None, file_handler)
+    else:
+        queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        listener = QueueListener(queue_handler.queue, file_handler, respect_handler_level=True)
+        listener.start()
+        logger.addHandler(queue_handler)
+        _installed[name] = (queue_handler, listener, file_handler)
+    return logger
+
+
+def shutdown_logger(name='RLTrader'):
+    # Drain the queue (async mode) and close the file handler installed by configure_logger
+    installed = _installed.pop(name, None)
+    if installed is None:
+        return
+    handler, listener, file_handler = installed
+    logging.getLogger(name).removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+    file_handler.close()
+
+
+@atexit.register
+def _shutdown_all():
+    for name in list(_installed):
+        shutdown_logger(name)
+
+
+class StepSampler:
+    """
+    Rate limit for per-step log lines: allow a step when it is a multiple of
+    `every`, but never more often than once per `min_interval` seconds.
+    """
+
+    def __init__(self, every=100, min_interval=0.0, clock=time.monotonic):
+        self.every = max(int(every), 1)
+        self.min_interval = min_interval
+        self.clock = clock
+        self._last = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(every=int(os.getenv("LOG_SAMPLE_EVERY", "100")),
+                   min_interval=float(os.getenv("LOG_MIN_INTERVAL", "0")))
+
+    def should_log(self, step):
+        if step % self.every:
+            return False
+        if self.min_interval:
+            now = self.clock()
+            if self._last is not None and now - self._last < self.min_interval:
+                return False
+            self._last = now
+        return True
+
+
+class ImprovementWriter:
+    """Keeps improvements.log open with a write buffer, flushing every `flush_interval` seconds and on close."""
+
+    def __init__(self, path, buffer_size=65536, flush_interval=5.0, clock=time.monotonic):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._file = None
+        self._last_flush = clock()
+
+    def write(self, line):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=self.buffer_size)
+        self._file.write(line)
+        now = self.clock()
+        if now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = now
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            self._last_flush = self.clock()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,115 @@
+import numpy as np
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.replay_buffer import STATE_FIELDS
+from TheSSS.R1_V.rewards import RewardConfig, encode_actions, vectorized_rewards, next_price_moves
+
+
+def state_records(obs, fields=STATE_FIELDS):
+    # Observation rows as state dicts for providers that only take records
+    return [dict(zip(fields, row)) for row in obs.tolist()]
+
+
+def env_tables(markets):
+    """
+    The arrays VectorEnv steps over, for one MarketArrays or a list of them:
+    `observations` (bars, STATE_FIELDS) plus per-bar `moves`, `volatility`
+    and `spread`, all markets concatenated, and the int64 `lengths` of each
+    market. Build them once and pass them as `tables` to share one copy
+    (e.g. views of shared memory) between several envs.
+    """
+    if isinstance(markets, MarketArrays):
+        markets = [markets]
+    obs, moves, volatility, spread = [], [], [], []
+    for market in markets:
+        if len(market) < 2:
+            raise ValueError("Each market needs at least two bars")
+        close, volume, rsi, macd, vol = market._state_columns()
+        columns = {'price': close, 'spread': np.full_like(close, market.spread), 'volume': volume,
+                   'rsi': rsi, 'macd': macd, 'volatility': vol}
+        obs.append(np.column_stack([columns[field] for field in STATE_FIELDS]))
+        moves.append(next_price_moves(close))
+        volatility.append(vol)
+        spread.append(np.full_like(close, market.spread))
+    return {
+        'observations': np.nan_to_num(np.concatenate(obs)),
+        'moves': np.concatenate(moves),
+        'volatility': np.concatenate(volatility),
+        'spread': np.concatenate(spread),
+        'lengths': np.array([len(m) for m in markets], dtype=np.int64),
+    }
+
+
+class VectorEnv:
+    """
+    K independent trading episodes over one or more MarketArrays, stepped in
+    lockstep. All markets are concatenated into one (bars, STATE_FIELDS)
+    observation table, so each step is a handful of gathers plus one
+    vectorized_rewards call no matter how large K is. Episodes start at random
+    offsets, last `episode_length` bars (or until their market runs out) and
+    are reset automatically when done. Prebuilt env_tables() can be passed as
+    `tables` (markets is then ignored); they are used as-is, never copied or written.
+    """
+
+    def __init__(self, markets, num_envs, episode_length=None, config=None, seed=None, tables=None):
+        self.num_envs = num_envs
+        self.episode_length = episode_length
+        self.config = config or RewardConfig.from_env()
+        self.rng = np.random.default_rng(seed)
+
+        tables = env_tables(markets) if tables is None else tables
+        self.observations = tables['observations']
+        self.moves = tables['moves']
+        self.volatility = tables['volatility']
+        self.spread = tables['spread']
+        self.lengths = tables['lengths']
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)[:-1]])
+
+        # Env i always replays market i % len(markets)
+        self.market_ids = np.arange(num_envs) % len(self.lengths)
+        self.position = np.zeros(num_envs, dtype=np.int64)
+        self.end = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.returns = np.zeros(num_envs)
+        self.finished = []
+        self.reset()
+
+    def _reset_envs(self, envs):
+        lengths = self.lengths[self.market_ids[envs]]
+        offsets = self.offsets[self.market_ids[envs]]
+        # The last bar has no successor, so an episode can cover at most length - 1 steps
+        span = lengths - 1 if self.episode_length is None else np.minimum(self.episode_length, lengths - 1)
+        starts = (self.rng.random(len(envs)) * (lengths - span)).astype(np.int64)
+        self.position[envs] = offsets + starts
+        self.end[envs] = offsets + starts + span
+        self.steps[envs] = 0
+        self.returns[envs] = 0.0
+
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        return self.obs
+
+    @property
+    def obs(self):
+        return self.observations[self.position]
+
+    def step(self, actions):
+        """
+        Apply one action per env. Returns (next_obs, rewards, dones) where
+        next_obs is each env's true successor bar; envs that finished are
+        then restarted, so `obs` already holds the first bar of their next episode.
+        """
+        position = self.position
+        rewards = vectorized_rewards(encode_actions(actions), self.moves[position],
+                                     self.volatility[position], self.config, self.spread[position])
+        self.position = position + 1
+        self.steps += 1
+        self.returns += rewards
+        next_obs = self.observations[self.position]
+        dones = self.position >= self.end
+
+        done_envs = np.flatnonzero(dones)
+        if len(done_envs):
+            self.finished.extend(zip(done_envs.tolist(), self.returns[done_envs].tolist(),
+                                     self.steps[done_envs].tolist()))
+            self._reset_envs(done_envs)
+        return next_obs, rewards, dones
@@ -0,0 +1,125 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from TheSSS.market_data import load_ohlcv
+from TheSSS.R1_V.features import add_indicator_columns, FEATURE_COLUMNS
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.action_provider import create_action_provider
+from TheSSS.R1_V.rewards import RewardConfig
+
+
+def walk_forward_windows(total, train_size, test_size, step=None, anchored=False):
+    """
+    Slice `total` bars into (train_start, train_end, test_end) windows. Each
+    test window immediately follows its train window; windows advance by
+    `step` bars (default test_size). Anchored windows keep training from bar 0.
+    """
+    step = step or test_size
+    windows = []
+    train_start = 0
+    train_end = train_size
+    while train_end + test_size <= total:
+        windows.append((0 if anchored else train_start, train_end, train_end + test_size))
+        train_start += step
+        train_end += step
+    return windows
+
+
+def _run_window(window_id, train_data, test_data, provider_factory, train_epochs):
+    # Runs in a worker process: train a fresh trader on the window, then score the next bars
+    from TheSSS.R1_V.rl_trader import RLTrader
+
+    started = time.perf_counter()
+    # Inline retraining: every policy update lands before the test segment, so results are deterministic
+    trader = RLTrader(action_provider=provider_factory(), data=train_data, retrain_mode="inline")
+    # Windows are independent; none of them should overwrite a persisted replay buffer
+    trader.replay_path = None
+    try:
+        trader.run_trading(mode="offline", max_epochs=train_epochs)
+        test_market = MarketArrays.from_frame(test_data)
+        actions, rewards = trader.evaluate(test_market)
+    finally:
+        trader.shutdown()
+    trades = actions != "HOLD"
+    return {
+        'window': window_id,
+        'train_start': train_data.index[0],
+        'test_start': test_data.index[0],
+        'test_end': test_data.index[-1],
+        'train_bars': len(train_data),
+        'test_bars': len(test_data),
+        'train_reward': float(trader.total_reward),
+        'test_reward': float(rewards.sum()),
+        'test_trades': int(trades.sum()),
+        'test_hits': int((rewards[trades] > 0).sum()),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def summarize(results):
+    trades = int(results['test_trades'].sum())
+    bars = int(results['test_bars'].sum())
+    return {
+        'windows': len(results),
+        'test_bars': bars,
+        'test_reward': float(results['test_reward'].sum()),
+        'mean_reward_per_bar': float(results['test_reward'].sum() / bars) if bars else 0.0,
+        'mean_window_reward': float(results['test_reward'].mean()) if len(results) else 0.0,
+        'std_window_reward': float(results['test_reward'].std(ddof=0)) if len(results) else 0.0,
+        'test_trades': trades,
+        'hit_rate': float(results['test_hits'].sum() / trades) if trades else 0.0,
+        'positive_windows': int((results['test_reward'] > 0).sum()),
+    }
+
+
+def walk_forward(data, train_size, test_size, step=None, anchored=False, train_epochs=1,
+                 provider_factory=create_action_provider, max_workers=None):
+    """
+    Walk-forward training/evaluation of RLTrader. Indicators are computed once
+    over the whole history, windows are trained and scored independently in a
+    process pool, and out-of-sample results come back as (per-window table,
+    aggregate report). `provider_factory` must be picklable.
+    """
+    if not all(col in data.columns for col in FEATURE_COLUMNS):
+        data = add_indicator_columns(data, volatility_window=RewardConfig.from_env().volatility_window)
+    windows = walk_forward_windows(len(data), train_size, test_size, step=step, anchored=anchored)
+    if not windows:
+        raise ValueError(f"History of {len(data)} bars is too short for train={train_size}, test={test_size}")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_run_window, i, data.iloc[start:train_end], data.iloc[train_end:test_end],
+                        provider_factory, train_epochs)
+            for i, (start, train_end, test_end) in enumerate(windows)
+        ]
+        rows = [future.result() for future in futures]
+
+    results = pd.DataFrame(rows)
+    return results, summarize(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward training and out-of-sample evaluation for RLTrader")
+    parser.add_argument('--data', default=os.getenv("HISTORICAL_DATA_PATH"))
+    parser.add_argument('--train', type=int, required=True, help="bars per training window")
+    parser.add_argument('--test', type=int, required=True, help="bars per test window")
+    parser.add_argument('--step', type=int, default=None)
+    parser.add_argument('--anchored', action='store_true')
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    data = load_ohlcv(args.data, index_col='timestamp')
+    results, report = walk_forward(data, args.train, args.test, step=args.step, anchored=args.anchored,
+                                   train_epochs=args.epochs, max_workers=args.workers)
+    print(results.to_string(index=False))
+    print("\n=== Out-of-sample report ===")
+    for key, value in report.items():
+        print(f"{key}: {np.round(value, 4) if isinstance(value, float) else value}")
+
+
+if __name__ == "__main__":
+    main()
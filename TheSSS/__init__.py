@@ -1,3 +1,3 @@
 # Package initialization file for TheSSS trading framework
 __version__ = '0.1.0'
-__all__ = ['R1_V', 'strategies', 'trading_backtrader_azure']
+__all__ = ['R1_V', 'strategies', 'trading_backtrader_azure', 'market_data', 'segment_store', 'live']
@@ -0,0 +1,158 @@
+import time
+import queue
+from collections import namedtuple
+from TheSSS.strategies.candles import CandleBuffer
+from TheSSS.live.ticks import read_tick_csv
+
+# Bar length in seconds for the supported MT5 timeframe names
+TIMEFRAMES = {'M1': 60, 'M5': 300, 'M15': 900, 'M30': 1800, 'H1': 3600, 'H4': 14400, 'D1': 86400}
+
+# time is the bar's open time in server seconds; volume is the tick count, like MT5's tick_volume
+Bar = namedtuple('Bar', ['symbol', 'timeframe', 'time', 'open', 'high', 'low', 'close', 'volume', 'spread'])
+
+PRICE_FIELDS = ('bid', 'ask', 'mid', 'last')
+
+
+def tick_price(tick, price='bid'):
+    if price == 'mid':
+        return (tick.bid + tick.ask) / 2.0
+    return getattr(tick, price)
+
+
+class CandleAggregator:
+    """
+    Builds OHLCV bars for several timeframes from one tick stream. Each
+    (symbol, timeframe) keeps only its forming bar plus a CandleBuffer of the
+    last `history` closed bars, so memory per symbol is fixed. A bar closes
+    when a tick from a later period arrives (or close_until() passes its end)
+    and is handed to every matching subscriber right away. Periods without
+    ticks produce no bar, as on MT5 charts. A tick for a period that already
+    closed is ignored by that timeframe only and counted in `late` once per
+    timeframe it missed; the timeframes whose bar is still forming take it.
+    """
+
+    def __init__(self, timeframes=('M1', 'M5', 'H1'), price='bid', history=500):
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if unknown:
+            raise ValueError(f"Unknown timeframes: {unknown}")
+        if price not in PRICE_FIELDS:
+            raise ValueError(f"Unknown price field: {price}")
+        self.timeframes = tuple(timeframes)
+        self.price = price
+        self.history = history
+        self.late = 0
+        self._forming = {}
+        self._closed = {}
+        self._buffers = {}
+        self._subscribers = []
+        self._last_tick_time = None
+
+    def subscribe(self, callback, symbols=None, timeframes=None):
+        # callback(bar) runs on the aggregating thread; use a queue in the callback for slow consumers
+        entry = (callback, None if symbols is None else frozenset(symbols),
+                 None if timeframes is None else frozenset(timeframes))
+        self._subscribers.append(entry)
+        return entry
+
+    def unsubscribe(self, entry):
+        self._subscribers.remove(entry)
+
+    def candles(self, symbol, timeframe):
+        """Closed bars of one symbol and timeframe, oldest first (at most `history`)."""
+        key = (symbol, timeframe)
+        if key not in self._buffers:
+            self._buffers[key] = CandleBuffer(self.history)
+        return self._buffers[key]
+
+    def forming(self, symbol, timeframe):
+        bar = self._forming.get((symbol, timeframe))
+        return None if bar is None else Bar(symbol, timeframe, *bar)
+
+    def update(self, tick):
+        """Add one tick and return the bars it closed."""
+        price = tick_price(tick, self.price)
+        seconds = tick.time_msc // 1000
+        spread = tick.ask - tick.bid
+        closed = []
+        accepted = False
+        for timeframe in self.timeframes:
+            start = seconds - seconds % TIMEFRAMES[timeframe]
+            key = (tick.symbol, timeframe)
+            bar = self._forming.get(key)
+            # A period that already closed (possibly by close_until) never reopens
+            if (bar is not None and start < bar[0]) or (bar is None and start <= self._closed.get(key, -1)):
+                self.late += 1
+                continue
+            accepted = True
+            if bar is not None and start > bar[0]:
+                closed.append(self._close(tick.symbol, timeframe))
+                bar = None
+            if bar is None:
+                # [time, open, high, low, close, volume, spread]
+                self._forming[key] = [start, price, price, price, price, 1, spread]
+            else:
+                if price > bar[2]:
+                    bar[2] = price
+                elif price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+                bar[5] += 1
+                bar[6] = spread
+        if accepted:
+            self._last_tick_time = max(seconds, self._last_tick_time or seconds)
+        return closed
+
+    def close_until(self, server_time):
+        """Close every forming bar whose period ended at or before `server_time` (seconds)."""
+        closed = []
+        for symbol, timeframe in list(self._forming):
+            if self._forming[(symbol, timeframe)][0] + TIMEFRAMES[timeframe] <= server_time:
+                closed.append(self._close(symbol, timeframe))
+        return closed
+
+    def flush(self):
+        """Close every forming bar, e.g. at the end of a replay; these bars may be partial."""
+        return [self._close(symbol, timeframe) for symbol, timeframe in list(self._forming)]
+
+    def _close(self, symbol, timeframe):
+        bar = Bar(symbol, timeframe, *self._forming.pop((symbol, timeframe)))
+        self._closed[(symbol, timeframe)] = bar.time
+        self.candles(symbol, timeframe).append(bar.open, bar.high, bar.low, bar.close, bar.volume)
+        for callback, symbols, timeframes in self._subscribers:
+            if (symbols is None or symbol in symbols) and (timeframes is None or timeframe in timeframes):
+                callback(bar)
+        return bar
+
+    def consume(self, subscription, stop, idle_timeout=1.0, clock=time.monotonic):
+        """
+        Feed ticks from a TickService subscription until `stop` is set. When
+        no tick arrives for `idle_timeout` seconds, bars whose period has
+        ended are closed using the server clock extrapolated from the last
+        tick, so a quiet market still gets its bar on time.
+        """
+        received_at = None
+        while not stop.is_set():
+            try:
+                tick = subscription.get(timeout=idle_timeout)
+            except queue.Empty:
+                if received_at is not None:
+                    self.close_until(self._last_tick_time + (clock() - received_at))
+                continue
+            self.update(tick)
+            received_at = clock()
+
+
+def replay_bars(ticks, timeframes=('M1', 'M5', 'H1'), price='bid', history=500, flush=False, aggregator=None):
+    """
+    Replay recorded ticks (a CSV path or Tick records in time order) through
+    a CandleAggregator and yield each bar as it closes. Subscribers of a
+    passed-in aggregator see the same bars. flush=True also yields the
+    still-forming bars at the end.
+    """
+    if isinstance(ticks, str):
+        ticks = read_tick_csv(ticks)
+    aggregator = aggregator or CandleAggregator(timeframes, price=price, history=history)
+    for tick in ticks:
+        yield from aggregator.update(tick)
+    if flush:
+        yield from aggregator.flush()
@@ -0,0 +1,131 @@
+import os
+import sys
+import argparse
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from TheSSS.strategies.candles import CandleBuffer
+from TheSSS.strategies.indicators import IndicatorEngine
+from TheSSS.strategies.trading_strategy import TradeManager, evaluate_trade_signal
+from TheSSS.R1_V.features import rolling_rsi, rolling_macd, rolling_volatility
+from TheSSS.live.candles import CandleAggregator, replay_bars
+from TheSSS.live.ticks import MT5TickSource, TickService
+
+
+class StrategyFeed:
+    """
+    Runs the support/resistance strategy from trading_strategy.main on live
+    bars: subscribe it to a CandleAggregator for one symbol and timeframe and
+    it evaluates the signal and manages trades as each bar closes.
+    """
+
+    def __init__(self, capacity=128, sma_period=40, resistance_window=36, support_window=78, on_signal=None):
+        self.candles = CandleBuffer(capacity)
+        self.engine = IndicatorEngine(sma_period=sma_period, resistance_window=resistance_window,
+                                      support_window=support_window)
+        self.trade_manager = TradeManager()
+        self.on_signal = on_signal
+        self.signal = "HOLD"
+
+    def __call__(self, bar):
+        candle = {'open': bar.open, 'high': bar.high, 'low': bar.low, 'close': bar.close, 'volume': bar.volume}
+        self.candles.append_candle(candle)
+        self.engine.update(candle)
+        self.signal = evaluate_trade_signal(self.candles, self.engine.support, self.engine.resistance,
+                                            self.engine.sma)
+
+        trades = self.trade_manager
+        if trades.active_trades and trades.active_trades[0]['signal'] != self.signal:
+            trades.reverse_trade(self.signal)
+        if self.signal in ("BUY", "SELL"):
+            trades.enter_trade({"signal": self.signal, "price": bar.close, "time": bar.time})
+        if self.on_signal is not None:
+            self.on_signal(bar, self.signal)
+        return self.signal
+
+
+class TraderFeed:
+    """
+    Drives an RLTrader from closed bars. Each bar becomes a market state with
+    the indicators recomputed over the last `warmup` closes; with learn=True
+    the previous bar's state is trained against the new one, then the policy
+    picks the action for the bar that just closed.
+    """
+
+    def __init__(self, trader, warmup=200, learn=True, on_action=None):
+        self.trader = trader
+        self.candles = CandleBuffer(warmup)
+        self.learn = learn
+        self.on_action = on_action
+        self.state = None
+        self.action = None
+
+    def bar_state(self, bar):
+        closes = self.candles.closes()
+        macd, _, _ = rolling_macd(closes)
+        volatility = rolling_volatility(closes, window=self.trader.reward_config.volatility_window)
+        return {
+            'price': bar.close,
+            'spread': bar.spread,
+            'volume': float(bar.volume),
+            'rsi': float(rolling_rsi(closes).iloc[-1]),
+            'macd': float(macd.iloc[-1]),
+            'volatility': float(volatility.iloc[-1]),
+        }
+
+    def __call__(self, bar):
+        self.candles.append(bar.open, bar.high, bar.low, bar.close, bar.volume)
+        state = self.bar_state(bar)
+        trader = self.trader
+        if self.learn and self.state is not None:
+            if trader.training_start is None:
+                trader.initialize_trainer()
+            trader.train(self.state, state)
+        self.state = state
+        self.action = trader.get_action(state)
+        if self.on_action is not None:
+            self.on_action(bar, self.action)
+        return self.action
+
+
+def print_signal(bar, signal):
+    print(f"{bar.symbol} {bar.timeframe} {bar.time} close={bar.close:.5f} ticks={bar.volume} -> {signal}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the M5 strategy (and optionally RLTrader) on bars built from ticks")
+    parser.add_argument('symbols', nargs='*', default=["EURUSD"])
+    parser.add_argument('--replay', help="CSV of recorded ticks to replay instead of connecting to MT5")
+    parser.add_argument('--timeframe', default='M5')
+    parser.add_argument('--trader', action='store_true', help="also feed each closed bar to an RLTrader")
+    args = parser.parse_args()
+
+    aggregator = CandleAggregator(timeframes=('M1', 'M5', 'H1'))
+    for symbol in args.symbols:
+        aggregator.subscribe(StrategyFeed(on_signal=print_signal), symbols=[symbol], timeframes=[args.timeframe])
+    if args.trader:
+        from TheSSS.R1_V.rl_trader import RLTrader
+        trader = RLTrader()
+        feed = TraderFeed(trader, on_action=lambda bar, action: print_signal(bar, f"RLTrader {action}"))
+        aggregator.subscribe(feed, symbols=args.symbols[:1], timeframes=[args.timeframe])
+
+    try:
+        if args.replay:
+            for _ in replay_bars(args.replay, aggregator=aggregator):
+                pass
+            return
+        service = TickService(MT5TickSource(), args.symbols)
+        subscription = service.subscribe()
+        service.start()
+        try:
+            aggregator.consume(subscription, threading.Event())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.stop(timeout=5)
+    finally:
+        if args.trader:
+            trader.shutdown()
+
+
+if __name__ == "__main__":
+    main()
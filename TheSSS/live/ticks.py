@@ -0,0 +1,249 @@
+import csv
+import heapq
+import queue
+import time
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Field names follow MetaTrader5's symbol_info_tick record, plus the symbol it belongs to
+Tick = namedtuple('Tick', ['symbol', 'time', 'time_msc', 'bid', 'ask', 'last', 'volume'])
+
+
+def tick_from_mt5(symbol, raw):
+    return Tick(symbol, int(raw.time), int(raw.time_msc), float(raw.bid), float(raw.ask),
+                float(raw.last), float(raw.volume))
+
+
+class TickSource:
+    """Something that can be asked for the latest tick of a symbol; None means no tick available."""
+
+    def start(self, symbols):
+        return True
+
+    def poll(self, symbol):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class MT5TickSource(TickSource):
+    """Latest ticks from a MetaTrader 5 terminal. The MetaTrader5 package is only imported on start()."""
+
+    def __init__(self, login=None, password=None, server=None, path=None):
+        self.login = login
+        self.password = password
+        self.server = server
+        self.path = path
+        self.mt5 = None
+
+    def start(self, symbols):
+        import MetaTrader5 as mt5
+
+        kwargs = {k: v for k, v in (('login', int(self.login) if self.login else None),
+                                    ('password', self.password), ('server', self.server)) if v}
+        initialized = mt5.initialize(self.path, **kwargs) if self.path else mt5.initialize(**kwargs)
+        if not initialized:
+            logger.error("MT5 initialization failed: %s", mt5.last_error())
+            return False
+        self.mt5 = mt5
+        for symbol in symbols:
+            if not mt5.symbol_select(symbol, True):
+                logger.warning("Could not select %s in Market Watch", symbol)
+        return True
+
+    def poll(self, symbol):
+        raw = self.mt5.symbol_info_tick(symbol)
+        return None if raw is None else tick_from_mt5(symbol, raw)
+
+    def stop(self):
+        if self.mt5 is not None:
+            self.mt5.shutdown()
+            self.mt5 = None
+
+
+class ReplayTickSource(TickSource):
+    """
+    Stand-in source that replays recorded ticks (a CSV with the Tick columns,
+    or Tick records) in order, one per poll of their symbol.
+    """
+
+    def __init__(self, ticks):
+        if isinstance(ticks, str):
+            ticks = list(read_tick_csv(ticks))
+        self._pending = {}
+        for tick in ticks:
+            self._pending.setdefault(tick.symbol, []).append(tick)
+        self._cursor = {symbol: 0 for symbol in self._pending}
+
+    def poll(self, symbol):
+        ticks = self._pending.get(symbol)
+        if not ticks:
+            return None
+        i = self._cursor[symbol]
+        if i >= len(ticks):
+            # Like a quiet market: the last tick keeps being reported
+            return ticks[-1]
+        self._cursor[symbol] = i + 1
+        return ticks[i]
+
+    @property
+    def exhausted(self):
+        return all(self._cursor[s] >= len(t) for s, t in self._pending.items())
+
+
+def read_tick_csv(path):
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            yield Tick(row['symbol'], int(row['time']), int(row['time_msc']), float(row['bid']),
+                       float(row['ask']), float(row.get('last') or 0.0), float(row.get('volume') or 0.0))
+
+
+class Subscription:
+    """
+    Bounded per-subscriber queue. When a slow consumer lets it fill up, the
+    oldest tick is dropped so the newest is always delivered.
+    """
+
+    def __init__(self, symbols=None, maxsize=1000):
+        self.symbols = None if symbols is None else frozenset(symbols)
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def wants(self, symbol):
+        return self.symbols is None or symbol in self.symbols
+
+    def put(self, item):
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        return self.queue.get(timeout=timeout)
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+
+class TickService:
+    """
+    Polls many symbols from one source on a single scheduler thread. Each
+    symbol has its own next-due time: a new tick resets its interval to
+    `poll_interval`, while an empty, unchanged or failed poll doubles it up
+    to `max_backoff`, so quiet symbols cost almost nothing. Unchanged ticks
+    are dropped and new ones are published to every matching Subscription.
+    """
+
+    def __init__(self, source, symbols, poll_interval=0.1, max_backoff=5.0, clock=time.monotonic):
+        self.source = source
+        self.symbols = list(symbols)
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.subscriptions = []
+        self.stats = {'polls': 0, 'published': 0, 'duplicates': 0, 'empty': 0, 'errors': 0}
+        self._intervals = {symbol: poll_interval for symbol in self.symbols}
+        self._last = {}
+        self._schedule = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Set when the source refused to start, so callers can tell that from a normal stop
+        self.start_failed = False
+
+    def subscribe(self, symbols=None, maxsize=1000):
+        subscription = Subscription(symbols, maxsize)
+        with self._lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscriptions.remove(subscription)
+
+    def publish(self, item, symbol):
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            if subscription.wants(symbol):
+                subscription.put(item)
+
+    def _poll(self, symbol):
+        self.stats['polls'] += 1
+        try:
+            tick = self.source.poll(symbol)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning("Tick poll failed for %s: %s", symbol, e)
+            return False
+        if tick is None:
+            self.stats['empty'] += 1
+            return False
+        key = (tick.time_msc, tick.bid, tick.ask, tick.last, tick.volume)
+        if self._last.get(symbol) == key:
+            self.stats['duplicates'] += 1
+            return False
+        self._last[symbol] = key
+        self.stats['published'] += 1
+        self.publish(tick, symbol)
+        return True
+
+    def step(self):
+        """Poll every symbol that is due and return the seconds until the next one is."""
+        if not self._schedule and self.symbols:
+            now = self.clock()
+            self._schedule = [(now, i, symbol) for i, symbol in enumerate(self.symbols)]
+            heapq.heapify(self._schedule)
+        now = self.clock()
+        while self._schedule and self._schedule[0][0] <= now:
+            _, order, symbol = heapq.heappop(self._schedule)
+            if self._poll(symbol):
+                interval = self.poll_interval
+            else:
+                interval = min(self._intervals[symbol] * 2, self.max_backoff)
+            self._intervals[symbol] = interval
+            heapq.heappush(self._schedule, (now + interval, order, symbol))
+        return max(self._schedule[0][0] - self.clock(), 0.0) if self._schedule else self.max_backoff
+
+    def run(self):
+        if not self.source.start(self.symbols):
+            logger.error("Tick source failed to start")
+            self.start_failed = True
+            return
+        try:
+            while not self._stop.is_set():
+                # Sleeps until the next symbol is due; an empty poll can never spin the CPU
+                self._stop.wait(self.step())
+        finally:
+            self.source.stop()
+
+    def start(self):
+        self._stop.clear()
+        self.start_failed = False
+        self._thread = threading.Thread(target=self.run, name='tick-service', daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
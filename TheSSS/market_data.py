@@ -0,0 +1,262 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+import numpy as np
+import pandas as pd
+from TheSSS.segment_store import SymbolStore
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.cache'
+_META_FILE = 'meta.json'
+# Written into a prepared SegmentStore symbol directory: how many trailing rows read_prepared returns
+PREPARED_FILE = 'prepared.json'
+_INDEX_FILE = 'index.npy'
+
+
+def validate_ohlcv(df):
+    """Drop rows with impossible OHLC relationships, missing values and duplicate timestamps."""
+    missing = set(OHLCV_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    df = df[
+        (df['close'] > 0) &
+        (df['volume'] >= 0) &
+        (df['high'] >= df['low']) &
+        (df['high'] >= df['open']) &
+        (df['high'] >= df['close']) &
+        (df['low'] <= df['open']) &
+        (df['low'] <= df['close'])
+    ].dropna()
+    return df[~df.index.duplicated(keep='first')]
+
+
+def read_ohlcv_csv(path, index_col='timestamp', parse_dates=True, validate=True):
+    df = pd.read_csv(
+        path,
+        parse_dates=[index_col] if parse_dates else False,
+        index_col=index_col,
+        dayfirst=False,
+        dtype={col: 'float64' for col in OHLCV_COLUMNS}
+    )
+    return validate_ohlcv(df) if validate else df
+
+
+def cache_path(path):
+    return f"{path}{CACHE_SUFFIX}"
+
+
+def _cache_key(path, index_col, parse_dates, validate):
+    stat = os.stat(path)
+    return {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'index_col': index_col,
+        'parse_dates': parse_dates,
+        'validate': validate,
+    }
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, _META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _cacheable_columns(df):
+    # Columns are stored as float64 .npy files; anything else would silently vanish on a cache hit
+    other = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    if other:
+        raise ValueError(f"Cannot cache non-numeric columns: {other}")
+    return list(df.columns)
+
+
+def write_cache(df, directory, key=None):
+    """
+    Write each column and the index as .npy files plus meta.json. The cache is
+    built in a temporary sibling directory and renamed into place, so
+    concurrent loaders never see a half-written cache. Frames with
+    non-numeric columns are refused with ValueError.
+    """
+    columns = _cacheable_columns(df)
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(directory) + '.tmp-', dir=parent)
+    try:
+        index_unit = index_tz = None
+        if isinstance(df.index, pd.DatetimeIndex):
+            index_kind = 'datetime'
+            index_unit = df.index.unit
+            index_tz = str(df.index.tz) if df.index.tz is not None else None
+            index_values = df.index.asi8
+        elif np.issubdtype(df.index.dtype, np.number):
+            index_kind = 'numeric'
+            index_values = df.index.to_numpy()
+        else:
+            index_kind = 'string'
+            index_values = df.index.astype(str).to_numpy(dtype=str)
+        np.save(os.path.join(tmp_dir, _INDEX_FILE), index_values)
+
+        for col in columns:
+            np.save(os.path.join(tmp_dir, f"{col}.npy"), df[col].to_numpy(dtype=np.float64))
+
+        meta = dict(key or {})
+        meta.update({'index_name': df.index.name, 'index_kind': index_kind, 'index_unit': index_unit,
+                     'index_tz': index_tz, 'columns': columns, 'rows': len(df)})
+        with open(os.path.join(tmp_dir, _META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        _swap_directory(tmp_dir, directory)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _swap_directory(source, target):
+    # A directory can only be renamed onto a missing or empty one: move the old cache aside first
+    try:
+        os.replace(source, target)
+        return
+    except OSError:
+        pass
+    stale = tempfile.mkdtemp(prefix=os.path.basename(target) + '.old-', dir=os.path.dirname(os.path.abspath(target)))
+    try:
+        try:
+            os.replace(target, stale)
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(source, target)
+        except OSError:
+            # Another loader committed an equivalent cache in between; keep theirs
+            logger.debug("Cache %s was replaced concurrently", target)
+    finally:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def read_cache(directory, mmap_mode='r'):
+    """Load a cache written by write_cache; columns are memory-mapped rather than read into RAM."""
+    meta = _read_meta(directory)
+    if meta is None:
+        raise FileNotFoundError(f"No committed cache in {directory}")
+
+    index_values = np.load(os.path.join(directory, _INDEX_FILE), mmap_mode=mmap_mode)
+    if meta['index_kind'] == 'datetime':
+        index = pd.DatetimeIndex(np.asarray(index_values).view(f"datetime64[{meta['index_unit']}]"), name=meta['index_name'])
+        if meta['index_tz']:
+            index = index.tz_localize('UTC').tz_convert(meta['index_tz'])
+    else:
+        index = pd.Index(np.asarray(index_values), name=meta['index_name'])
+
+    data = {col: np.load(os.path.join(directory, f"{col}.npy"), mmap_mode=mmap_mode) for col in meta['columns']}
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def mark_prepared(directory, rows):
+    """Record that a SegmentStore symbol directory serves its last `rows` rows through read_prepared."""
+    path = os.path.join(directory, PREPARED_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'rows': int(rows)}, f)
+    os.replace(tmp_path, path)
+
+
+def read_prepared(directory):
+    """
+    Load history prepared by upload_historical_data.py: a write_cache
+    directory (memory-mapped columns) or one symbol's SegmentStore directory,
+    trimmed to the rows recorded by mark_prepared (all rows if unmarked).
+    """
+    if _read_meta(directory) is not None:
+        return read_cache(directory)
+    store = SymbolStore(directory, writable=False)
+    try:
+        try:
+            with open(os.path.join(directory, PREPARED_FILE), 'r', encoding='utf-8') as f:
+                rows = json.load(f)['rows']
+        except FileNotFoundError:
+            return store.range()
+        return store.tail(rows)
+    finally:
+        store.close()
+
+
+def load_ohlcv(path, index_col='timestamp', parse_dates=True, validate=True, use_cache=None):
+    """
+    Load an OHLCV CSV, validating it once and caching the result as memory-mapped
+    .npy columns in `<path>.cache/`. The cache is reused while the source path,
+    mtime, size and load options match; otherwise it is rebuilt from the CSV.
+    A directory is read with read_prepared; it was validated when it was written.
+    """
+    if os.path.isdir(path):
+        return read_prepared(path)
+    if use_cache is None:
+        use_cache = os.getenv("HISTORICAL_DATA_CACHE", "1") != "0"
+    if not use_cache:
+        return read_ohlcv_csv(path, index_col=index_col, parse_dates=parse_dates, validate=validate)
+
+    directory = cache_path(path)
+    key = _cache_key(path, index_col, parse_dates, validate)
+    meta = _read_meta(directory)
+    if meta is not None and all(meta.get(k) == v for k, v in key.items()):
+        logger.debug("Loading %s from binary cache %s", path, directory)
+        try:
+            return read_cache(directory)
+        except FileNotFoundError:
+            # Swapped out by a concurrent rebuild between reading meta.json and the columns
+            logger.debug("Binary cache for %s changed while loading; rebuilding", path)
+
+    df = read_ohlcv_csv(path, index_col=index_col, parse_dates=parse_dates, validate=validate)
+    try:
+        write_cache(df, directory, key)
+        logger.info("Wrote binary cache for %s (%d rows)", path, len(df))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not write binary cache for %s: %s", path, e)
+        return df
+    # Serve the first load from the cache too, so every load returns the same columns
+    try:
+        return read_cache(directory)
+    except FileNotFoundError:
+        return df
+
+
+def iter_ohlcv_chunks(path, chunksize=100000, index_col='timestamp', parse_dates=True, validate=True):
+    """
+    Stream an OHLCV CSV as validated DataFrame chunks with bounded memory.
+    Duplicate timestamps are dropped within a chunk and against the previous
+    chunk, which covers chunk boundaries for time-ordered files. A directory
+    is read with read_prepared and sliced.
+    """
+    if os.path.isdir(path):
+        df = read_prepared(path)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+    reader = pd.read_csv(
+        path,
+        parse_dates=[index_col] if parse_dates else False,
+        index_col=index_col,
+        dayfirst=False,
+        dtype={col: 'float64' for col in OHLCV_COLUMNS},
+        chunksize=chunksize
+    )
+    previous_index = None
+    with reader:
+        for chunk in reader:
+            if validate:
+                chunk = validate_ohlcv(chunk)
+            else:
+                chunk = chunk[~chunk.index.duplicated(keep='first')]
+            if previous_index is not None:
+                chunk = chunk[~chunk.index.isin(previous_index)]
+            if len(chunk) == 0:
+                continue
+            previous_index = chunk.index
+            yield chunk
@@ -0,0 +1,252 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+TICK_FIELDS = ('bid', 'ask', 'last', 'volume')
+DEFAULT_SEGMENT_ROWS = 1 << 18
+
+STORE_VERSION = 1
+_SCHEMA_FILE = 'schema.json'
+_SEGMENT_FORMAT = 'seg-{:06d}.dat'
+_MAGIC = int.from_bytes(b'SSSSEG01', 'little')
+# Header words: magic, version, capacity, committed rows; records start after HEADER_BYTES
+_HEADER_WORDS = 8
+HEADER_BYTES = _HEADER_WORDS * 8
+_COUNT = 3
+
+
+def record_dtype(fields):
+    # time is int64 nanoseconds since the epoch (naive UTC, like DatetimeIndex.asi8)
+    return np.dtype([('time', '<i8')] + [(name, '<f8') for name in fields])
+
+
+def _index_nanoseconds(index):
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.to_datetime(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+class _Segment:
+    """One pre-sized segment file: a small header holding the committed row count, then fixed-width records."""
+
+    def __init__(self, path, dtype, capacity=None, writable=False):
+        self.path = path
+        if capacity is not None:
+            # Built under a temporary name so a reader never opens a segment without its header
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(np.array([_MAGIC, STORE_VERSION, capacity, 0] + [0] * (_HEADER_WORDS - 4), dtype='<i8'))
+                f.truncate(HEADER_BYTES + capacity * dtype.itemsize)
+            os.replace(tmp_path, path)
+        mode = 'r+' if writable else 'r'
+        self.header = np.memmap(path, dtype='<i8', mode=mode, shape=(_HEADER_WORDS,))
+        if self.header[0] != _MAGIC:
+            raise ValueError(f"{path} is not a segment file")
+        self.capacity = int(self.header[2])
+        self.records = np.memmap(path, dtype=dtype, mode=mode, offset=HEADER_BYTES, shape=(self.capacity,))
+
+    @property
+    def count(self):
+        return int(self.header[_COUNT])
+
+    def times(self):
+        return self.records['time'][:self.count]
+
+    def flush(self):
+        self.records.flush()
+        self.header.flush()
+
+
+class SymbolStore:
+    """
+    Append-only time series for one symbol: fixed-width records in
+    memory-mapped segment files of `segment_rows` rows each. A segment's
+    header holds its committed row count, which the writer bumps only after
+    the records are in place, so readers (other threads or processes) never
+    see a partial row and can keep reading while a writer appends. Times are
+    strictly increasing, which makes every range or tail lookup a bisect over
+    segment start times plus a searchsorted inside the segment; nothing is
+    parsed. Only one writer per symbol is supported.
+    """
+
+    def __init__(self, directory, fields=BAR_FIELDS, segment_rows=DEFAULT_SEGMENT_ROWS, writable=True):
+        self.directory = directory
+        self.writable = writable
+        schema_file = os.path.join(directory, _SCHEMA_FILE)
+        if os.path.exists(schema_file):
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                schema = json.load(f)
+        elif writable:
+            os.makedirs(directory, exist_ok=True)
+            schema = {'version': STORE_VERSION, 'fields': list(fields), 'segment_rows': int(segment_rows)}
+            tmp_file = schema_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(schema, f)
+            os.replace(tmp_file, schema_file)
+        else:
+            raise FileNotFoundError(f"No store in {directory}")
+        self.fields = tuple(schema['fields'])
+        self.segment_rows = schema['segment_rows']
+        self.dtype = record_dtype(self.fields)
+        self._segments = []
+        self._starts = []
+        self.refresh()
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, _SEGMENT_FORMAT.format(number))
+
+    def refresh(self):
+        """Pick up rows and segments the writer (possibly another process) committed since the last call."""
+        if self._segments and self._starts[-1] is None and self._segments[-1].count:
+            self._starts[-1] = int(self._segments[-1].records['time'][0])
+        while not self._segments or self._segments[-1].count == self._segments[-1].capacity:
+            path = self._segment_path(len(self._segments))
+            if not os.path.exists(path):
+                return
+            segment = _Segment(path, self.dtype, writable=self.writable)
+            self._segments.append(segment)
+            self._starts.append(int(segment.records['time'][0]) if segment.count else None)
+
+    def __len__(self):
+        self.refresh()
+        return sum(segment.count for segment in self._segments)
+
+    @property
+    def last_time(self):
+        self.refresh()
+        for segment in reversed(self._segments):
+            if segment.count:
+                return int(segment.records['time'][segment.count - 1])
+        return None
+
+    def append(self, times, columns):
+        """
+        Append rows given int64 nanosecond `times` and a mapping of field ->
+        values. Rows at or before the last stored time are skipped, so
+        re-appending an overlapping batch is harmless. Returns rows written.
+        """
+        if not self.writable:
+            raise PermissionError(f"{self.directory} was opened read-only")
+        times = np.asarray(times, dtype=np.int64)
+        if len(times) > 1 and not (np.diff(times) > 0).all():
+            raise ValueError("Times must be strictly increasing")
+        last = self.last_time
+        skip = 0 if last is None else int(np.searchsorted(times, last, side='right'))
+        rows = np.empty(len(times) - skip, dtype=self.dtype)
+        rows['time'] = times[skip:]
+        for name in self.fields:
+            rows[name] = np.asarray(columns[name], dtype=np.float64)[skip:]
+
+        written = 0
+        while written < len(rows):
+            if not self._segments or self._segments[-1].count == self._segments[-1].capacity:
+                number = len(self._segments)
+                self._segments.append(_Segment(self._segment_path(number), self.dtype,
+                                               capacity=self.segment_rows, writable=True))
+                self._starts.append(None)
+            segment = self._segments[-1]
+            count = segment.count
+            n = min(segment.capacity - count, len(rows) - written)
+            segment.records[count:count + n] = rows[written:written + n]
+            if self._starts[-1] is None:
+                self._starts[-1] = int(rows['time'][written])
+            # Records first, then the count: a reader sees either the old or the new length
+            segment.header[_COUNT] = count + n
+            written += n
+        return written
+
+    def append_frame(self, df):
+        """Append a DataFrame with a datetime index and the store's fields as columns."""
+        missing = set(self.fields) - set(df.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        return self.append(_index_nanoseconds(df.index), {name: df[name].to_numpy() for name in self.fields})
+
+    def _read(self, start_row, stop_row):
+        # Global row positions to one copied record array (a snapshot that later appends cannot change)
+        parts = []
+        offset = 0
+        for segment in self._segments:
+            count = segment.count
+            lo, hi = max(start_row - offset, 0), min(stop_row - offset, count)
+            if lo < hi:
+                parts.append(segment.records[lo:hi])
+            offset += count
+            if offset >= stop_row:
+                break
+        if not parts:
+            return np.empty(0, dtype=self.dtype)
+        return np.concatenate(parts)
+
+    def _locate(self, time, side):
+        # Global row position of `time`: bisect the segment start times, then searchsorted inside one segment
+        starts = [s for s in self._starts if s is not None]
+        number = max(int(np.searchsorted(starts, time, side=side)) - 1, 0)
+        offset = sum(segment.count for segment in self._segments[:number])
+        if number >= len(self._segments):
+            return offset
+        return offset + int(np.searchsorted(self._segments[number].times(), time, side=side))
+
+    def tail(self, n):
+        """The last `n` rows as a DataFrame."""
+        total = len(self)
+        return self.to_frame(self._read(max(total - n, 0), total))
+
+    def range(self, start=None, end=None):
+        """Rows with start <= time < end (either bound may be None) as a DataFrame."""
+        total = len(self)
+        lo = 0 if start is None else self._locate(_index_nanoseconds(pd.DatetimeIndex([start]))[0], 'left')
+        hi = total if end is None else self._locate(_index_nanoseconds(pd.DatetimeIndex([end]))[0], 'left')
+        return self.to_frame(self._read(lo, min(hi, total)))
+
+    def to_frame(self, records):
+        index = pd.DatetimeIndex(records['time'].view('datetime64[ns]'), name='timestamp')
+        return pd.DataFrame({name: records[name] for name in self.fields}, index=index)
+
+    def flush(self):
+        for segment in self._segments:
+            segment.flush()
+
+    def close(self):
+        if self.writable:
+            self.flush()
+        self._segments = []
+        self._starts = []
+
+
+class SegmentStore:
+    """A directory of SymbolStores, one sub-directory per symbol, sharing a record layout."""
+
+    def __init__(self, root, fields=BAR_FIELDS, segment_rows=DEFAULT_SEGMENT_ROWS, writable=True):
+        self.root = root
+        self.fields = tuple(fields)
+        self.segment_rows = segment_rows
+        self.writable = writable
+        self._open = {}
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, name, _SCHEMA_FILE)))
+
+    def __getitem__(self, symbol):
+        if symbol not in self._open:
+            self._open[symbol] = SymbolStore(os.path.join(self.root, symbol), fields=self.fields,
+                                             segment_rows=self.segment_rows, writable=self.writable)
+        return self._open[symbol]
+
+    def close(self):
+        for store in self._open.values():
+            store.close()
+        self._open = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
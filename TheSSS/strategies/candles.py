@@ -0,0 +1,69 @@
+import numpy as np
+
+CANDLE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity ring buffer of candles stored as packed float64 columns.
+    Every value is written twice (slot i and i + capacity), so the last n
+    candles of any field are always one contiguous slice: window() returns a
+    zero-copy view and append() is O(1).
+    """
+
+    def __init__(self, capacity=1024):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros((len(CANDLE_FIELDS), 2 * capacity), dtype=np.float64)
+        self._fields = {name: i for i, name in enumerate(CANDLE_FIELDS)}
+        self._next = 0
+        self._size = 0
+
+    @classmethod
+    def from_candles(cls, candles, capacity=None):
+        buffer = cls(capacity or max(len(candles), 1))
+        buffer.extend(candles)
+        return buffer
+
+    def __len__(self):
+        return self._size
+
+    def append(self, open, high, low, close, volume=0.0):
+        column = self._data[:, self._next]
+        column[:] = (open, high, low, close, volume)
+        self._data[:, self._next + self.capacity] = column
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def append_candle(self, candle):
+        self.append(candle['open'], candle['high'], candle['low'], candle['close'], candle.get('volume', 0.0))
+
+    def extend(self, candles):
+        for candle in candles:
+            self.append_candle(candle)
+
+    def window(self, field, n=None):
+        # View of the last n values (all stored values when n is None or larger than the buffer)
+        n = self._size if n is None else min(n, self._size)
+        end = self._next + self.capacity
+        return self._data[self._fields[field], end - n:end]
+
+    def opens(self, n=None):
+        return self.window('open', n)
+
+    def highs(self, n=None):
+        return self.window('high', n)
+
+    def lows(self, n=None):
+        return self.window('low', n)
+
+    def closes(self, n=None):
+        return self.window('close', n)
+
+    def __getitem__(self, i):
+        # Single candle as a dict, for code that still indexes candles[-1]['close']
+        if not -self._size <= i < self._size:
+            raise IndexError("candle index out of range")
+        position = (self._next + self.capacity - self._size + (i % self._size))
+        return {name: float(self._data[j, position]) for name, j in self._fields.items()}
@@ -0,0 +1,90 @@
+import statistics
+from collections import deque
+
+
+def window_mean(values, period):
+    """
+    Mean of the last `period` values with exactly the arithmetic of the
+    original calculate_sma: statistics.mean while fewer values exist, then
+    builtin sum() / period. SMA ties decide signals, so the result must be
+    bit-identical rather than merely close.
+    """
+    if len(values) < period:
+        return statistics.mean(values)
+    return sum(values) / period
+
+
+class RollingMean:
+    # Mean of the last `period` values held in a bounded deque. The exact sum
+    # is recomputed once per update (period additions) and cached for reads.
+    def __init__(self, period):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self._value = None
+
+    def update(self, value):
+        self.values.append(value)
+        self._value = window_mean(self.values, self.period)
+
+    @property
+    def value(self):
+        return self._value
+
+
+class RollingExtreme:
+    # Monotonic deque of (position, value) pairs; the front is always the
+    # max (or min) of the last `window` values, so queries are O(1).
+    def __init__(self, window, mode='max'):
+        if mode not in ('max', 'min'):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.window = window
+        self.mode = mode
+        self.candidates = deque()
+        self.count = 0
+
+    def update(self, value):
+        if self.mode == 'max':
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.count, value))
+        self.count += 1
+        while self.candidates[0][0] <= self.count - 1 - self.window:
+            self.candidates.popleft()
+
+    @property
+    def value(self):
+        return self.candidates[0][1] if self.candidates else None
+
+
+class IndicatorEngine:
+    """
+    Streaming counterpart of calculate_sma, calculate_dynamic_resistance and
+    calculate_dynamic_support. Call update() once per closed candle and read
+    sma/resistance/support in O(1); the SMA matches calculate_sma bit for bit.
+    Keep one engine per symbol.
+    """
+
+    def __init__(self, sma_period=40, resistance_window=36, support_window=78):
+        self._sma = RollingMean(sma_period)
+        self._resistance = RollingExtreme(resistance_window, mode='max')
+        self._support = RollingExtreme(support_window, mode='min')
+
+    def update(self, candle):
+        self._sma.update(candle['close'])
+        self._resistance.update(candle['high'])
+        self._support.update(candle['low'])
+
+    @property
+    def sma(self):
+        return self._sma.value
+
+    @property
+    def resistance(self):
+        return self._resistance.value
+
+    @property
+    def support(self):
+        return self._support.value
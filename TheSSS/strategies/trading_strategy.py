@@ -1,5 +1,12 @@
+import os
+import sys
 import logging
 import statistics
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from TheSSS.strategies.indicators import IndicatorEngine, window_mean
+from TheSSS.strategies.candles import CandleBuffer
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)
@@ -36,15 +43,17 @@ class TradeManager:
 
 def calculate_sma(candles, period=40):
     # Calculate the Simple Moving Average over the given period.
-    if len(candles) < period:
-        # If not enough candles, use the average of available data.
-        return statistics.mean([c['close'] for c in candles])
-    closing_prices = [c['close'] for c in candles[-period:]]
-    return sum(closing_prices) / period
+    if isinstance(candles, CandleBuffer):
+        # Last `period` closes (or all of them if fewer), summed exactly like a list of candles.
+        return window_mean(candles.closes(period).tolist(), period)
+    # If not enough candles, window_mean averages the available data.
+    return window_mean([c['close'] for c in candles[-period:]], period)
 
 def calculate_dynamic_resistance(candles):
     # Calculate resistance as the highest high over the last 3 hours.
     # For a 5‑minute chart, 3 hours equals 36 candles.
+    if isinstance(candles, CandleBuffer):
+        return float(candles.highs(36).max())
     relevant = candles[-36:] if len(candles) >= 36 else candles
     resistance = max(c['high'] for c in relevant)
     return resistance
@@ -52,6 +61,8 @@ def calculate_dynamic_resistance(candles):
 def calculate_dynamic_support(candles):
     # Calculate support as the lowest low over the most recent trading day.
     # Here we assume a trading day is roughly 6.5 hours (78 candles) for example purposes.
+    if isinstance(candles, CandleBuffer):
+        return float(candles.lows(78).min())
     relevant = candles[-78:] if len(candles) >= 78 else candles
     support = min(c['low'] for c in relevant)
     return support
@@ -64,13 +75,16 @@ def evaluate_trade_signal(candles, support, resistance, sma):
     """
     if len(candles) < 3:
         return "HOLD"
-    last_three = candles[-3:]
+    if isinstance(candles, CandleBuffer):
+        last_three = candles.closes(3).tolist()
+    else:
+        last_three = [c['close'] for c in candles[-3:]]
     # Buy conditions:
-    buy_support = all(c['close'] >= support and c['close'] >= sma for c in last_three)
-    buy_resistance = all(c['close'] >= resistance and c['close'] >= sma for c in last_three)
+    buy_support = all(close >= support and close >= sma for close in last_three)
+    buy_resistance = all(close >= resistance and close >= sma for close in last_three)
     # Sell conditions:
-    sell_support = all(c['close'] <= support and c['close'] <= sma for c in last_three)
-    sell_resistance = all(c['close'] <= resistance and c['close'] <= sma for c in last_three)
+    sell_support = all(close <= support and close <= sma for close in last_three)
+    sell_resistance = all(close <= resistance and close <= sma for close in last_three)
 
     if buy_support or buy_resistance:
         return "BUY"
@@ -79,10 +93,71 @@ def evaluate_trade_signal(candles, support, resistance, sma):
     else:
         return "HOLD"
 
+def _builtin_window_sum(values, window):
+    # Sum of every `window`-length run, reproducing the builtin sum() bit for bit so
+    # vectorized SMA comparisons tie-break exactly like calculate_sma. Python 3.12+
+    # sums floats with Neumaier compensation; earlier versions add sequentially.
+    count = len(values) - window + 1
+    total = values[:count].copy()
+    compensation = np.zeros(count)
+    compensated = sys.version_info >= (3, 12)
+    for k in range(1, window):
+        x = values[k:k + count]
+        t = total + x
+        if compensated:
+            compensation += np.where(np.abs(total) >= np.abs(x), (total - t) + x, (x - t) + total)
+        total = t
+    if compensated:
+        total = np.where((compensation != 0) & np.isfinite(compensation), total + compensation, total)
+    return total
+
+def rolling_sma_series(close, period=40):
+    # calculate_sma evaluated at every bar: mean of what is available until `period` bars exist.
+    close = np.asarray(close, dtype=np.float64)
+    sma = np.empty_like(close)
+    warmup = min(period - 1, len(close))
+    for i in range(warmup):
+        sma[i] = statistics.mean(close[:i + 1].tolist())
+    if len(close) >= period:
+        sma[period - 1:] = _builtin_window_sum(close, period) / period
+    return sma
+
+def generate_trade_signals(high, low, close, sma_period=40, resistance_window=36, support_window=78, confirm_bars=3):
+    """
+    Vectorized evaluate_trade_signal over a whole history. For every bar the
+    support (rolling low), resistance (rolling high) and SMA are taken as of
+    that bar, and the last `confirm_bars` closes must all satisfy the buy or
+    sell condition. With the defaults this matches calling the per-bar
+    functions on candles[:i + 1] for every i.
+    """
+    high = pd.Series(np.asarray(high, dtype=np.float64))
+    low = pd.Series(np.asarray(low, dtype=np.float64))
+    close_values = np.asarray(close, dtype=np.float64)
+    close = pd.Series(close_values)
+
+    resistance = high.rolling(resistance_window, min_periods=1).max().to_numpy()
+    support = low.rolling(support_window, min_periods=1).min().to_numpy()
+    sma = rolling_sma_series(close_values, sma_period)
+    # all(c >= level) over the window is equivalent to min(window) >= level
+    lowest = close.rolling(confirm_bars, min_periods=confirm_bars).min().to_numpy()
+    highest = close.rolling(confirm_bars, min_periods=confirm_bars).max().to_numpy()
+
+    with np.errstate(invalid='ignore'):
+        above_sma = lowest >= sma
+        below_sma = highest <= sma
+        buy = above_sma & ((lowest >= support) | (lowest >= resistance))
+        sell = below_sma & ((highest <= support) | (highest <= resistance))
+
+    signals = np.full(len(close_values), "HOLD", dtype='<U4')
+    signals[sell & ~buy] = "SELL"
+    signals[buy] = "BUY"
+    return signals
+
 def main():
     # In a live system, candle data would be retrieved using MT5's API.
     # Here we simulate 100 M5 candles with dummy data for demonstration.
-    candles = []
+    candles = CandleBuffer(capacity=128)
+    engine = IndicatorEngine(sma_period=40, resistance_window=36, support_window=78)
     for i in range(100):
         # Simulated price oscillations.
         base = 1.1000 + 0.001 * (i % 5)
@@ -92,12 +167,14 @@ def main():
             'low':  base - 0.0005,
             'close': base + 0.0002 if (i % 2 == 0) else base - 0.0002
         }
-        candles.append(candle)
-
-    # Calculate dynamic support, resistance, and 40‑period SMA.
-    resistance = calculate_dynamic_resistance(candles)
-    support = calculate_dynamic_support(candles)
-    sma = calculate_sma(candles, period=40)
+        candles.append_candle(candle)
+        # Indicators are updated once per closed candle instead of rescanning the window.
+        engine.update(candle)
+
+    # Dynamic support, resistance, and 40‑period SMA from the streaming engine.
+    resistance = engine.resistance
+    support = engine.support
+    sma = engine.sma
 
     logger.info("Calculated Resistance: %s", resistance)
     logger.info("Calculated Support: %s", support)
@@ -1,6 +1,10 @@
+import os
+import sys
 from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import backtrader as bt
 import pandas as pd
+from TheSSS.market_data import load_ohlcv
 
 class Backtest:
     def __init__(self, data_file, strategy, cash=10000, commission=0.001):
@@ -11,7 +15,7 @@ class Backtest:
         self.cerebro = bt.Cerebro()
 
     def load_data(self):
-        data = pd.read_csv(self.data_file, parse_dates=True, index_col='date')
+        data = load_ohlcv(self.data_file, index_col='date')
         data_feed = bt.feeds.PandasData(dataname=data)
         self.cerebro.adddata(data_feed)
 
@@ -27,6 +31,43 @@ class Backtest:
         self.cerebro.run()
         print('Ending Portfolio Value: %.2f' % self.cerebro.broker.getvalue())
 
+class EquityCurve(bt.Analyzer):
+    # Broker value at the close of every bar
+    def start(self):
+        self.values = []
+
+    def next(self):
+        self.values.append((self.data.datetime.datetime(0), self.strategy.broker.getvalue()))
+
+    def get_analysis(self):
+        return pd.Series(dict(self.values), name='equity', dtype='float64')
+
+def run_strategy(data, strategy, params=None, cash=10000, commission=0.001, equity_curve=False):
+    """Run one strategy over an already-loaded OHLCV DataFrame and return summary metrics."""
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=data))
+    cerebro.addstrategy(strategy, **(params or {}))
+    cerebro.broker.setcash(cash)
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    if equity_curve:
+        cerebro.addanalyzer(EquityCurve, _name='equity')
+
+    result = cerebro.run()[0]
+    drawdown = result.analyzers.drawdown.get_analysis()
+    trades = result.analyzers.trades.get_analysis()
+    final_value = cerebro.broker.getvalue()
+    metrics = {
+        'final_value': final_value,
+        'return_pct': (final_value / cash - 1.0) * 100.0,
+        'max_drawdown': drawdown.max.drawdown,
+        'trade_count': trades.get('total', {}).get('total', 0),
+    }
+    if equity_curve:
+        metrics['equity'] = result.analyzers.equity.get_analysis()
+    return metrics
+
 if __name__ == '__main__':
     from strategies.sample_strategy import SampleStrategy  # Adjust the import based on your strategy class name
     backtest = Backtest(data_file='data/historical_data.csv', strategy=SampleStrategy)
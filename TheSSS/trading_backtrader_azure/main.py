@@ -3,6 +3,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import backtrader as bt
 import pandas as pd
+from TheSSS.market_data import load_ohlcv
 from strategies.sample_strategy import RLBacktraderStrategy
 
 def run_backtest():
@@ -13,11 +14,7 @@ def run_backtest():
     current_dir = os.path.dirname(os.path.abspath(__file__))
     data_path = os.path.join(current_dir, 'data', 'historical_data.csv')
     
-    data = pd.read_csv(
-        data_path,
-        parse_dates=['date'],
-        index_col='date'
-    )
+    data = load_ohlcv(data_path, index_col='date')
     
     # Add data feed
     data_feed = bt.feeds.PandasData(
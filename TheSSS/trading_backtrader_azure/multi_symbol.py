@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import pandas as pd
+from TheSSS.market_data import load_ohlcv
+from TheSSS.trading_backtrader_azure.backtest import run_strategy
+from TheSSS.trading_backtrader_azure import strategies
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(BASE_DIR))
+
+
+def _backtest_symbol(symbol, data_file, strategy, params, cash, commission, index_col):
+    # Runs in a worker process: each symbol loads its own feed and runs its own Cerebro
+    started = time.perf_counter()
+    try:
+        data = load_ohlcv(data_file, index_col=index_col)
+        metrics = run_strategy(data, strategy, params=params, cash=cash, commission=commission, equity_curve=True)
+    except Exception as e:
+        return {'symbol': symbol, 'error': f"{type(e).__name__}: {e}", 'seconds': time.perf_counter() - started}
+    return {'symbol': symbol, **metrics, 'error': None, 'seconds': time.perf_counter() - started}
+
+
+def portfolio_summary(per_symbol, equity_curves, cash_per_symbol):
+    """Aggregate per-symbol results into one equally-funded portfolio with a combined equity curve."""
+    ok = per_symbol[per_symbol['error'].isna()]
+    starting_value = cash_per_symbol * len(ok)
+    summary = {
+        'symbols': len(ok),
+        'failed': per_symbol.loc[per_symbol['error'].notna(), 'symbol'].tolist(),
+        'starting_value': starting_value,
+        'final_value': float(ok['final_value'].sum()) if len(ok) else 0.0,
+        'trade_count': int(ok['trade_count'].sum()) if len(ok) else 0,
+        'max_drawdown': 0.0,
+    }
+    summary['return_pct'] = (summary['final_value'] / starting_value - 1.0) * 100.0 if starting_value else 0.0
+
+    if equity_curves:
+        # Symbols trade on different calendars: carry each value forward, and count cash before a symbol starts
+        combined = pd.concat(equity_curves, axis=1).sort_index().ffill().fillna(cash_per_symbol).sum(axis=1)
+        peak = combined.cummax()
+        summary['max_drawdown'] = float(((peak - combined) / peak).max() * 100.0)
+        summary['equity'] = combined
+    return summary
+
+
+def run_multi_symbol(data_files, strategy, params=None, cash_per_symbol=10000, commission=0.001,
+                     max_workers=None, index_col='date'):
+    """
+    Backtest each symbol in `data_files` ({symbol: csv path}) in its own worker
+    process, at most `max_workers` at a time, and return (per-symbol table,
+    portfolio summary).
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(data_files), 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_backtest_symbol, symbol, path, strategy, params, cash_per_symbol, commission, index_col)
+            for symbol, path in data_files.items()
+        ]
+        rows = [future.result() for future in futures]
+
+    equity_curves = [row.pop('equity').rename(row['symbol']) for row in rows if 'equity' in row]
+    per_symbol = pd.DataFrame(rows)
+    return per_symbol, portfolio_summary(per_symbol, equity_curves, cash_per_symbol)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent multi-symbol backtest")
+    parser.add_argument('--symbols', nargs='*', help="defaults to the symbols in config/mt5_config.json")
+    parser.add_argument('--data-dir', default=os.path.join(ROOT_DIR, 'data'))
+    parser.add_argument('--pattern', default="{symbol}_historical_data.csv")
+    parser.add_argument('--index-col', default='date')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if not symbols:
+        with open(os.path.join(ROOT_DIR, 'config', 'mt5_config.json'), 'r') as file:
+            symbols = json.load(file).get('symbols', [])
+    with open(os.path.join(BASE_DIR, 'config', 'backtrader_config.json'), 'r') as file:
+        strategy_config = json.load(file)['strategy']
+
+    data_files = {symbol: os.path.join(args.data_dir, args.pattern.format(symbol=symbol)) for symbol in symbols}
+    per_symbol, portfolio = run_multi_symbol(
+        data_files,
+        getattr(strategies, strategy_config['name']),
+        params=strategy_config.get('params'),
+        max_workers=args.workers,
+        index_col=args.index_col
+    )
+    print(per_symbol.to_string(index=False))
+    print("\n=== Portfolio ===")
+    for key, value in portfolio.items():
+        if key != 'equity':
+            print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
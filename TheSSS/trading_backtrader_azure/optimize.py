@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import pandas as pd
+from TheSSS.market_data import load_ohlcv
+from TheSSS.trading_backtrader_azure.backtest import run_strategy
+from TheSSS.trading_backtrader_azure import strategies
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(BASE_DIR, 'config', 'backtrader_config.json')
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'results', 'optimization_results.csv')
+
+# Set once per worker process by the pool initializer so combos never re-load the feed
+_worker_data = None
+
+
+def load_config(config_path=DEFAULT_CONFIG):
+    with open(config_path, 'r') as file:
+        return json.load(file)
+
+
+def expand_grid(parameters):
+    # Cartesian product of the grid, keeping the parameter order from the config
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*(parameters[n] for n in names))]
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _run_combo(strategy, params, cash, commission):
+    try:
+        metrics = run_strategy(_worker_data, strategy, params=params, cash=cash, commission=commission)
+    except Exception as e:
+        # e.g. an indicator period longer than the feed; keep the rest of the grid running
+        return {**params, 'final_value': float('nan'), 'error': f"{type(e).__name__}: {e}"}
+    return {**params, **metrics, 'error': None}
+
+
+def rank_results(rows):
+    results = pd.DataFrame(rows)
+    results = results.sort_values(['final_value', 'max_drawdown'], ascending=[False, True],
+                                  na_position='last').reset_index(drop=True)
+    results.insert(0, 'rank', range(1, len(results) + 1))
+    return results
+
+
+def optimize(data, strategy, grid, cash=10000, commission=0.001, max_workers=None):
+    """
+    Backtest every parameter combination in `grid` across a process pool and
+    return a ranked results table. `data` is loaded once by the caller and
+    handed to each worker when it starts.
+    """
+    combos = expand_grid(grid)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(data,)) as pool:
+        futures = [pool.submit(_run_combo, strategy, params, cash, commission) for params in combos]
+        rows = [future.result() for future in futures]
+    return rank_results(rows)
+
+
+def run_from_config(config_path=DEFAULT_CONFIG, output_path=DEFAULT_OUTPUT, max_workers=None,
+                    cash=10000, commission=0.001):
+    config = load_config(config_path)
+    data_file = config['data_feed']['file_path']
+    if not os.path.isabs(data_file):
+        data_file = os.path.join(BASE_DIR, data_file)
+    strategy = getattr(strategies, config['strategy']['name'])
+
+    optimization = config.get('optimization', {})
+    if optimization.get('enabled'):
+        grid = optimization['parameters']
+    else:
+        grid = {name: [value] for name, value in config['strategy'].get('params', {}).items()}
+
+    data = load_ohlcv(data_file, index_col='date')
+    start = time.perf_counter()
+    results = optimize(data, strategy, grid, cash=cash, commission=commission, max_workers=max_workers)
+    print(f"Evaluated {len(results)} parameter combinations in {time.perf_counter() - start:.2f}s")
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        results.to_csv(output_path, index=False)
+        print(f"Results written to {output_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parameter-grid optimization from backtrader_config.json")
+    parser.add_argument('--config', default=DEFAULT_CONFIG)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    results = run_from_config(args.config, args.output, max_workers=args.workers)
+    print(results.head(10).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
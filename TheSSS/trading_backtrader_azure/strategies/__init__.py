@@ -1,3 +1,4 @@
-from .sample_strategy import RLBacktraderStrategy
+from .sample_strategy import RLBacktraderStrategy, SampleStrategy
+from .signal_strategy import SignalStrategy
 
-__all__ = ['RLBacktraderStrategy']
+__all__ = ['RLBacktraderStrategy', 'SampleStrategy', 'SignalStrategy']
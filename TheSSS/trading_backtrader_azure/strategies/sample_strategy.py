@@ -1,35 +1,106 @@
+import logging
 import backtrader as bt
+import numpy as np
 import pandas as pd
+from TheSSS.market_data import load_ohlcv
 from TheSSS.R1_V.rl_trader import RLTrader
+from TheSSS.R1_V.decision_cache import DecisionCache
+
+logger = logging.getLogger(__name__)
+
+class SampleStrategy(bt.Strategy):
+    # Long-only SMA trend strategy with percentage stop loss and take profit,
+    # parameterized to match backtrader_config.json
+    params = (
+        ('sma_period', 5),
+        ('stop_loss', 0.02),
+        ('take_profit', 0.05)
+    )
+
+    def __init__(self):
+        self.sma = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.sma_period)
+        self.entry_price = None
+
+    def next(self):
+        price = self.data.close[0]
+        if not self.position:
+            if price > self.sma[0]:
+                self.buy()
+        elif self.entry_price is not None:
+            if (price <= self.entry_price * (1 - self.params.stop_loss) or
+                    price >= self.entry_price * (1 + self.params.take_profit) or
+                    price < self.sma[0]):
+                self.close()
+
+    def notify_order(self, order):
+        if order.status in [order.Completed]:
+            self.entry_price = order.executed.price if order.isbuy() else None
 
 class RLBacktraderStrategy(bt.Strategy):
     params = (
         ('training_episodes', 10),
-        ('historical_data_path', 'TheSSS/trading-backtrader-azure/data/historical_data.csv')
+        ('historical_data_path', 'TheSSS/trading-backtrader-azure/data/historical_data.csv'),
+        # Decision cache: LRU size, optional TTL in seconds, and bucket widths for the state key
+        ('cache_size', 4096),
+        ('cache_ttl', None),
+        ('rsi_bucket', 5.0),
+        ('macd_bucket', 0.0001),
+        ('price_bucket', 0.001)
     )
 
     def __init__(self):
-        # Initialize RL Trader with Backtrader integration
-        self.rl_trader = RLTrader(
-            client=None,
-            symbol=self.data._name,
-            timeframe='M1',
-            data_path=self.params.historical_data_path,
-            train_interval=1
-        )
+        # Initialize RL Trader with Backtrader integration; reuse the feed's frame when it has one
+        dataname = self.data.p.dataname
+        if isinstance(dataname, pd.DataFrame):
+            history = dataname
+        else:
+            history = load_ohlcv(self.params.historical_data_path, index_col='date')
+        self.rl_trader = RLTrader(train_interval=1, data=history)
         self.rl_trader.initialize_trainer()
+
+        # Repeated (quantized) states are answered from the cache instead of the action provider
+        self.decision_cache = DecisionCache(
+            maxsize=self.params.cache_size,
+            ttl=self.params.cache_ttl,
+            buckets={'rsi': self.params.rsi_bucket, 'macd': self.params.macd_bucket, 'price': self.params.price_bucket}
+        )
+        # Provider whose decisions the cache holds; a retrain swaps in a new one
+        self._cached_provider = self.rl_trader.action_provider
         
         # Trackers for RL performance
         self.episode_rewards = []
         self.trade_history = []
 
+    @property
+    def cache_hits(self):
+        return self.decision_cache.hits
+
+    @property
+    def cache_misses(self):
+        return self.decision_cache.misses
+
+    def current_state(self):
+        # Market state for the current bar from the trader's precomputed feature columns
+        market = self.rl_trader.market
+        position = int(np.searchsorted(market.index, np.datetime64(self.data.datetime.datetime(0)), side='right')) - 1
+        return market.state(min(max(position, 0), len(market) - 1))
+
     def next(self):
+        state = self.current_state()
+
         # Train RL model periodically
         if len(self) % 1000 == 0:  # Train every 1000 bars
-            self.rl_trader.train()
+            self.rl_trader.train(state)
             
-        # Get RL action
-        action = self.rl_trader.get_action()
+        # Get RL action; cached decisions are only valid for the deterministic provider that made them
+        provider = self.rl_trader.action_provider
+        if provider is not self._cached_provider:
+            self.decision_cache.clear()
+            self._cached_provider = provider
+        if provider.deterministic:
+            action = self.decision_cache.get_or_compute(state, self.rl_trader.get_action)
+        else:
+            action = self.rl_trader.get_action(state)
         
         # Execute trading logic
         if action == 'BUY' and not self.position:
@@ -59,7 +130,11 @@ class RLBacktraderStrategy(bt.Strategy):
             self.episode_rewards.append(reward)
 
     def stop(self):
-        # Final training and cleanup
-        print("\n=== Final Training ===")
-        self.rl_trader.train()
-        print(f"Total Cumulative Reward: {self.rl_trader.total_reward:.2f}")
+        # Final training; shutdown drops queued retrains, so let the background worker finish them first
+        logger.info("=== Final Training ===")
+        self.rl_trader.train(self.current_state())
+        if self.rl_trader.retrain_scheduler is not None:
+            self.rl_trader.retrain_scheduler.wait_idle()
+        self.rl_trader.shutdown()
+        logger.info("Total Cumulative Reward: %.2f", self.rl_trader.total_reward)
+        logger.info("Decision cache: %s", self.decision_cache.stats())
@@ -0,0 +1,14 @@
+import backtrader as bt
+
+class SignalStrategy(bt.Strategy):
+    # Follows a precomputed target position per bar (+1 long, -1 short, 0 flat) scaled by stake.
+    # Orders placed on a bar fill at the next bar's open, which is what vector_backtest models.
+    params = (
+        ('positions', None),
+        ('stake', 1)
+    )
+
+    def next(self):
+        target = float(self.params.positions[len(self) - 1]) * self.params.stake
+        if self.position.size != target:
+            self.order_target_size(target=target)
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import numpy as np
+import pandas as pd
+from TheSSS.market_data import load_ohlcv
+from TheSSS.R1_V.rewards import encode_actions
+from TheSSS.strategies.trading_strategy import generate_trade_signals
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA = os.path.join(BASE_DIR, 'data', 'historical_data.csv')
+
+TRADE_COLUMNS = ['entry_time', 'exit_time', 'size', 'entry_price', 'exit_price', 'pnl', 'commission', 'pnlcomm']
+
+
+def signals_to_positions(signals, hold='keep'):
+    """
+    Turn BUY/SELL/HOLD labels (or +1/-1/0 codes) into a target position per
+    bar. hold='keep' holds the previous position through HOLD bars, as a
+    signal strategy would; hold='flat' closes it, matching RLTrader's reward
+    where HOLD carries no exposure.
+    """
+    codes = encode_actions(signals).astype(np.float64)
+    if hold == 'flat':
+        return codes
+    if hold != 'keep':
+        raise ValueError(f"Unknown hold mode: {hold}")
+    last = np.where(codes != 0, np.arange(len(codes)), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, codes[np.maximum(last, 0)], 0.0)
+
+
+def _trade_list(held, open_, index, stake, commission):
+    # A trade is a run of bars holding the same non-zero position; a reversal closes one and opens the next
+    previous = np.concatenate([[0.0], held[:-1]])
+    changes = np.flatnonzero(held != previous)
+    starts = changes[held[changes] != 0]
+    following = np.searchsorted(changes, starts, side='right')
+    closed = following < len(changes)
+    exits = np.where(closed, changes[np.minimum(following, len(changes) - 1)], -1)
+
+    size = held[starts] * stake
+    entry_price = open_[starts]
+    exit_price = np.where(closed, open_[np.maximum(exits, 0)], np.nan)
+    pnl = np.where(closed, (exit_price - entry_price) * size, 0.0)
+    fees = np.abs(size) * entry_price * commission + np.where(closed, np.abs(size) * exit_price * commission, 0.0)
+    return pd.DataFrame({
+        'entry_time': index[starts],
+        'exit_time': pd.Series(index[np.maximum(exits, 0)]).where(closed).to_numpy(),
+        'size': size,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'pnl': pnl,
+        'commission': fees,
+        'pnlcomm': pnl - fees,
+    }, columns=TRADE_COLUMNS)
+
+
+def vector_backtest(data, positions, cash=10000, commission=0.001, stake=1):
+    """
+    Array-based equivalent of run_strategy(data, SignalStrategy, ...).
+    positions[i] is the target (+1/-1/0, times `stake` units) decided at the
+    close of bar i; it is filled at the open of bar i + 1 with percentage
+    commission on the traded value, like backtrader's default broker. A
+    target set on the final bar never fills. Returns the run_strategy
+    metrics plus the equity curve and the trade list.
+    """
+    open_ = data['open'].to_numpy(dtype=np.float64)
+    close = data['close'].to_numpy(dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    if len(positions) != len(close):
+        raise ValueError(f"Got {len(positions)} positions for {len(close)} bars")
+
+    held = np.zeros(len(close))
+    held[1:] = positions[:-1]
+    traded = np.diff(held, prepend=0.0) * stake
+    cash_flow = -traded * open_ - np.abs(traded) * open_ * commission
+    equity = cash + np.cumsum(cash_flow) + held * stake * close
+
+    peak = np.maximum.accumulate(equity)
+    trades = _trade_list(held, open_, data.index, stake, commission)
+    final_value = float(equity[-1]) if len(equity) else float(cash)
+    return {
+        'final_value': final_value,
+        'return_pct': (final_value / cash - 1.0) * 100.0,
+        'max_drawdown': float(((peak - equity) / peak).max() * 100.0) if len(equity) else 0.0,
+        'trade_count': len(trades),
+        'equity': pd.Series(equity, index=data.index, name='equity'),
+        'trades': trades,
+    }
+
+
+def screen_trade_signals(data, hold='keep', cash=10000, commission=0.001, stake=1, **signal_params):
+    """Vectorized backtest of generate_trade_signals over a whole OHLC frame."""
+    signals = generate_trade_signals(data['high'], data['low'], data['close'], **signal_params)
+    return vector_backtest(data, signals_to_positions(signals, hold=hold), cash=cash, commission=commission,
+                           stake=stake)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized backtest of the support/resistance trade signals")
+    parser.add_argument('--data', default=DEFAULT_DATA)
+    parser.add_argument('--sma-period', type=int, default=40)
+    parser.add_argument('--resistance-window', type=int, default=36)
+    parser.add_argument('--support-window', type=int, default=78)
+    parser.add_argument('--confirm-bars', type=int, default=3)
+    parser.add_argument('--hold', choices=('keep', 'flat'), default='keep')
+    parser.add_argument('--stake', type=float, default=1)
+    parser.add_argument('--validate', action='store_true', help="re-run the same positions through Cerebro")
+    args = parser.parse_args()
+
+    data = load_ohlcv(args.data, index_col='date')
+    signals = generate_trade_signals(data['high'], data['low'], data['close'], sma_period=args.sma_period,
+                                     resistance_window=args.resistance_window, support_window=args.support_window,
+                                     confirm_bars=args.confirm_bars)
+    positions = signals_to_positions(signals, hold=args.hold)
+
+    start = time.perf_counter()
+    result = vector_backtest(data, positions, stake=args.stake)
+    print(f"Vectorized backtest of {len(data)} bars in {(time.perf_counter() - start) * 1000:.2f} ms")
+    for key in ('final_value', 'return_pct', 'max_drawdown', 'trade_count'):
+        print(f"{key}: {result[key]}")
+    print(result['trades'].to_string(index=False))
+
+    if args.validate:
+        from TheSSS.trading_backtrader_azure.backtest import run_strategy
+        from TheSSS.trading_backtrader_azure.strategies import SignalStrategy
+
+        start = time.perf_counter()
+        reference = run_strategy(data, SignalStrategy, params={'positions': positions, 'stake': args.stake})
+        print(f"\nCerebro run in {(time.perf_counter() - start) * 1000:.2f} ms")
+        for key in ('final_value', 'max_drawdown', 'trade_count'):
+            print(f"{key}: {reference[key]} (vectorized {result[key]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from TheSSS.R1_V.features import add_indicator_columns
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.rl_trader import RLTrader
+
+
+def synthetic_history(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0002, bars))
+    spread = np.abs(rng.normal(0, 0.0001, bars))
+    df = pd.DataFrame({
+        'open': close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(1, 1000, bars).astype('float64')
+    }, index=pd.date_range('2020-01-01', periods=bars, freq='min'))
+    return add_indicator_columns(df)
+
+
+def bench_iterrows(df):
+    # Previous engine: one Series per bar from iterrows plus another iloc lookup in get_action
+    start = time.perf_counter()
+    for idx, (_, row) in enumerate(df.iterrows()):
+        state = RLTrader.get_market_state(None, row)
+        action_state = RLTrader.get_market_state(None, df.iloc[idx % len(df)])
+    return time.perf_counter() - start
+
+
+def bench_arrays(df):
+    start = time.perf_counter()
+    market = MarketArrays.from_frame(df)
+    for state, next_state in market.iter_transitions():
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-step overhead of the RLTrader training loop")
+    parser.add_argument('--bars', type=int, default=50000)
+    args = parser.parse_args()
+
+    df = synthetic_history(args.bars)
+    old = bench_iterrows(df)
+    new = bench_arrays(df)
+    print(f"bars: {args.bars}")
+    print(f"iterrows + iloc: {old / args.bars * 1e6:8.2f} us/step ({old:.2f} s)")
+    print(f"MarketArrays:    {new / args.bars * 1e6:8.2f} us/step ({new:.2f} s)")
+    print(f"speedup:         {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
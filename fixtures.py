@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from TheSSS.R1_V.features import add_indicator_columns
+
+# Shared builders for the test modules; not collected as tests itself
+
+
+class FakeClock:
+    """Clock for code that takes a `clock` callable; tests move time by setting `now`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def random_walk(bars, seed=0, scale=0.0005, start=1.1):
+    rng = np.random.default_rng(seed)
+    return start + np.cumsum(rng.normal(0, scale, bars))
+
+
+def ohlcv_frame(close, spread=0.0002, volume=100.0, freq='min', start='2024-01-01'):
+    # Bars whose open and close are `close`, with high/low `spread` either side, on a regular timestamp index
+    close = np.asarray(close, dtype=np.float64)
+    index = pd.date_range(start, periods=len(close), freq=freq, name='timestamp')
+    return pd.DataFrame({'open': close, 'high': close + spread, 'low': close - spread,
+                         'close': close, 'volume': volume}, index=index)
+
+
+def make_frame(bars=120, seed=0):
+    # Random-walk history with random volume and the indicator columns MarketArrays reads
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, bars))
+    return add_indicator_columns(ohlcv_frame(close, spread=0.0003, volume=rng.uniform(50, 150, bars)))
@@ -1,37 +1,55 @@
-import time
-import MetaTrader5 as mt5
+import os
+import json
+import queue
+import argparse
 from datetime import datetime
 from colorama import Fore, init
+from TheSSS.live.ticks import MT5TickSource, TickService
 
 init(autoreset=True)  # Initialize colorama
 
-def display_live_data(symbol="EURUSD"):
-    if not mt5.initialize():
-        print(Fore.RED + "Failed to initialize MT5 connection")
-        return
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'mt5_config.json')
+
+def load_symbols(config_path=CONFIG_PATH):
+    with open(config_path, 'r') as file:
+        return json.load(file).get('symbols', ["EURUSD"])
+
+def format_tick(tick):
+    tick_time = datetime.fromtimestamp(tick.time_msc / 1000).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return (f"{Fore.YELLOW}[{tick_time}] {tick.symbol:<8} "
+            f"{Fore.GREEN}Bid: {tick.bid:.5f} | Ask: {tick.ask:.5f} "
+            f"{Fore.BLUE}Spread: {(tick.ask - tick.bid):.5f} "
+            f"{Fore.MAGENTA}Volume: {tick.volume:g}")
+
+def display_live_data(symbols=None, poll_interval=0.1, max_backoff=5.0):
+    # One scheduler thread polls every symbol; this thread only prints what it publishes
+    symbols = symbols or load_symbols()
+    service = TickService(MT5TickSource(), symbols, poll_interval=poll_interval, max_backoff=max_backoff)
+    subscription = service.subscribe(maxsize=10000)
+    service.start()
 
     try:
-        print(Fore.CYAN + "\nLive Market Data Stream - CTRL+C to exit\n")
-        while True:
-            tick = mt5.symbol_info_tick(symbol)
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            if tick is None:
-                print(Fore.RED + f"[{current_time}] Error fetching data")
+        print(Fore.CYAN + f"\nLive Market Data Stream for {', '.join(symbols)} - CTRL+C to exit\n")
+        while service.running:
+            try:
+                tick = subscription.get(timeout=1.0)
+            except queue.Empty:
                 continue
-                
-            print(Fore.YELLOW + f"[{current_time}] {symbol}")
-            print(Fore.GREEN + f"Bid: {tick.bid:.5f} | Ask: {tick.ask:.5f}")
-            print(Fore.BLUE + f"Spread: {(tick.ask - tick.bid):.5f}")
-            print(Fore.MAGENTA + f"Volume: {tick.volume}")
-            print("-" * 40)
-            
-            time.sleep(1)
-            
+            print(format_tick(tick))
+
+        if service.start_failed:
+            print(Fore.RED + "Failed to initialize MT5 connection")
     except KeyboardInterrupt:
         print(Fore.CYAN + "\n\nStopping live data feed...")
     finally:
-        mt5.shutdown()
+        service.stop(timeout=5)
+        if subscription.dropped:
+            print(Fore.RED + f"{subscription.dropped} ticks dropped by a slow console")
 
 if __name__ == "__main__":
-    display_live_data()
+    parser = argparse.ArgumentParser(description="Stream MT5 ticks for many symbols")
+    parser.add_argument('symbols', nargs='*', help="defaults to the symbols in config/mt5_config.json")
+    parser.add_argument('--interval', type=float, default=0.1, help="poll interval for active symbols (s)")
+    parser.add_argument('--max-backoff', type=float, default=5.0, help="poll interval cap for quiet symbols (s)")
+    args = parser.parse_args()
+    display_live_data(args.symbols, poll_interval=args.interval, max_backoff=args.max_backoff)
@@ -4,6 +4,6 @@ from datetime import datetime
 if __name__ == "__main__":
     print(f"Starting RLTrader at {datetime.now()}")
     trader = RLTrader(train_interval=1)
-    print("Running trading with 30-minute time limit...")
+    print("Running trading (TRAINING_MODE=offline runs one full-history epoch, paced keeps the 30-minute limit)...")
     trader.run_trading()
     print(f"Completed at {datetime.now()}")
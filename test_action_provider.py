@@ -0,0 +1,41 @@
+import unittest
+from TheSSS.R1_V.action_provider import (
+    MockActionProvider, OllamaActionProvider, create_action_provider, rule_based_action
+)
+
+
+class TestActionProvider(unittest.TestCase):
+    def setUp(self):
+        self.states = [{'price': 1.1, 'rsi': 20.0}, {'price': 1.2, 'rsi': 80.0}, {'price': 1.3, 'rsi': 50.0}]
+
+    def test_mock_batches_states(self):
+        """Mock backend answers a whole batch in one call"""
+        provider = MockActionProvider()
+        self.assertEqual(provider.get_actions(self.states), ["BUY", "SELL", "HOLD"])
+        self.assertEqual(len(provider.batches), 1)
+
+    def test_mock_scripted_actions(self):
+        """Scripted actions are replayed cyclically across calls"""
+        provider = MockActionProvider(actions=["SELL", "BUY"])
+        self.assertEqual(provider.get_actions(self.states), ["SELL", "BUY", "SELL"])
+        self.assertEqual(provider.get_action(self.states[0]), "BUY")
+
+    def test_ollama_response_parsing(self):
+        """Reasoning blocks are ignored and short answers fall back to the RSI rule"""
+        provider = OllamaActionProvider(host="http://127.0.0.1:9")
+        text = "<think>maybe BUY, maybe SELL</think>\n1: SELL\n2: hold"
+        self.assertEqual(provider._parse_actions(text, self.states), ["SELL", "HOLD", "HOLD"])
+
+    def test_ollama_unreachable_falls_back(self):
+        """An unreachable server degrades to the rule-based policy"""
+        provider = OllamaActionProvider(host="http://127.0.0.1:9", timeout=1)
+        self.assertEqual(provider.get_actions(self.states), [rule_based_action(s) for s in self.states])
+
+    def test_factory(self):
+        self.assertIsInstance(create_action_provider("mock"), MockActionProvider)
+        with self.assertRaises(ValueError):
+            create_action_provider("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
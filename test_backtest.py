@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+from TheSSS.market_data import load_ohlcv
+from TheSSS.trading_backtrader_azure.backtest import run_strategy
+from TheSSS.trading_backtrader_azure.optimize import expand_grid, optimize
+from TheSSS.trading_backtrader_azure.multi_symbol import run_multi_symbol
+from TheSSS.trading_backtrader_azure.strategies import SampleStrategy
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'TheSSS', 'trading_backtrader_azure', 'data', 'historical_data.csv')
+
+
+class TestOptimize(unittest.TestCase):
+    def setUp(self):
+        self.data = load_ohlcv(DATA_FILE, index_col='date', use_cache=False)
+
+    def test_expand_grid(self):
+        grid = expand_grid({'sma_period': [10, 20], 'stop_loss': [0.01, 0.02, 0.03]})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {'sma_period': 10, 'stop_loss': 0.01})
+
+    def test_parallel_grid_matches_serial_runs(self):
+        """Pool results are ranked and equal to running each combo directly"""
+        grid = {'sma_period': [5, 10], 'take_profit': [0.03, 0.05]}
+        results = optimize(self.data, SampleStrategy, grid, max_workers=2)
+        self.assertEqual(list(results['rank']), [1, 2, 3, 4])
+        self.assertTrue(results['final_value'].is_monotonic_decreasing)
+        for _, row in results.iterrows():
+            params = {'sma_period': int(row['sma_period']), 'take_profit': row['take_profit']}
+            expected = run_strategy(self.data, SampleStrategy, params)
+            self.assertAlmostEqual(row['final_value'], expected['final_value'], places=6)
+            self.assertEqual(row['trade_count'], expected['trade_count'])
+
+    def test_failed_combo_is_reported(self):
+        results = optimize(self.data, SampleStrategy, {'sma_period': [5, 50]}, max_workers=1)
+        self.assertEqual(results.iloc[-1]['sma_period'], 50)
+        self.assertTrue(results.iloc[-1]['error'])
+
+
+
+class TestMultiSymbol(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = {}
+        for symbol in ('EURUSD', 'GBPUSD'):
+            self.files[symbol] = os.path.join(self.tmp.name, f"{symbol}_historical_data.csv")
+            shutil.copy(DATA_FILE, self.files[symbol])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_per_symbol_and_portfolio_results(self):
+        files = dict(self.files, XAUUSD=os.path.join(self.tmp.name, 'missing.csv'))
+        per_symbol, portfolio = run_multi_symbol(files, SampleStrategy, params={'sma_period': 5}, max_workers=2)
+        self.assertEqual(per_symbol['symbol'].tolist(), ['EURUSD', 'GBPUSD', 'XAUUSD'])
+        self.assertEqual(portfolio['failed'], ['XAUUSD'])
+
+        single = run_strategy(load_ohlcv(DATA_FILE, index_col='date', use_cache=False), SampleStrategy, {'sma_period': 5})
+        self.assertEqual(portfolio['starting_value'], 20000)
+        self.assertAlmostEqual(portfolio['final_value'], 2 * single['final_value'], places=6)
+        self.assertAlmostEqual(portfolio['equity'].iloc[-1], portfolio['final_value'], places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import backtrader as bt
+import numpy as np
+from TheSSS.R1_V.action_provider import ActionProvider
+from TheSSS.R1_V.decision_cache import DecisionCache
+from TheSSS.trading_backtrader_azure.strategies import RLBacktraderStrategy
+from fixtures import FakeClock, ohlcv_frame
+
+
+class TestDecisionCache(unittest.TestCase):
+    def test_quantized_states_share_entries(self):
+        cache = DecisionCache(buckets={'rsi': 5.0, 'macd': None})
+        calls = []
+        compute = lambda state: calls.append(state) or "BUY"
+        self.assertEqual(cache.get_or_compute({'rsi': 31.0, 'macd': 1.0}, compute), "BUY")
+        self.assertEqual(cache.get_or_compute({'rsi': 34.9, 'macd': -1.0}, compute), "BUY")
+        cache.get_or_compute({'rsi': 35.0}, compute)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_lru_eviction(self):
+        cache = DecisionCache(maxsize=2, buckets={'rsi': 1.0})
+        for rsi in (1, 2):
+            cache.put(cache.key({'rsi': rsi}), "HOLD")
+        cache.get(cache.key({'rsi': 1}))
+        cache.put(cache.key({'rsi': 3}), "SELL")
+        self.assertIsNone(cache.get(cache.key({'rsi': 2})))
+        self.assertEqual(cache.get(cache.key({'rsi': 1})), "HOLD")
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = DecisionCache(ttl=10, buckets={'rsi': 1.0}, clock=clock)
+        key = cache.key({'rsi': 50})
+        cache.put(key, "BUY")
+        clock.now = 5
+        self.assertEqual(cache.get(key), "BUY")
+        clock.now = 11
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.expirations, 1)
+
+    def test_clear(self):
+        cache = DecisionCache(buckets={'rsi': 1.0})
+        cache.put(cache.key({'rsi': 50}), "BUY")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+
+class ConstantProvider(ActionProvider):
+    def __init__(self, action):
+        self.action = action
+        self.calls = 0
+
+    def get_actions(self, states):
+        self.calls += 1
+        return [self.action for _ in states]
+
+
+class HotSwapStrategy(RLBacktraderStrategy):
+    # Stands in for a finished background retrain partway through the run
+    def next(self):
+        if len(self) == 100:
+            self.successor = ConstantProvider("SELL")
+            self.rl_trader._on_retrain_complete(self.successor, {'episodes': self.rl_trader.episodes})
+        super().next()
+
+
+def repeating_market(cycles=50):
+    # Four bars repeated, so the quantized states recur
+    return ohlcv_frame(1.1 + 0.0002 * np.tile([0, 1, 2, 1], cycles), spread=0.0001)
+
+
+def run_strategy(data, strategy=RLBacktraderStrategy, **env):
+    with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {'LOG_DIR': tmp, 'ACTION_PROVIDER': 'rule', **env}):
+        cerebro = bt.Cerebro()
+        cerebro.adddata(bt.feeds.PandasData(dataname=data))
+        cerebro.addstrategy(strategy)
+        return cerebro.run()[0]
+
+
+class TestStrategyCache(unittest.TestCase):
+    def test_strategy_exposes_hit_counters(self):
+        """A repeating market answers most bars from the cache"""
+        data = repeating_market()
+        strategy = run_strategy(data)
+        self.assertEqual(strategy.cache_hits + strategy.cache_misses, len(data))
+        self.assertGreater(strategy.cache_hits, strategy.cache_misses)
+
+    def test_strategy_counts_episodes_and_shuts_down(self):
+        """Every train() call is an episode; stop() completes the final retrain and leaves no thread running"""
+        data = repeating_market(cycles=1000)
+        before = set(threading.enumerate())
+        strategy = run_strategy(data)
+        # Four periodic trains plus the final one: the fifth episode requests a retrain that must not be dropped
+        self.assertEqual(strategy.rl_trader.episodes, 5)
+        self.assertEqual(strategy.rl_trader.retrain_scheduler.completed, 1)
+        self.assertFalse([t for t in set(threading.enumerate()) - before if t.name == 'rl-retrain'])
+
+    def test_hot_swapped_policy_is_not_answered_from_the_cache(self):
+        """A new provider starts from an empty cache, so every state it decides is its own answer"""
+        data = repeating_market()
+        strategy = run_strategy(data, HotSwapStrategy)
+        self.assertIs(strategy.rl_trader.action_provider, strategy.successor)
+        self.assertGreater(strategy.successor.calls, 0)
+        self.assertEqual(strategy.decision_cache.invalidations, 1)
+        self.assertEqual(set(action for action, _ in strategy.decision_cache._entries.values()), {"SELL"})
+
+    def test_sampling_policy_bypasses_the_cache(self):
+        data = repeating_market()
+        strategy = run_strategy(data, ACTION_PROVIDER='native', NATIVE_POLICY_GREEDY='0', NATIVE_POLICY_PATH='')
+        self.assertFalse(strategy.rl_trader.action_provider.deterministic)
+        self.assertEqual(strategy.cache_hits + strategy.cache_misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from TheSSS.R1_V.distributed import SharedMarket, average_gradients, train_distributed
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.native_policy import NativeActionProvider, PPOConfig, SoftmaxPolicy
+from TheSSS.R1_V.rewards import RewardConfig
+from TheSSS.R1_V.rl_trader import RLTrader
+from TheSSS.R1_V.vector_env import VectorEnv, env_tables
+from fixtures import make_frame
+
+
+class TestSharedMarket(unittest.TestCase):
+    def test_attach_is_zero_copy(self):
+        market = MarketArrays.from_frame(make_frame(50))
+        with SharedMarket(market) as shared:
+            shm, attached = SharedMarket.attach(shared.spec)
+            try:
+                np.testing.assert_array_equal(attached.values, market.values)
+                self.assertEqual(attached.names, market.names)
+                # A write through the shared block is visible to every attached view
+                shared_view = np.ndarray(market.values.shape, dtype=np.float64, buffer=shared.shm.buf)
+                shared_view[0, 0] = -1.0
+                self.assertEqual(attached.values[0, 0], -1.0)
+            finally:
+                del attached, shared_view
+                shm.close()
+
+    def test_env_steps_over_shared_tables(self):
+        market = MarketArrays.from_frame(make_frame(50))
+        with SharedMarket(market) as shared:
+            shm, _ = SharedMarket.attach(shared.spec)
+            try:
+                tables = SharedMarket.attach_tables(shm, shared.spec)
+                for name, array in env_tables(market).items():
+                    np.testing.assert_array_equal(tables[name], array)
+                env = VectorEnv(None, 3, episode_length=10, config=RewardConfig(), seed=0, tables=tables)
+                self.assertTrue(np.shares_memory(env.observations, tables['observations']))
+                reference = VectorEnv(market, 3, episode_length=10, config=RewardConfig(), seed=0)
+                actions = np.array([1, 0, -1])
+                for _ in range(15):
+                    np.testing.assert_array_equal(env.step(actions)[1], reference.step(actions)[1])
+            finally:
+                del tables, env
+                shm.close()
+
+    def test_average_gradients(self):
+        results = [{'grads': {'w': np.array([1.0, 2.0])}}, {'grads': {'w': np.array([3.0, 4.0])}}]
+        np.testing.assert_array_equal(average_gradients(results)['w'], [2.0, 3.0])
+
+
+class TestDistributedTraining(unittest.TestCase):
+    def test_workers_train_shared_policy(self):
+        market = MarketArrays.from_frame(make_frame(300))
+        start = SoftmaxPolicy(hidden_size=4, seed=0)
+        policy, history = train_distributed(market, num_workers=2, rounds=3, num_envs=4, steps_per_round=8,
+                                            episode_length=50, policy=start, config=PPOConfig(hidden_size=4),
+                                            reward_config=RewardConfig(), seed=1)
+        self.assertEqual(len(history), 3)
+        self.assertTrue((history['transitions'] == 2 * 4 * 8).all())
+        self.assertEqual(policy.normalizer.count, 3 * 64)
+        self.assertFalse(np.allclose(policy.params['W2'], start.params['W2']))
+        # The caller's policy is left untouched
+        self.assertEqual(start.normalizer.count, 0)
+
+    def test_same_seed_same_policy(self):
+        market = MarketArrays.from_frame(make_frame(300))
+        runs = [train_distributed(market, num_workers=1, rounds=3, num_envs=4, steps_per_round=8, episode_length=50,
+                                  policy=SoftmaxPolicy(hidden_size=4, seed=0), config=PPOConfig(hidden_size=4),
+                                  reward_config=RewardConfig(), seed=3)[0] for _ in range(2)]
+        for name in runs[0].params:
+            np.testing.assert_array_equal(runs[0].params[name], runs[1].params[name])
+
+    def test_rltrader_requires_native_provider(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict(os.environ, {'LOG_DIR': tmp, 'RETRAIN_MODE': 'inline'}):
+                provider = NativeActionProvider(config=PPOConfig(hidden_size=4), path='', seed=0)
+                trader = RLTrader(action_provider=provider, data=make_frame(200))
+            history = trader.run_distributed(num_workers=2, rounds=2, num_envs=2, steps_per_round=4, seed=0)
+        self.assertEqual(trader.episodes, int(history['transitions'].sum()))
+        self.assertIsNot(trader.action_provider, provider)
+
+
+if __name__ == '__main__':
+    unittest.main()
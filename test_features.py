@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from TheSSS.R1_V.features import add_indicator_columns, FEATURE_COLUMNS
+from TheSSS.R1_V.market_arrays import MarketArrays
+from fixtures import ohlcv_frame, random_walk
+
+
+class TestFeatures(unittest.TestCase):
+    def setUp(self):
+        self.df = ohlcv_frame(random_walk(300, seed=7, scale=0.001), volume=1000.0)
+
+    def test_columns_added(self):
+        """Indicator columns are added without touching the input frame"""
+        out = add_indicator_columns(self.df)
+        for col in FEATURE_COLUMNS:
+            self.assertIn(col, out.columns)
+            self.assertFalse(out[col].isna().any())
+        self.assertNotIn('rsi', self.df.columns)
+
+    def test_rsi_matches_per_bar_window(self):
+        """Rolling RSI equals a naive computation over each 14-bar window"""
+        out = add_indicator_columns(self.df)
+        close = self.df['close'].to_numpy()
+        for i in (14, 100, 299):
+            deltas = np.diff(close[i - 14:i + 1])
+            gain = deltas[deltas > 0].sum() / 14
+            loss = -deltas[deltas < 0].sum() / 14
+            expected = 100.0 - 100.0 / (1 + gain / loss)
+            self.assertAlmostEqual(out['rsi'].iloc[i], expected, places=8)
+
+    def test_macd_matches_full_history_value(self):
+        """The last MACD value equals the full-history EMA difference"""
+        out = add_indicator_columns(self.df)
+        prices = self.df['close']
+        expected = (prices.ewm(span=12, adjust=False).mean() - prices.ewm(span=26, adjust=False).mean()).iloc[-1]
+        self.assertAlmostEqual(out['macd'].iloc[-1], expected, places=12)
+
+    def test_market_arrays_states_match_rows(self):
+        """Array-backed state records carry the same values as the DataFrame rows"""
+        out = add_indicator_columns(self.df)
+        market = MarketArrays.from_frame(out)
+        self.assertTrue(market.column('close').flags['C_CONTIGUOUS'])
+        states = list(market.iter_states(block_size=64))
+        self.assertEqual(len(states), len(out))
+        for i in (0, 63, 64, 299):
+            row = out.iloc[i]
+            self.assertEqual(states[i]['price'], row['close'])
+            self.assertEqual(states[i]['rsi'], row['rsi'])
+            self.assertEqual(states[i], market.state(i))
+        transitions = list(market.iter_transitions())
+        self.assertEqual(transitions[0][1], states[1])
+        self.assertEqual(transitions[-1][0], transitions[-1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
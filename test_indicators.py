@@ -0,0 +1,129 @@
+import random
+import unittest
+from TheSSS.strategies.indicators import IndicatorEngine, RollingExtreme
+from TheSSS.strategies.candles import CandleBuffer
+from TheSSS.strategies.trading_strategy import (
+    calculate_sma, calculate_dynamic_resistance, calculate_dynamic_support, evaluate_trade_signal,
+    generate_trade_signals
+)
+
+
+def random_candles(count, seed=1):
+    rng = random.Random(seed)
+    candles = []
+    price = 1.1
+    for _ in range(count):
+        price += rng.uniform(-0.001, 0.001)
+        close = round(price + rng.uniform(-0.0005, 0.0005), 5)
+        candles.append({
+            'open': round(price, 5),
+            'high': round(max(price, close) + rng.uniform(0, 0.0005), 5),
+            'low': round(min(price, close) - rng.uniform(0, 0.0005), 5),
+            'close': close
+        })
+    return candles
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    def test_matches_window_functions(self):
+        """Streaming values equal the rescanning functions after every candle"""
+        candles = random_candles(500)
+        engine = IndicatorEngine()
+        for i, candle in enumerate(candles, 1):
+            engine.update(candle)
+            window = candles[:i]
+            self.assertEqual(engine.resistance, calculate_dynamic_resistance(window))
+            self.assertEqual(engine.support, calculate_dynamic_support(window))
+            self.assertEqual(engine.sma, calculate_sma(window, period=40))
+
+    def test_signals_match_on_flat_prices(self):
+        """Ties between closes and the SMA resolve exactly as with the rescanning functions"""
+        candles = [{'open': p, 'high': p, 'low': p, 'close': p}
+                   for p in [1.1, 1.1000000000000003, 1.0999999999999999] * 140]
+        engine = IndicatorEngine()
+        for i, candle in enumerate(candles, 1):
+            engine.update(candle)
+            window = candles[:i]
+            sma = calculate_sma(window)
+            self.assertEqual(engine.sma, sma)
+            self.assertEqual(evaluate_trade_signal(window, engine.support, engine.resistance, engine.sma),
+                             evaluate_trade_signal(window, calculate_dynamic_support(window),
+                                                   calculate_dynamic_resistance(window), sma))
+
+    def test_buffer_sma_matches_on_flat_prices(self):
+        buffer = CandleBuffer(capacity=64)
+        candles = []
+        for p in [1.1, 1.1000000000000003, 1.0999999999999999] * 50:
+            candles.append({'open': p, 'high': p, 'low': p, 'close': p})
+            buffer.append_candle(candles[-1])
+            self.assertEqual(calculate_sma(buffer), calculate_sma(candles))
+
+    def test_rolling_extreme_with_repeats(self):
+        rolling = RollingExtreme(3, mode='min')
+        values = [5, 3, 3, 4, 6, 7, 2, 2, 9]
+        for i, value in enumerate(values):
+            rolling.update(value)
+            self.assertEqual(rolling.value, min(values[max(0, i - 2):i + 1]))
+
+
+class TestCandleBuffer(unittest.TestCase):
+    def test_wraparound_windows_are_views(self):
+        candles = random_candles(250)
+        buffer = CandleBuffer(capacity=100)
+        buffer.extend(candles)
+        self.assertEqual(len(buffer), 100)
+        window = buffer.closes(40)
+        self.assertIs(window.base, buffer.closes().base)
+        self.assertEqual(window.tolist(), [c['close'] for c in candles[-40:]])
+        self.assertEqual(buffer[-1], {**candles[-1], 'volume': 0.0})
+        self.assertEqual(buffer[0]['close'], candles[150]['close'])
+
+    def test_strategy_functions_accept_buffer(self):
+        """Buffer-backed calls give the same results as list-of-dict candles"""
+        candles = random_candles(300, seed=4)
+        buffer = CandleBuffer(capacity=128)
+        for i, candle in enumerate(candles, 1):
+            buffer.append_candle(candle)
+            window = candles[:i]
+            self.assertEqual(calculate_dynamic_resistance(buffer), calculate_dynamic_resistance(window))
+            self.assertEqual(calculate_dynamic_support(buffer), calculate_dynamic_support(window))
+            sma = calculate_sma(window)
+            self.assertEqual(calculate_sma(buffer), sma)
+            support, resistance = calculate_dynamic_support(window), calculate_dynamic_resistance(window)
+            self.assertEqual(evaluate_trade_signal(buffer, support, resistance, sma),
+                             evaluate_trade_signal(window, support, resistance, sma))
+
+
+class TestGenerateTradeSignals(unittest.TestCase):
+    def per_bar_signals(self, candles):
+        signals = []
+        for i in range(len(candles)):
+            window = candles[:i + 1]
+            signals.append(evaluate_trade_signal(
+                window, calculate_dynamic_support(window), calculate_dynamic_resistance(window),
+                calculate_sma(window, period=40)))
+        return signals
+
+    def assert_matches_per_bar(self, candles):
+        signals = generate_trade_signals([c['high'] for c in candles], [c['low'] for c in candles],
+                                         [c['close'] for c in candles])
+        self.assertEqual(signals.tolist(), self.per_bar_signals(candles))
+        return signals
+
+    def test_matches_per_bar_on_random_walk(self):
+        signals = self.assert_matches_per_bar(random_candles(600, seed=9))
+        self.assertTrue({"BUY", "SELL"} & set(signals.tolist()))
+
+    def test_matches_per_bar_on_ties(self):
+        """Repeating and flat prices hit the SMA comparisons exactly on ties"""
+        candles = []
+        for i in range(300):
+            base = 1.1000 + 0.001 * (i % 5)
+            close = base + 0.0002 if i % 2 == 0 else base - 0.0002
+            candles.append({'open': base, 'high': base + 0.0005, 'low': base - 0.0005, 'close': close})
+        candles += [{'open': 1.1, 'high': 1.1, 'low': 1.1, 'close': 1.1}] * 120
+        self.assert_matches_per_bar(candles)
+
+
+if __name__ == "__main__":
+    unittest.main()
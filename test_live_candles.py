@@ -0,0 +1,116 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from TheSSS.live.candles import CandleAggregator, replay_bars
+from TheSSS.live.feeds import StrategyFeed, TraderFeed
+from TheSSS.live.ticks import Subscription, Tick
+from TheSSS.R1_V.action_provider import MockActionProvider
+from TheSSS.R1_V.rl_trader import RLTrader
+from fixtures import make_frame
+
+START = 1700000000 - 1700000000 % 3600
+
+
+def make_ticks(count=2000, step_ms=4000, symbol='EURUSD', seed=0):
+    rng = np.random.default_rng(seed)
+    bids = 1.1 + np.cumsum(rng.normal(0, 0.0001, count))
+    return [Tick(symbol, START + i * step_ms // 1000, START * 1000 + i * step_ms, float(b), float(b) + 0.0002, 0.0, 0.0)
+            for i, b in enumerate(bids)]
+
+
+def resample(ticks, rule):
+    frame = pd.DataFrame({'bid': [t.bid for t in ticks]},
+                         index=pd.to_datetime([t.time_msc for t in ticks], unit='ms'))
+    ohlc = frame['bid'].resample(rule).ohlc()
+    ohlc['volume'] = frame['bid'].resample(rule).count()
+    return ohlc[ohlc['volume'] > 0]
+
+
+class TestCandleAggregator(unittest.TestCase):
+    def test_bars_match_resampled_ticks_for_every_timeframe(self):
+        ticks = make_ticks()
+        bars = list(replay_bars(ticks, timeframes=('M1', 'M5', 'H1'), flush=True))
+        for timeframe, rule in (('M1', '1min'), ('M5', '5min'), ('H1', '1h')):
+            got = [b for b in bars if b.timeframe == timeframe]
+            expected = resample(ticks, rule)
+            self.assertEqual([b.time for b in got], [int(t.timestamp()) for t in expected.index])
+            np.testing.assert_allclose([[b.open, b.high, b.low, b.close, b.volume] for b in got],
+                                       expected[['open', 'high', 'low', 'close', 'volume']].to_numpy())
+
+    def test_bars_are_published_when_the_next_period_starts(self):
+        aggregator = CandleAggregator(timeframes=('M1',))
+        seen = []
+        aggregator.subscribe(seen.append, timeframes=['M1'])
+        ticks = make_ticks(count=16, step_ms=5000)
+        for tick in ticks[:12]:
+            aggregator.update(tick)
+        self.assertEqual(seen, [])
+        closed = aggregator.update(ticks[12])
+        self.assertEqual(seen, closed)
+        self.assertEqual((closed[0].time, closed[0].volume), (START, 12))
+        self.assertEqual(aggregator.forming('EURUSD', 'M1').volume, 1)
+
+    def test_memory_is_bounded_and_late_ticks_are_ignored(self):
+        aggregator = CandleAggregator(timeframes=('M1',), history=10)
+        for tick in make_ticks(count=500, step_ms=20000):
+            aggregator.update(tick)
+        self.assertEqual(len(aggregator.candles('EURUSD', 'M1')), 10)
+        aggregator.close_until(START + 10 ** 6)
+        self.assertIsNone(aggregator.forming('EURUSD', 'M1'))
+        stale = make_ticks(count=1)[0]
+        self.assertEqual(aggregator.update(stale), [])
+        self.assertEqual(aggregator.late, 1)
+
+    def test_late_tick_only_skips_the_closed_timeframe(self):
+        aggregator = CandleAggregator(timeframes=('M1', 'H1'))
+        first, second = make_ticks(count=2, step_ms=30000)
+        aggregator.update(first)
+        self.assertEqual([bar.timeframe for bar in aggregator.close_until(START + 60)], ['M1'])
+        late = second._replace(time=START + 59, time_msc=(START + 59) * 1000)
+        self.assertEqual(aggregator.update(late), [])
+        self.assertEqual(aggregator.late, 1)
+        self.assertIsNone(aggregator.forming('EURUSD', 'M1'))
+        self.assertEqual(aggregator.forming('EURUSD', 'H1').volume, 2)
+        self.assertEqual(aggregator.forming('EURUSD', 'H1').close, late.bid)
+
+    def test_consume_closes_quiet_bars_on_the_server_clock(self):
+        aggregator = CandleAggregator(timeframes=('M1',))
+        subscription = Subscription()
+        subscription.put(make_ticks(count=1)[0])
+        stop = threading.Event()
+        clock = iter([0.0, 120.0])
+        aggregator.subscribe(lambda bar: stop.set())
+        aggregator.consume(subscription, stop, idle_timeout=0.01, clock=lambda: next(clock))
+        self.assertEqual(len(aggregator.candles('EURUSD', 'M1')), 1)
+
+
+class TestFeeds(unittest.TestCase):
+    def test_strategy_feed_matches_batch_signals(self):
+        from TheSSS.strategies.trading_strategy import generate_trade_signals
+        ticks = make_ticks(count=6000, step_ms=2000, seed=3)
+        feed = StrategyFeed()
+        signals = [feed(bar) for bar in replay_bars(ticks, timeframes=('M1',))]
+        bars = resample(ticks, '1min').iloc[:len(signals)]
+        expected = generate_trade_signals(bars['high'], bars['low'], bars['close'])
+        self.assertEqual(signals, list(expected))
+
+    def test_trader_feed_learns_from_closed_bars(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {'LOG_DIR': tmp, 'RETRAIN_MODE': 'inline', 'LOG_MODE': 'sync'}
+            with patch.dict(os.environ, env):
+                trader = RLTrader(action_provider=MockActionProvider(actions=["BUY"]), data=make_frame())
+                feed = TraderFeed(trader, warmup=50)
+                actions = [feed(bar) for bar in replay_bars(make_ticks(count=600), timeframes=('M1',))]
+                trader.shutdown()
+        self.assertEqual(set(actions), {"BUY"})
+        self.assertEqual(trader.episodes, len(actions) - 1)
+        self.assertEqual(len(trader.replay_buffer), len(actions) - 1)
+        self.assertEqual(set(feed.state), {'price', 'spread', 'volume', 'rsi', 'macd', 'volatility'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from TheSSS.live.ticks import ReplayTickSource, Subscription, Tick, TickSource, TickService, read_tick_csv
+from fixtures import FakeClock
+
+
+def tick(symbol, ms, bid, ask=None):
+    return Tick(symbol, ms // 1000, ms, bid, ask if ask is not None else bid + 0.0002, 0.0, 1.0)
+
+
+class FailingSource(TickSource):
+    def poll(self, symbol):
+        raise ConnectionError("terminal gone")
+
+
+class RefusingSource(TickSource):
+    def start(self, symbols):
+        return False
+
+
+class TestTickService(unittest.TestCase):
+    def test_duplicates_are_dropped_and_quiet_symbols_back_off(self):
+        clock = FakeClock()
+        source = ReplayTickSource([tick('EURUSD', 1000, 1.1), tick('EURUSD', 1000, 1.1), tick('EURUSD', 2000, 1.2)])
+        service = TickService(source, ['EURUSD', 'GBPUSD'], poll_interval=0.1, max_backoff=0.8, clock=clock)
+        subscription = service.subscribe()
+
+        waits = []
+        for _ in range(8):
+            waits.append(service.step())
+            clock.now += waits[-1]
+        self.assertEqual([t.bid for t in subscription.drain()], [1.1, 1.2])
+        self.assertEqual(service.stats['duplicates'] > 0, True)
+        # GBPUSD has no ticks: its interval doubles up to the cap
+        self.assertEqual(service._intervals['GBPUSD'], 0.8)
+        self.assertGreater(service.stats['empty'], 0)
+        self.assertTrue(all(w >= 0 for w in waits))
+
+    def test_subscribers_filter_by_symbol(self):
+        ticks = [tick('EURUSD', 1000, 1.1), tick('XAUUSD', 1000, 1900.0), tick('EURUSD', 1500, 1.2)]
+        service = TickService(ReplayTickSource(ticks), ['EURUSD', 'XAUUSD'], clock=FakeClock())
+        gold = service.subscribe(['XAUUSD'])
+        everything = service.subscribe()
+        for _ in range(3):
+            service.step()
+            service.clock.now += 1.0
+        self.assertEqual([t.symbol for t in gold.drain()], ['XAUUSD'])
+        self.assertEqual(len(everything.drain()), 3)
+
+    def test_errors_back_off_instead_of_spinning(self):
+        clock = FakeClock()
+        service = TickService(FailingSource(), ['EURUSD'], poll_interval=0.1, max_backoff=2.0, clock=clock)
+        for _ in range(6):
+            clock.now += service.step()
+        self.assertEqual(service.stats['errors'], 6)
+        self.assertEqual(service.step(), 2.0)
+
+    def test_start_failure_is_flagged(self):
+        service = TickService(RefusingSource(), ['EURUSD']).start()
+        service.stop(timeout=2)
+        self.assertTrue(service.start_failed)
+
+        source = ReplayTickSource([tick('EURUSD', 1000, 1.1)])
+        service = TickService(source, ['EURUSD'], poll_interval=0.001).start()
+        service.stop(timeout=2)
+        self.assertFalse(service.start_failed)
+
+    def test_bounded_queue_keeps_newest(self):
+        subscription = Subscription(maxsize=2)
+        for i in range(5):
+            subscription.put(i)
+        self.assertEqual(subscription.drain(), [3, 4])
+        self.assertEqual(subscription.dropped, 3)
+
+    def test_threaded_replay_from_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ticks.csv')
+            with open(path, 'w') as f:
+                f.write("symbol,time,time_msc,bid,ask,last,volume\n")
+                for i in range(20):
+                    f.write(f"EURUSD,{1700000000 + i},{1700000000000 + i * 1000},{1.1 + i * 1e-4},{1.1002 + i * 1e-4},0,1\n")
+            self.assertEqual(len(list(read_tick_csv(path))), 20)
+            source = ReplayTickSource(path)
+            service = TickService(source, ['EURUSD'], poll_interval=0.001, max_backoff=0.01)
+            subscription = service.subscribe()
+            service.start()
+            received = [subscription.get(timeout=2) for _ in range(20)]
+            service.stop(timeout=2)
+        self.assertFalse(service.running)
+        self.assertEqual([t.time_msc for t in received], sorted(t.time_msc for t in received))
+        self.assertTrue(source.exhausted)
+
+
+if __name__ == '__main__':
+    unittest.main()
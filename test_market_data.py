@@ -0,0 +1,92 @@
+import os
+import time
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from TheSSS.market_data import load_ohlcv, cache_path, read_cache, iter_ohlcv_chunks
+from TheSSS.R1_V.features import add_indicator_columns, iter_indicator_chunks
+
+
+class TestMarketData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'history.csv')
+        self.write_csv([1.10, 1.11, 1.12, 1.13])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_csv(self, closes):
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=len(closes), freq='min'),
+            'open': closes, 'high': [c + 0.01 for c in closes], 'low': [c - 0.01 for c in closes],
+            'close': closes, 'volume': 10.0
+        })
+        # One duplicate timestamp and one impossible bar that validation must drop
+        df = pd.concat([df, df.iloc[[0]]])
+        bad = df.iloc[[1]].assign(timestamp=pd.Timestamp('2025-01-01'), high=0.5)
+        pd.concat([df, bad]).to_csv(self.path, index=False)
+
+    def test_validates_and_caches(self):
+        """First load validates the CSV and commits a memory-mapped cache"""
+        df = load_ohlcv(self.path, use_cache=True)
+        self.assertEqual(len(df), 4)
+        self.assertTrue(os.path.exists(os.path.join(cache_path(self.path), 'meta.json')))
+
+        cached = load_ohlcv(self.path, use_cache=True)
+        base = cached['close'].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+        pd.testing.assert_frame_equal(cached, df, check_freq=False)
+
+    def test_cache_invalidated_by_source_change(self):
+        load_ohlcv(self.path, use_cache=True)
+        time.sleep(0.01)
+        self.write_csv([1.20, 1.21])
+        os.utime(self.path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        df = load_ohlcv(self.path, use_cache=True)
+        self.assertEqual(list(df['close']), [1.20, 1.21])
+        self.assertEqual(list(read_cache(cache_path(self.path))['close']), [1.20, 1.21])
+
+    def test_non_numeric_columns_are_not_cached(self):
+        """A frame the cache cannot hold is returned as parsed instead of losing columns"""
+        df = pd.read_csv(self.path)
+        df['session'] = 'london'
+        df.to_csv(self.path, index=False)
+        loaded = load_ohlcv(self.path, use_cache=True)
+        self.assertEqual(list(loaded['session'].unique()), ['london'])
+        self.assertFalse(os.path.exists(cache_path(self.path)))
+
+    def test_concurrent_loads_commit_one_complete_cache(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            frames = list(pool.map(lambda _: load_ohlcv(self.path, use_cache=True), range(16)))
+        for df in frames:
+            self.assertEqual(list(df['close']), [1.10, 1.11, 1.12, 1.13])
+        # No temporary or replaced cache directories are left behind
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['history.csv', 'history.csv.cache'])
+
+    def test_chunks_drop_duplicates_across_boundaries(self):
+        """Streaming yields the same validated rows as a full load"""
+        df = pd.read_csv(self.path).iloc[:4]
+        # Repeat the last bar of the first chunk at the start of the second one
+        pd.concat([df.iloc[:2], df.iloc[[1]], df.iloc[2:]]).to_csv(self.path, index=False)
+        chunks = list(iter_ohlcv_chunks(self.path, chunksize=2))
+        self.assertEqual([len(c) for c in chunks], [2, 1, 1])
+        streamed = pd.concat(chunks)
+        pd.testing.assert_frame_equal(streamed, load_ohlcv(self.path, use_cache=False), check_freq=False)
+
+    def test_chunked_indicators_match_full_history(self):
+        rng = np.random.default_rng(5)
+        close = 1.1 + np.cumsum(rng.normal(0, 0.001, 1000))
+        df = pd.DataFrame({'close': close}, index=pd.date_range('2024-01-01', periods=1000, freq='min'))
+        chunks = (df.iloc[i:i + 128] for i in range(0, len(df), 128))
+        streamed = pd.concat(iter_indicator_chunks(chunks, warmup=400))
+        full = add_indicator_columns(df)
+        np.testing.assert_allclose(streamed.to_numpy(), full.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from TheSSS.R1_V.action_provider import create_action_provider
+from TheSSS.R1_V.native_policy import NativeActionProvider, PPOConfig, SoftmaxPolicy, POLICY_ACTIONS
+from TheSSS.R1_V.replay_buffer import ReplayBuffer, STATE_FIELDS
+from TheSSS.R1_V import rl_trader
+from TheSSS.R1_V.rl_trader import RLTrader
+from fixtures import ohlcv_frame
+
+
+def wave_frame(bars=80):
+    return ohlcv_frame(1.1 + np.sin(np.arange(bars) / 5.0) * 0.001)
+
+
+def make_batch(n=32, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.normal(size=(n, len(STATE_FIELDS)))
+    return {
+        'states': states,
+        'actions': rng.integers(-1, 2, size=n).astype(np.int8),
+        'rewards': rng.normal(size=n),
+        'next_states': states + rng.normal(scale=0.1, size=states.shape),
+    }
+
+
+class TestSoftmaxPolicy(unittest.TestCase):
+    def test_gradients_match_finite_differences(self):
+        config = PPOConfig(clip_range=0.2, entropy_coeff=0.05)
+        policy = SoftmaxPolicy(hidden_size=4, seed=1)
+        policy.params['v'] = np.random.default_rng(2).normal(size=len(STATE_FIELDS))
+        batch = make_batch()
+        # A perturbed behaviour policy so both clipped and unclipped samples occur
+        old_probs = SoftmaxPolicy(hidden_size=4, seed=3).probabilities(batch['states'])
+        grads, _ = policy.compute_gradients(batch, config, old_probs=old_probs)
+
+        def loss_at(name, i, delta):
+            probe = policy.copy()
+            probe.params[name].flat[i] += delta
+            return probe.compute_gradients(batch, config, old_probs=old_probs)[1]['loss']
+
+        for name in ('W1', 'b1', 'W2', 'b2'):
+            for i in range(0, policy.params[name].size, 3):
+                numeric = (loss_at(name, i, 1e-6) - loss_at(name, i, -1e-6)) / 2e-6
+                self.assertAlmostEqual(grads[name].flat[i], numeric, places=5, msg=f"{name}[{i}]")
+
+    def test_linear_policy_and_batched_actions(self):
+        policy = SoftmaxPolicy(hidden_size=0, seed=0)
+        states = np.zeros((1000, len(STATE_FIELDS)))
+        probs = policy.probabilities(states)
+        self.assertEqual(probs.shape, (1000, 3))
+        np.testing.assert_allclose(probs.sum(axis=1), 1.0)
+        sampled = policy.act(states, greedy=False, rng=np.random.default_rng(0))
+        self.assertEqual(set(np.unique(sampled)), {0, 1, 2})
+
+    def test_save_and_load(self):
+        policy = SoftmaxPolicy(hidden_size=5, seed=4)
+        policy.normalizer.update(np.ones((3, len(STATE_FIELDS))))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'policy.npz')
+            policy.save(path)
+            loaded = SoftmaxPolicy.load(path)
+        states = make_batch()['states']
+        np.testing.assert_allclose(loaded.probabilities(states), policy.probabilities(states))
+
+
+class TestNativeActionProvider(unittest.TestCase):
+    def test_ppo_learns_rsi_bandit(self):
+        """BUY pays below RSI 50 and SELL pays above it; the policy should pick that up"""
+        rng = np.random.default_rng(0)
+        buffer = ReplayBuffer(capacity=4000, seed=0)
+        provider = NativeActionProvider(config=PPOConfig(hidden_size=8, batch_size=64, learning_rate=0.05,
+                                                         update_epochs=20, experience_window=4000), seed=0)
+        rsi_col = STATE_FIELDS.index('rsi')
+        for _ in range(30):
+            states = np.zeros((200, len(STATE_FIELDS)))
+            states[:, rsi_col] = rng.uniform(0, 100, 200)
+            actions = provider.policy.act(states, greedy=False, rng=rng) - 1
+            rewards = np.where(states[:, rsi_col] < 50, actions, -actions).astype(float)
+            buffer.add_batch(states, actions, rewards, states)
+            provider = provider.train(experience=buffer)
+
+        test = np.zeros((2, len(STATE_FIELDS)))
+        test[:, rsi_col] = [10.0, 90.0]
+        provider.greedy = True
+        self.assertEqual(provider.get_actions(test), ["BUY", "SELL"])
+
+    def test_selectable_via_config(self):
+        with patch.dict(os.environ, {'ACTION_PROVIDER': 'native', 'NATIVE_POLICY_PATH': ''}):
+            provider = create_action_provider(seed=0)
+        self.assertIsInstance(provider, NativeActionProvider)
+        actions = provider.get_actions([{'price': 1.1, 'rsi': 20.0}, {'price': 1.2, 'rsi': 80.0}])
+        self.assertTrue(set(actions) <= set(POLICY_ACTIONS))
+
+    def test_config_file_selects_the_provider(self):
+        self.assertTrue(os.path.exists(rl_trader.ENV_PATH))
+        with tempfile.TemporaryDirectory() as tmp:
+            env_file = os.path.join(tmp, '.env')
+            with open(env_file, 'w') as f:
+                f.write(f"ACTION_PROVIDER=native\nNATIVE_POLICY_PATH=\nRETRAIN_MODE=inline\nLOG_DIR={tmp}\n")
+            with patch.dict(os.environ), patch.object(rl_trader, 'ENV_PATH', env_file):
+                for name in ('ACTION_PROVIDER', 'NATIVE_POLICY_PATH', 'RETRAIN_MODE', 'LOG_DIR'):
+                    os.environ.pop(name, None)
+                trader = RLTrader(data=wave_frame())
+                trader.shutdown()
+        self.assertIsInstance(trader.action_provider, NativeActionProvider)
+        self.assertIsNone(trader.retrain_scheduler)
+
+    def test_rltrader_swaps_in_trained_policy(self):
+        data = wave_frame()
+        provider = NativeActionProvider(config=PPOConfig(hidden_size=4), path='', seed=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.dict(os.environ, {'LOG_DIR': tmp, 'RETRAIN_MODE': 'inline'}):
+                trader = RLTrader(action_provider=provider, data=data)
+            trader.run_trading(mode="offline", max_epochs=1)
+        self.assertEqual(len(trader.replay_buffer), 80)
+        self.assertIsInstance(trader.action_provider, NativeActionProvider)
+        self.assertIsNot(trader.action_provider, provider)
+
+
+if __name__ == '__main__':
+    unittest.main()
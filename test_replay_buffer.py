@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from TheSSS.R1_V.replay_buffer import ReplayBuffer, state_vector, STATE_FIELDS
+
+
+def make_state(i):
+    return {'price': 1.1 + i * 1e-4, 'spread': 0.0002, 'volume': 100.0 + i, 'rsi': 50.0, 'macd': 0.0,
+            'volatility': 0.001}
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def test_ring_overwrites_oldest(self):
+        buffer = ReplayBuffer(capacity=4, seed=0)
+        for i in range(6):
+            buffer.add(make_state(i), "BUY" if i % 2 else "SELL", float(i), make_state(i + 1))
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.cursor, 2)
+        self.assertEqual(sorted(buffer.rewards.tolist()), [2.0, 3.0, 4.0, 5.0])
+        np.testing.assert_array_equal(buffer.actions[:2], [-1, 1])
+
+    def test_add_batch_matches_add(self):
+        states = np.stack([state_vector(make_state(i)) for i in range(7)])
+        rewards = np.arange(7, dtype=float)
+        actions = ["BUY", "HOLD", "SELL"] * 2 + ["BUY"]
+        one = ReplayBuffer(capacity=5)
+        for i in range(7):
+            one.add(states[i], actions[i], rewards[i], states[i])
+        batch = ReplayBuffer(capacity=5)
+        batch.add_batch(states[:3], actions[:3], rewards[:3], states[:3])
+        batch.add_batch(states[3:], actions[3:], rewards[3:], states[3:])
+        for name in ('states', 'actions', 'rewards'):
+            np.testing.assert_array_equal(getattr(one, name), getattr(batch, name))
+        self.assertEqual((one.cursor, one.size), (batch.cursor, batch.size))
+
+    def test_prioritized_sampling_prefers_high_priority(self):
+        buffer = ReplayBuffer(capacity=10, alpha=1.0, seed=1)
+        for i in range(10):
+            buffer.add(make_state(i), "HOLD", 0.0, make_state(i), priority=1e-6)
+        buffer.update_priorities(np.array([3]), np.array([100.0]))
+        batch = buffer.sample(200, prioritized=True)
+        self.assertGreater((batch['indices'] == 3).mean(), 0.95)
+        self.assertEqual(batch['states'].shape, (200, len(STATE_FIELDS)))
+        self.assertAlmostEqual(batch['weights'].max(), 1.0)
+        uniform = buffer.sample(50)
+        self.assertTrue(np.all(uniform['weights'] == 1.0))
+
+    def test_new_transitions_get_the_running_max_priority(self):
+        buffer = ReplayBuffer(capacity=3, seed=0)
+        buffer.add(make_state(0), "BUY", 0.0, make_state(1))
+        self.assertEqual(buffer.priorities[0], 1.0)
+        buffer.update_priorities(np.array([0]), np.array([-4.0]))
+        buffer.add(make_state(1), "BUY", 0.0, make_state(2))
+        self.assertEqual(buffer.priorities[1], 4.0)
+        buffer.add_batch(np.zeros((2, len(STATE_FIELDS))), ["HOLD", "SELL"], [0.0, 0.0],
+                         np.zeros((2, len(STATE_FIELDS))), priorities=np.array([2.0, 7.0]))
+        buffer.add(make_state(2), "SELL", 0.0, make_state(3))
+        self.assertEqual(buffer.priorities[1], 7.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            buffer.save(tmp)
+            resumed = ReplayBuffer.load(tmp, mmap_mode=None)
+        resumed.add(make_state(3), "BUY", 0.0, make_state(4))
+        self.assertEqual(resumed.priorities[2], 7.0)
+
+    def test_snapshot_copies_the_recent_window(self):
+        buffer = ReplayBuffer(capacity=4, seed=0)
+        for i in range(6):
+            buffer.add(make_state(i), "BUY", float(i), make_state(i + 1))
+        snapshot = buffer.snapshot(3)
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.rewards.tolist(), [3.0, 4.0, 5.0])
+        np.testing.assert_array_equal(snapshot.recent_slots(), [2, 1, 0])
+
+        buffer.add(make_state(9), "SELL", 9.0, make_state(10))
+        self.assertEqual(snapshot.rewards.tolist(), [3.0, 4.0, 5.0])
+        self.assertLessEqual(set(snapshot.sample(20)['rewards'].tolist()), {3.0, 4.0, 5.0})
+        self.assertEqual(len(ReplayBuffer(capacity=4).snapshot()), 0)
+
+    def test_save_and_memory_mapped_resume(self):
+        buffer = ReplayBuffer(capacity=8, seed=0)
+        for i in range(5):
+            buffer.add(make_state(i), "BUY", float(i), make_state(i + 1))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'replay')
+            buffer.save(path)
+            resumed = ReplayBuffer.load(path)
+            self.assertIsInstance(resumed.states, np.memmap)
+            self.assertEqual((len(resumed), resumed.cursor), (5, 5))
+            np.testing.assert_array_equal(resumed.rewards, buffer.rewards)
+
+            resumed.add(make_state(9), "SELL", 9.0, make_state(10))
+            resumed.save(path)
+            reloaded = ReplayBuffer.load(path, mmap_mode=None)
+            self.assertEqual(len(reloaded), 6)
+            self.assertEqual(reloaded.rewards[5], 9.0)
+            self.assertEqual(reloaded.actions[5], -1)
+            del resumed
+
+
+if __name__ == '__main__':
+    unittest.main()
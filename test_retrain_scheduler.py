@@ -0,0 +1,130 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+from TheSSS.R1_V.action_provider import MockActionProvider
+from TheSSS.R1_V.retrain_scheduler import RetrainScheduler
+from TheSSS.R1_V.rl_trader import RLTrader
+from fixtures import ohlcv_frame
+
+
+class TestRetrainScheduler(unittest.TestCase):
+    def test_requests_coalesce_while_busy(self):
+        release = threading.Event()
+        started = threading.Event()
+        seen = []
+
+        def slow_retrain(snapshot):
+            seen.append(snapshot)
+            started.set()
+            release.wait(5)
+            return True
+
+        scheduler = RetrainScheduler(slow_retrain).start()
+        scheduler.request(1)
+        self.assertTrue(started.wait(5))
+        begin = time.perf_counter()
+        for snapshot in (2, 3, 4):
+            scheduler.request(snapshot)
+        self.assertLess(time.perf_counter() - begin, 0.5)
+        release.set()
+        self.assertTrue(scheduler.wait_idle(5))
+        scheduler.stop()
+
+        # 2 and 3 were stale by the time the worker was free
+        self.assertEqual(seen, [1, 4])
+        self.assertEqual((scheduler.submitted, scheduler.dropped, scheduler.completed), (4, 2, 2))
+
+    def test_failures_are_counted_and_worker_survives(self):
+        def flaky(snapshot):
+            if snapshot == 'bad':
+                raise RuntimeError("boom")
+            return True
+
+        scheduler = RetrainScheduler(flaky).start()
+        scheduler.request('bad')
+        self.assertTrue(scheduler.wait_idle(5))
+        scheduler.request('good')
+        self.assertTrue(scheduler.wait_idle(5))
+        scheduler.stop()
+        self.assertEqual((scheduler.failed, scheduler.completed), (1, 1))
+
+
+class SlowProvider(MockActionProvider):
+    def __init__(self, delay, successor=None):
+        super().__init__()
+        self.delay = delay
+        self.successor = successor
+
+    def train(self, prompt, log_path=None, experience=None):
+        super().train(prompt, log_path, experience)
+        time.sleep(self.delay)
+        return self.successor or True
+
+
+class RecordingProvider(SlowProvider):
+    # Records the experience each retrain got and its rewards before and after the loop moved on
+    def __init__(self, delay):
+        super().__init__(delay)
+        self.seen = []
+
+    def train(self, prompt, log_path=None, experience=None):
+        rewards = experience.rewards[:len(experience)].tolist()
+        super().train(prompt, log_path, experience)
+        self.seen.append((experience, rewards))
+        return True
+
+
+class TestRLTraderBackgroundRetrain(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = ohlcv_frame(np.arange(60) * 0.0001 + 1.1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_trader(self, provider, mode):
+        with patch.dict(os.environ, {'LOG_DIR': self.tmp.name, 'RETRAIN_MODE': mode}):
+            return RLTrader(action_provider=provider, data=self.data)
+
+    def test_training_loop_does_not_wait_for_retrain(self):
+        successor = MockActionProvider(actions=["HOLD"])
+        provider = SlowProvider(delay=1.0, successor=successor)
+        trader = self.make_trader(provider, 'async')
+        begin = time.perf_counter()
+        trader.run_trading(mode="offline", max_epochs=1)
+        elapsed = time.perf_counter() - begin
+        self.assertTrue(trader.retrain_scheduler.wait_idle(5))
+        trader.shutdown()
+
+        # 12 retrain points would take 12s inline; only the newest pending one survives each slow run
+        self.assertLess(elapsed, 1.0)
+        self.assertLess(len(provider.training_prompts), 12)
+        self.assertGreater(trader.retrain_scheduler.dropped, 0)
+        self.assertIs(trader.action_provider, successor)
+
+    def test_background_retrain_reads_a_snapshot(self):
+        provider = RecordingProvider(delay=0.05)
+        trader = self.make_trader(provider, 'async')
+        trader.run_trading(mode="offline", max_epochs=1)
+        self.assertTrue(trader.retrain_scheduler.wait_idle(5))
+        trader.shutdown()
+
+        self.assertTrue(provider.seen)
+        for experience, rewards in provider.seen:
+            self.assertIsNot(experience, trader.replay_buffer)
+            self.assertEqual(experience.rewards[:len(experience)].tolist(), rewards)
+
+    def test_inline_mode_retrains_every_fifth_episode(self):
+        provider = MockActionProvider()
+        trader = self.make_trader(provider, 'inline')
+        self.assertIsNone(trader.retrain_scheduler)
+        trader.run_trading(mode="offline", max_epochs=1)
+        self.assertEqual(len(provider.training_prompts), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
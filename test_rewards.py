@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from TheSSS.R1_V.rewards import RewardConfig, reward_for_action, vectorized_rewards, encode_actions
+from TheSSS.R1_V.action_provider import RuleActionProvider
+from TheSSS.R1_V.rl_trader import RLTrader
+from fixtures import ohlcv_frame, random_walk
+
+
+def write_history(path, bars=200, seed=3):
+    ohlcv_frame(random_walk(bars, seed=seed), spread=0.0003).to_csv(path)
+
+
+class TestRewards(unittest.TestCase):
+    def setUp(self):
+        self.config = RewardConfig()
+        rng = np.random.default_rng(11)
+        self.moves = rng.normal(0, 0.001, 500)
+        self.volatility = np.abs(rng.normal(0, 0.001, 500))
+        self.actions = rng.choice(["BUY", "SELL", "HOLD"], 500)
+
+    def test_config_from_env(self):
+        with patch.dict(os.environ, {'TRANSACTION_COST': '0.001', 'VOLATILITY_WINDOW': '20'}):
+            config = RewardConfig.from_env()
+        self.assertEqual(config.transaction_cost, 0.001)
+        self.assertEqual(config.volatility_window, 20)
+        with self.assertRaises(Exception):
+            config.risk_factor = 0.5
+
+    def test_vectorized_matches_scalar(self):
+        """Batch rewards equal the scalar reward for every bar"""
+        batch = vectorized_rewards(self.actions, self.moves, self.volatility, self.config)
+        expected = [reward_for_action(a, m, v, self.config)
+                    for a, m, v in zip(self.actions, self.moves, self.volatility)]
+        np.testing.assert_allclose(batch, expected, rtol=1e-12)
+
+    def test_policy_matrix(self):
+        """A policies x bars matrix is scored in one call"""
+        policies = np.stack([encode_actions(self.actions), -encode_actions(self.actions)])
+        batch = vectorized_rewards(policies, self.moves, self.volatility, self.config)
+        self.assertEqual(batch.shape, (2, 500))
+        np.testing.assert_allclose(batch[0], vectorized_rewards(self.actions, self.moves, self.volatility, self.config))
+
+
+class TestRLTraderRewards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        data_path = os.path.join(self.tmp.name, 'history.csv')
+        write_history(data_path)
+        env = {'LOG_DIR': self.tmp.name, 'HISTORICAL_DATA_PATH': data_path}
+        with patch.dict(os.environ, env):
+            self.trader = RLTrader(action_provider=RuleActionProvider())
+
+    def tearDown(self):
+        self.trader.shutdown()
+        self.tmp.cleanup()
+
+    def test_offline_epoch_matches_batch_rewards(self):
+        """An offline epoch accumulates exactly the vectorized score of the same actions"""
+        states = list(self.trader.market.iter_states())
+        actions = self.trader.get_actions(states)
+        expected = self.trader.batch_rewards(actions).sum()
+
+        self.trader.run_trading(mode="offline", max_epochs=1)
+        self.assertEqual(self.trader.episodes, len(states))
+        self.assertAlmostEqual(self.trader.total_reward, expected, places=6)
+
+    def test_streaming_epoch_matches_in_memory(self):
+        """Chunked streaming produces the same episode count and reward as the in-memory loop"""
+        with patch.dict(os.environ, {'LOG_DIR': self.tmp.name, 'HISTORICAL_DATA_PATH': self.trader.data_path}):
+            streaming = RLTrader(action_provider=RuleActionProvider(), chunk_size=37)
+        self.assertIsNone(streaming.market)
+
+        self.trader.run_trading(mode="offline", max_epochs=2)
+        streaming.run_trading(mode="offline", max_epochs=2)
+        self.assertEqual(streaming.episodes, self.trader.episodes)
+        self.assertAlmostEqual(streaming.total_reward, self.trader.total_reward, places=6)
+
+    def test_volatility_fallback_uses_the_given_bar(self):
+        """States without a volatility field are scored with the volatility of their own bar"""
+        market = self.trader.market
+        state = market.state(10)
+        del state['volatility']
+        self.assertEqual(self.trader.calculate_volatility(self.trader.reward_config.volatility_window, 10),
+                         market.column('volatility')[10])
+        reward = self.trader.calculate_reward("BUY", state, market.state(11), idx=10)
+        self.assertAlmostEqual(reward, self.trader.batch_rewards(["BUY"], start=10)[0], places=9)
+
+        self.trader.market = None
+        self.assertEqual(self.trader.calculate_volatility(14, 10), 0.0)
+        self.assertEqual(self.trader.calculate_volatility(14), 0.0)
+
+    def test_history_path_as_data(self):
+        """A path passed as data is loaded like HISTORICAL_DATA_PATH and train() counts episodes"""
+        with patch.dict(os.environ, {'LOG_DIR': self.tmp.name}):
+            trader = RLTrader(action_provider=RuleActionProvider(), data=self.trader.data_path)
+        self.assertEqual(trader.data_path, self.trader.data_path)
+        self.assertEqual(len(trader.market), len(self.trader.market))
+        trader.train(trader.market.state(0), trader.market.state(1), 0)
+        trader.train(trader.market.state(1))
+        self.assertEqual(trader.episodes, 2)
+        trader.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
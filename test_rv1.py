@@ -1,25 +1,40 @@
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
+from TheSSS.R1_V.action_provider import MockActionProvider
 from TheSSS.R1_V.rl_trader import RLTrader
-from unittest.mock import MagicMock
+
+DATA_PATH = "TheSSS/trading_backtrader_azure/data/historical_data.csv"
 
 class TestRV1(unittest.TestCase):
     def setUp(self):
-        self.mock_client = MagicMock()
-        self.trader = RLTrader(self.mock_client, "EURUSD", "M1", "TheSSS/trading-backtrader-azure/data/historical_data.csv")
-        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.provider = MockActionProvider()
+        with patch.dict(os.environ, {'LOG_DIR': self.tmp.name}):
+            self.trader = RLTrader(action_provider=self.provider, data=DATA_PATH, retrain_mode="inline")
+
+    def tearDown(self):
+        self.trader.shutdown()
+        self.tmp.cleanup()
+
     def test_initialization(self):
         """Test RLTrader initialization"""
         self.trader.initialize_trainer()
         self.assertIsNotNone(self.trader.training_start)
-        
+        self.assertEqual(len(self.trader.market), 20)
+
     def test_training(self):
         """Test training progression"""
         self.trader.initialize_trainer()
-        self.trader.run_trading()
-            
-        # Verify training completed
+        self.trader.run_trading(mode="offline", max_epochs=1)
+
+        # Every transition of the epoch was decided, scored and stored, and every fifth one retrained
         self.assertIsNotNone(self.trader.training_end)
-        self.assertGreater(self.trader.episodes, 0)
+        self.assertEqual(self.trader.episodes, len(self.trader.market))
+        self.assertEqual(len(self.trader.replay_buffer), self.trader.episodes)
+        self.assertEqual(len(self.provider.training_prompts), self.trader.episodes // 5)
+        self.assertTrue(self.provider.batches)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+from TheSSS.segment_store import SegmentStore, SymbolStore, TICK_FIELDS
+
+
+def make_bars(start, count):
+    index = pd.date_range(start, periods=count, freq='min', name='timestamp').as_unit('ns')
+    close = np.arange(count, dtype=np.float64) + 1.0
+    return pd.DataFrame({'open': close, 'high': close + 0.5, 'low': close - 0.5, 'close': close,
+                         'volume': np.full(count, 10.0)}, index=index)
+
+
+class TestSegmentStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'store')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_across_segments(self):
+        bars = make_bars('2024-01-01', 2500)
+        with SegmentStore(self.root, segment_rows=1000) as store:
+            self.assertEqual(store['EURUSD'].append_frame(bars), 2500)
+            self.assertEqual(store.symbols(), ['EURUSD'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, 'EURUSD'))),
+                         ['schema.json', 'seg-000000.dat', 'seg-000001.dat', 'seg-000002.dat'])
+
+        store = SegmentStore(self.root, writable=False)['EURUSD']
+        self.assertEqual(len(store), 2500)
+        pd.testing.assert_frame_equal(store.range(), bars, check_freq=False)
+        pd.testing.assert_frame_equal(store.tail(1200), bars.tail(1200), check_freq=False)
+        # Range bounds straddle segment boundaries; the end is exclusive
+        window = store.range(bars.index[990], bars.index[2010])
+        pd.testing.assert_frame_equal(window, bars.iloc[990:2010], check_freq=False)
+        self.assertEqual(len(store.range(bars.index[1000], bars.index[1000])), 0)
+        self.assertEqual(len(store.range(end=bars.index[0])), 0)
+        self.assertEqual(len(store.range(start='2030-01-01')), 0)
+
+    def test_overlapping_appends_are_skipped(self):
+        store = SegmentStore(self.root, segment_rows=100)['EURUSD']
+        bars = make_bars('2024-01-01', 300)
+        store.append_frame(bars.iloc[:200])
+        self.assertEqual(store.append_frame(bars.iloc[150:]), 100)
+        self.assertEqual(store.append_frame(bars.iloc[:10]), 0)
+        pd.testing.assert_frame_equal(store.range(), bars, check_freq=False)
+        with self.assertRaises(ValueError):
+            store.append_frame(bars.iloc[::-1])
+
+    def test_tick_records(self):
+        ticks = SymbolStore(os.path.join(self.root, 'XAUUSD'), fields=TICK_FIELDS, segment_rows=64)
+        times = (np.arange(100, dtype=np.int64) + 1_700_000_000_000) * 1_000_000
+        ticks.append(times, {'bid': np.arange(100.0), 'ask': np.arange(100.0) + 0.2, 'last': np.zeros(100),
+                             'volume': np.ones(100)})
+        reopened = SymbolStore(os.path.join(self.root, 'XAUUSD'), writable=False)
+        self.assertEqual(reopened.fields, TICK_FIELDS)
+        self.assertEqual(reopened.tail(2)['bid'].tolist(), [98.0, 99.0])
+        with self.assertRaises(PermissionError):
+            reopened.append(times[-1:] + 1, {name: [0.0] for name in TICK_FIELDS})
+
+    def test_reader_sees_only_committed_rows_while_writer_appends(self):
+        writer = SegmentStore(self.root, segment_rows=128)['EURUSD']
+        writer.append_frame(make_bars('2024-01-01', 1))
+        reader = SegmentStore(self.root, writable=False)['EURUSD']
+        bars = make_bars('2024-01-01', 5000)
+        done = threading.Event()
+        problems = []
+
+        def read():
+            while not done.is_set():
+                tail = reader.tail(50)
+                if not tail.index.is_monotonic_increasing or (tail['close'] <= 0).any():
+                    problems.append(tail)
+                if len(tail) and tail['close'].iloc[-1] != len(reader.range(end=tail.index[-1])) + 1:
+                    problems.append(tail)
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        for start in range(1, 5000, 37):
+            writer.append_frame(bars.iloc[start:start + 37])
+        done.set()
+        thread.join()
+        self.assertEqual(problems, [])
+        self.assertEqual(len(reader), 5000)
+        self.assertEqual(reader.tail(1)['close'].iloc[0], 5000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
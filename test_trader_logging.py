@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import unittest
+from logging.handlers import RotatingFileHandler
+from unittest.mock import patch
+import numpy as np
+from TheSSS.R1_V.action_provider import MockActionProvider
+from TheSSS.R1_V.rl_trader import RLTrader
+from TheSSS.R1_V.trader_logging import (
+    ImprovementWriter, LazyQueueHandler, StepSampler, configure_logger, shutdown_logger
+)
+from fixtures import FakeClock, ohlcv_frame
+
+
+class FormattedIn:
+    """Log argument that records which thread rendered it."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "arg"
+
+
+class TestTraderLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        shutdown_logger('TestLogger')
+        self.tmp.cleanup()
+
+    def test_async_mode_formats_off_the_calling_thread(self):
+        logger = configure_logger(self.tmp.name, name='TestLogger', filename='test.log', mode='async')
+        # Keep the record away from root handlers (e.g. a test runner's capture), which format inline
+        logger.propagate = False
+        arg = FormattedIn()
+        logger.info("value %s", arg)
+        shutdown_logger('TestLogger')
+        self.assertTrue(arg.threads)
+        self.assertNotIn(threading.current_thread().name, arg.threads)
+        with open(os.path.join(self.tmp.name, 'test.log')) as f:
+            self.assertIn("INFO - value arg", f.read())
+
+    def test_reconfigure_replaces_handlers(self):
+        for mode in ('async', 'sync', 'async'):
+            logger = configure_logger(self.tmp.name, name='TestLogger', filename='test.log', mode=mode)
+        ours = [h for h in logger.handlers if isinstance(h, (LazyQueueHandler, RotatingFileHandler))]
+        self.assertEqual(len(ours), 1)
+
+    def test_sampler_every_and_interval(self):
+        clock = FakeClock()
+        sampler = StepSampler(every=10, min_interval=1.0, clock=clock)
+        self.assertEqual([s for s in range(1, 31) if sampler.should_log(s)], [10])
+        clock.now = 1.5
+        self.assertTrue(sampler.should_log(40))
+
+    def test_improvement_writer_buffers_until_flush(self):
+        clock = FakeClock()
+        path = os.path.join(self.tmp.name, 'improvements.log')
+        writer = ImprovementWriter(path, flush_interval=5.0, clock=clock)
+        writer.write("first\n")
+        self.assertEqual(os.path.getsize(path), 0)
+        clock.now = 6.0
+        writer.write("second\n")
+        with open(path) as f:
+            self.assertEqual(f.read(), "first\nsecond\n")
+        writer.close()
+
+
+class TestRLTraderLogging(unittest.TestCase):
+    def rising_frame(self, bars=200):
+        return ohlcv_frame(1.1 + np.arange(bars) * 0.001)
+
+    def test_improvements_persist_and_steps_are_sampled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {'LOG_DIR': tmp, 'RETRAIN_MODE': 'inline', 'LOG_MODE': 'async', 'LOG_SAMPLE_EVERY': '50'}
+            with patch.dict(os.environ, env):
+                trader = RLTrader(action_provider=MockActionProvider(actions=["BUY"]), data=self.rising_frame())
+            sessions = trader.run_trading(mode="offline", max_epochs=1)
+            trader.shutdown()
+            shutdown_logger('RLTrader')
+            self.assertGreater(len(sessions[0]['improvements']), 0)
+            with open(os.path.join(tmp, 'improvements.log')) as f:
+                self.assertEqual(len(f.readlines()), len(sessions[0]['improvements']))
+            with open(os.path.join(tmp, 'rl_trader.log')) as f:
+                log = f.read()
+        self.assertEqual(log.count("=== Training Episode"), 4)
+        self.assertEqual(log.count("Reward calc:"), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
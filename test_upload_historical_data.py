@@ -0,0 +1,117 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from TheSSS.market_data import iter_ohlcv_chunks, load_ohlcv, read_cache, validate_ohlcv
+from TheSSS.R1_V.action_provider import RuleActionProvider
+from TheSSS.R1_V.rl_trader import RLTrader
+from TheSSS.segment_store import SegmentStore
+from upload_historical_data import process_and_upload_data, read_csv_tail
+from fixtures import ohlcv_frame
+
+
+def write_history(path, bars, bad_tail=0, trailing_newline=True):
+    df = ohlcv_frame(1.1 + np.arange(bars) * 1e-4, spread=2e-4, volume=np.full(bars, 5.0), freq='5min')
+    if bad_tail:
+        # Impossible bars at the end of the file must be replaced by earlier valid ones
+        df.iloc[-bad_tail:, df.columns.get_loc('high')] = 0.5
+    text = df.to_csv()
+    with open(path, 'w', newline='') as f:
+        f.write(text if trailing_newline else text.rstrip('\n'))
+    return df
+
+
+class TestUploadHistoricalData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, 'data')
+        os.makedirs(self.data_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def csv(self, symbol):
+        return os.path.join(self.data_dir, f"{symbol}_historical_data.csv")
+
+    def test_tail_read_matches_full_parse(self):
+        for trailing_newline in (True, False):
+            write_history(self.csv('EURUSD'), 500, trailing_newline=trailing_newline)
+            full = pd.read_csv(self.csv('EURUSD'), index_col=0, parse_dates=True)
+            for rows, block_size in ((1, 7), (100, 64), (499, 1 << 16), (1000, 333)):
+                tail, whole_file = read_csv_tail(self.csv('EURUSD'), rows, block_size=block_size)
+                pd.testing.assert_frame_equal(tail, full.tail(rows))
+                self.assertEqual(whole_file, rows >= 500)
+
+    def test_symbols_are_trimmed_validated_and_written(self):
+        frames = {'EURUSD': write_history(self.csv('EURUSD'), 3000), 'GBPUSD': write_history(self.csv('GBPUSD'), 200, bad_tail=5)}
+        config = os.path.join(self.tmp.name, 'mt5_config.json')
+        with open(config, 'w') as f:
+            json.dump({'symbols': ['EURUSD', 'GBPUSD', 'XAUUSD'], 'data_window': 100}, f)
+
+        output = os.path.join(self.tmp.name, 'processed')
+        report = process_and_upload_data(config, data_dir=self.data_dir, output_dir=output, max_workers=2)
+        report = report.set_index('symbol')
+        self.assertEqual(report.loc['EURUSD', 'rows'], 100)
+        self.assertEqual(report.loc['GBPUSD', 'rows'], 100)
+        self.assertIn('FileNotFoundError', report.loc['XAUUSD', 'error'])
+        self.assertTrue((report[['read_s', 'write_s', 'total_s']] >= 0).all().all())
+
+        for symbol, df in frames.items():
+            expected = validate_ohlcv(df).tail(100)
+            cached = read_cache(os.path.join(output, symbol))
+            np.testing.assert_allclose(cached['close'], expected['close'])
+            self.assertTrue((cached.index == expected.index).all())
+
+        store_dir = os.path.join(self.tmp.name, 'store')
+        process_and_upload_data(config, data_dir=self.data_dir, output_dir=store_dir, output_format='store')
+        # A second nightly run appends nothing new
+        process_and_upload_data(config, data_dir=self.data_dir, output_dir=store_dir, output_format='store')
+        with SegmentStore(store_dir, writable=False) as store:
+            self.assertEqual(store.symbols(), ['EURUSD', 'GBPUSD'])
+            np.testing.assert_allclose(store['GBPUSD'].range()['close'], validate_ohlcv(frames['GBPUSD']).tail(100)['close'])
+
+    def test_prepared_output_loads_as_history(self):
+        expected = validate_ohlcv(write_history(self.csv('EURUSD'), 400)).tail(150)
+        config = os.path.join(self.tmp.name, 'mt5_config.json')
+        with open(config, 'w') as f:
+            json.dump({'symbols': ['EURUSD'], 'data_window': 150}, f)
+
+        for output_format in ('cache', 'store'):
+            output = os.path.join(self.tmp.name, output_format)
+            process_and_upload_data(config, data_dir=self.data_dir, output_dir=output,
+                                    output_format=output_format, max_workers=1)
+            path = os.path.join(output, 'EURUSD')
+            loaded = load_ohlcv(path)
+            np.testing.assert_allclose(loaded['close'], expected['close'])
+            self.assertTrue((loaded.index == expected.index).all())
+            chunks = list(iter_ohlcv_chunks(path, chunksize=60))
+            self.assertEqual([len(chunk) for chunk in chunks], [60, 60, 30])
+
+            with patch.dict(os.environ, {'LOG_DIR': self.tmp.name}):
+                trader = RLTrader(action_provider=RuleActionProvider(), data=path)
+            self.assertEqual(len(trader.market), 150)
+            trader.shutdown()
+
+    def test_store_runs_leave_no_gap_when_the_csv_grows_past_the_window(self):
+        config = os.path.join(self.tmp.name, 'mt5_config.json')
+        with open(config, 'w') as f:
+            json.dump({'symbols': ['EURUSD'], 'data_window': 5}, f)
+        output = os.path.join(self.tmp.name, 'store')
+        write_history(self.csv('EURUSD'), 20)
+        process_and_upload_data(config, data_dir=self.data_dir, output_dir=output, output_format='store')
+        full = write_history(self.csv('EURUSD'), 28)
+        process_and_upload_data(config, data_dir=self.data_dir, output_dir=output, output_format='store')
+
+        with SegmentStore(output, writable=False) as store:
+            stored = store['EURUSD'].range()
+        self.assertTrue((stored.index == full.index[15:]).all())
+        loaded = load_ohlcv(os.path.join(output, 'EURUSD'))
+        self.assertTrue((loaded.index == full.index[-5:]).all())
+        np.testing.assert_allclose(loaded['close'], full['close'].iloc[-5:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import unittest
+import numpy as np
+import pandas as pd
+from TheSSS.market_data import load_ohlcv
+from TheSSS.trading_backtrader_azure.backtest import run_strategy
+from TheSSS.trading_backtrader_azure.strategies import SignalStrategy
+from TheSSS.trading_backtrader_azure.vector_backtest import (
+    screen_trade_signals, signals_to_positions, vector_backtest
+)
+from TheSSS.strategies.trading_strategy import generate_trade_signals
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'TheSSS', 'trading_backtrader_azure', 'data', 'historical_data.csv')
+
+
+class TestSignalsToPositions(unittest.TestCase):
+    def test_hold_modes(self):
+        signals = ["HOLD", "BUY", "HOLD", "SELL", "HOLD", "BUY"]
+        np.testing.assert_array_equal(signals_to_positions(signals), [0, 1, 1, -1, -1, 1])
+        np.testing.assert_array_equal(signals_to_positions(signals, hold='flat'), [0, 1, 0, -1, 0, 1])
+
+
+class TestVectorBacktest(unittest.TestCase):
+    def setUp(self):
+        self.data = load_ohlcv(DATA_FILE, index_col='date', use_cache=False)
+
+    def assert_matches_cerebro(self, positions, stake=1):
+        result = vector_backtest(self.data, positions, stake=stake)
+        reference = run_strategy(self.data, SignalStrategy, params={'positions': positions, 'stake': stake},
+                                 equity_curve=True)
+        self.assertAlmostEqual(result['final_value'], reference['final_value'], places=6)
+        self.assertAlmostEqual(result['max_drawdown'], reference['max_drawdown'], places=6)
+        self.assertEqual(result['trade_count'], reference['trade_count'])
+        np.testing.assert_allclose(result['equity'].to_numpy(), reference['equity'].to_numpy(), rtol=0, atol=1e-6)
+        return result
+
+    def test_trade_signals_match_cerebro(self):
+        signals = generate_trade_signals(self.data['high'], self.data['low'], self.data['close'],
+                                         sma_period=3, resistance_window=3, support_window=3, confirm_bars=1)
+        self.assertTrue((signals != "HOLD").any())
+        for hold in ('keep', 'flat'):
+            self.assert_matches_cerebro(signals_to_positions(signals, hold=hold), stake=100)
+
+    def test_random_positions_match_cerebro(self):
+        rng = np.random.default_rng(7)
+        for _ in range(3):
+            self.assert_matches_cerebro(rng.integers(-1, 2, len(self.data)).astype(float), stake=1000)
+
+    def test_trade_list(self):
+        positions = np.zeros(len(self.data))
+        positions[2:5] = 1
+        positions[5:8] = -1
+        positions[-3:] = 1
+        result = self.assert_matches_cerebro(positions, stake=10)
+        trades = result['trades']
+        open_ = self.data['open'].to_numpy()
+        self.assertEqual(list(trades['size']), [10, -10, 10])
+        self.assertAlmostEqual(trades['pnl'].iloc[0], (open_[6] - open_[3]) * 10)
+        self.assertEqual(trades['entry_time'].iloc[1], self.data.index[6])
+        # The last trade is still open when the data ends
+        self.assertTrue(pd.isna(trades['exit_price'].iloc[-1]))
+        self.assertAlmostEqual(trades['commission'].iloc[0], 10 * (open_[3] + open_[6]) * 0.001)
+
+    def test_screen_trade_signals(self):
+        result = screen_trade_signals(self.data, sma_period=3, resistance_window=3, support_window=3)
+        self.assertEqual(len(result['equity']), len(self.data))
+        self.assertEqual(result['equity'].iloc[0], 10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from TheSSS.R1_V.action_provider import RuleActionProvider
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.native_policy import NativeActionProvider, PPOConfig
+from TheSSS.R1_V.replay_buffer import STATE_FIELDS
+from TheSSS.R1_V.rewards import RewardConfig, vectorized_rewards, next_price_moves
+from TheSSS.R1_V.rl_trader import RLTrader
+from TheSSS.R1_V.vector_env import VectorEnv
+from fixtures import make_frame
+
+
+class TestVectorEnv(unittest.TestCase):
+    def setUp(self):
+        self.config = RewardConfig()
+        self.market = MarketArrays.from_frame(make_frame())
+
+    def test_rewards_match_whole_history_scoring(self):
+        env = VectorEnv(self.market, num_envs=5, episode_length=30, config=self.config, seed=1)
+        start = env.position.copy()
+        actions = np.array([1, -1, 0, 1, -1])
+        _, rewards, _ = env.step(actions)
+        close = self.market.column('close')
+        expected = vectorized_rewards(actions, next_price_moves(close)[start], self.market.column('volatility')[start],
+                                      self.config, self.market.spread)
+        np.testing.assert_allclose(rewards, expected)
+        np.testing.assert_array_equal(env.position, start + 1)
+
+    def test_observations_follow_state_fields(self):
+        env = VectorEnv(self.market, num_envs=3, seed=2)
+        obs = env.obs
+        self.assertEqual(obs.shape, (3, len(STATE_FIELDS)))
+        np.testing.assert_allclose(obs[:, STATE_FIELDS.index('price')], self.market.column('close')[env.position])
+
+    def test_episodes_reset_after_length(self):
+        env = VectorEnv(self.market, num_envs=4, episode_length=10, config=self.config, seed=3)
+        for step in range(10):
+            _, _, dones = env.step(np.zeros(4, dtype=np.int8))
+            self.assertEqual(dones.all(), step == 9)
+        self.assertEqual(len(env.finished), 4)
+        self.assertTrue(all(length == 10 for _, _, length in env.finished))
+        np.testing.assert_allclose([ret for _, ret, _ in env.finished], 10 * self.config.default_reward)
+        self.assertTrue((env.steps == 0).all())
+
+    def test_multiple_markets_stay_in_their_own_history(self):
+        other = MarketArrays.from_frame(make_frame(bars=40, seed=9))
+        env = VectorEnv([self.market, other], num_envs=6, config=self.config, seed=4)
+        for _ in range(200):
+            env.step(np.ones(6, dtype=np.int8))
+            second = env.market_ids == 1
+            self.assertTrue((env.position[second] >= len(self.market)).all())
+            self.assertTrue((env.position[~second] < len(self.market)).all())
+
+
+class TestRLTraderVectorized(unittest.TestCase):
+    def make_trader(self, provider, tmp):
+        with patch.dict(os.environ, {'LOG_DIR': tmp, 'RETRAIN_MODE': 'inline'}):
+            return RLTrader(action_provider=provider, data=make_frame(200))
+
+    def test_rollout_fills_replay_buffer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trader = self.make_trader(RuleActionProvider(), tmp)
+            finished = trader.run_vectorized(num_envs=8, steps=25, episode_length=20, seed=0)
+        self.assertEqual(len(trader.replay_buffer), 200)
+        self.assertEqual(trader.episodes, 200)
+        self.assertEqual(len(finished), 8)
+        self.assertAlmostEqual(trader.total_reward, trader.replay_buffer.rewards[:200].sum())
+
+    def test_native_policy_trains_from_arrays(self):
+        provider = NativeActionProvider(config=PPOConfig(hidden_size=4), path='', seed=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            trader = self.make_trader(provider, tmp)
+            trader.run_vectorized(num_envs=16, steps=10, seed=0)
+        self.assertIsNot(trader.action_provider, provider)
+        self.assertTrue(np.isfinite(trader.action_provider.policy.params['W2']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
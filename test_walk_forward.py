@@ -0,0 +1,59 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from TheSSS.R1_V.action_provider import RuleActionProvider, rule_based_action
+from TheSSS.R1_V.features import add_indicator_columns
+from TheSSS.R1_V.market_arrays import MarketArrays
+from TheSSS.R1_V.rewards import RewardConfig, vectorized_rewards, next_price_moves
+from TheSSS.R1_V.walk_forward import _run_window, walk_forward, walk_forward_windows
+from fixtures import ohlcv_frame, random_walk
+
+
+class TestWalkForward(unittest.TestCase):
+    def setUp(self):
+        self.data = ohlcv_frame(random_walk(400, seed=21), spread=0.0003)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_windows(self):
+        self.assertEqual(walk_forward_windows(100, 50, 20), [(0, 50, 70), (20, 70, 90)])
+        self.assertEqual(walk_forward_windows(100, 50, 20, step=10, anchored=True)[-1], (0, 80, 100))
+        self.assertEqual(walk_forward_windows(60, 50, 20), [])
+
+    def test_out_of_sample_scores(self):
+        """Each test window is scored on bars the window never trained on"""
+        with patch.dict(os.environ, {'LOG_DIR': self.tmp.name}):
+            results, report = walk_forward(self.data, train_size=200, test_size=50,
+                                           provider_factory=RuleActionProvider, max_workers=2)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(report['test_bars'], 200)
+
+        featured = add_indicator_columns(self.data)
+        for _, row in results.iterrows():
+            self.assertLess(featured.index.get_loc(row['train_start']) + 200,
+                            featured.index.get_loc(row['test_start']) + 1)
+            test = featured.loc[row['test_start']:row['test_end']]
+            market = MarketArrays.from_frame(test)
+            actions = [rule_based_action(s) for s in market.iter_states()]
+            expected = vectorized_rewards(actions, next_price_moves(test['close']), test['volatility'],
+                                          RewardConfig(), market.spread).sum()
+            self.assertAlmostEqual(row['test_reward'], expected, places=6)
+        self.assertAlmostEqual(report['test_reward'], results['test_reward'].sum())
+
+    def test_window_trader_retrains_inline_and_shuts_down(self):
+        featured = add_indicator_columns(self.data)
+        env = {'LOG_DIR': self.tmp.name, 'RETRAIN_MODE': 'async', 'REPLAY_BUFFER_PATH': os.path.join(self.tmp.name, 'rb')}
+        before = set(threading.enumerate())
+        with patch.dict(os.environ, env):
+            row = _run_window(0, featured.iloc[:200], featured.iloc[200:250], RuleActionProvider, 1)
+        self.assertEqual(row['test_bars'], 50)
+        self.assertFalse([t for t in set(threading.enumerate()) - before if t.name == 'rl-retrain'])
+        self.assertFalse(os.path.exists(env['REPLAY_BUFFER_PATH']))
+
+
+if __name__ == "__main__":
+    unittest.main()
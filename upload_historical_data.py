@@ -1,7 +1,13 @@
+import io
 import os
 import json
+import time
 import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+from TheSSS.market_data import OHLCV_COLUMNS, mark_prepared, validate_ohlcv, write_cache
+from TheSSS.segment_store import SegmentStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,28 +17,139 @@ def load_config(config_path="config/mt5_config.json"):
         config = json.load(file)
     return config
 
-def process_and_upload_data():
-    config = load_config()
+def read_csv_tail(path, rows, block_size=1 << 16):
+    """
+    Parse only the header and the last `rows` lines of a CSV by reading
+    blocks backwards from the end of the file. Returns (frame, whole_file)
+    where whole_file tells whether the frame holds every row of the file.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        position = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+        # rows + 1 newlines guarantee `rows` complete lines after the partial first one is cut
+        while position > data_start and newlines <= rows:
+            size = min(block_size, position - data_start)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+    tail = b''.join(reversed(blocks))
+    if position > data_start:
+        tail = tail[tail.index(b'\n') + 1:]
+    df = pd.read_csv(io.BytesIO(header + tail), index_col=0, parse_dates=True,
+                     dtype={col: 'float64' for col in OHLCV_COLUMNS})
+    return df.tail(rows), position <= data_start and len(df) <= rows
+
+def read_validated_tail(path, rows, since=None):
+    """
+    The last `rows` valid bars of a CSV and the number of rows parsed. With
+    `since` (a Timestamp) every valid bar after it is returned too, however
+    many there are, so an incremental append leaves no gap.
+    """
+    # Re-read a longer tail while it is short of `rows` valid bars or does not reach back to `since`
+    wanted = rows
+    while True:
+        raw, whole_file = read_csv_tail(path, wanted)
+        df = validate_ohlcv(raw)
+        if since is not None and df.index.tz is not None and since.tz is None:
+            # Store times are naive UTC
+            since = since.tz_localize('UTC')
+        covered = since is None or (len(df) and df.index[0] <= since)
+        if (len(df) >= rows and covered) or whole_file:
+            if since is not None:
+                rows = max(rows, int((df.index > since).sum()))
+            return df.tail(rows), len(raw)
+        wanted *= 2
+
+def _process_symbol(symbol, file_path, data_window, output_dir, output_format):
+    # Runs in a worker process: read the trailing window, validate it and write it in binary form
+    timings = {'symbol': symbol, 'rows_read': 0, 'rows': 0, 'read_s': 0.0, 'write_s': 0.0, 'total_s': 0.0, 'error': None}
+    started = time.perf_counter()
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Data file for {symbol} not found at {file_path}")
+        if output_format == 'store':
+            with SegmentStore(output_dir) as store:
+                symbol_store = store[symbol]
+                last_time = symbol_store.last_time
+                since = None if last_time is None else pd.Timestamp(last_time)
+                # Everything after the stored bars, so a file that grew by more than the window leaves no gap
+                df, timings['rows_read'] = read_validated_tail(file_path, data_window, since=since)
+                timings['read_s'] = time.perf_counter() - started
+                written = time.perf_counter()
+                symbol_store.append_frame(df)
+            mark_prepared(os.path.join(output_dir, symbol), data_window)
+        else:
+            df, timings['rows_read'] = read_validated_tail(file_path, data_window)
+            timings['read_s'] = time.perf_counter() - started
+            written = time.perf_counter()
+            write_cache(df, os.path.join(output_dir, symbol),
+                        key={'source': os.path.abspath(file_path), 'data_window': data_window})
+        timings['rows'] = len(df)
+        timings['write_s'] = time.perf_counter() - written
+        timings['stats'] = df.describe()
+    except Exception as e:
+        timings['error'] = f"{type(e).__name__}: {e}"
+    timings['total_s'] = time.perf_counter() - started
+    return timings
+
+def process_and_upload_data(config_path="config/mt5_config.json", data_dir="data", output_dir="data/processed",
+                            output_format='cache', max_workers=None):
+    """
+    Prepare the trailing `data_window` bars of every configured symbol in a
+    process pool. Each worker reads only the end of its CSV, validates it
+    and writes it to `<output_dir>/<symbol>` with write_cache, or appends
+    every bar newer than the stored ones to a SegmentStore symbol. Either one
+    loads (trimmed to `data_window` bars) with load_ohlcv on that directory,
+    so it can be used as HISTORICAL_DATA_PATH. Returns the per-symbol timing report.
+    """
+    config = load_config(config_path)
     symbols = config.get("symbols", [])
     data_window = config.get("data_window", 1000)
-    
-    for symbol in symbols:
-        file_path = os.path.join("data", f"{symbol}_historical_data.csv")
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path, index_col=0)
-            logger.info("Loaded %s data with %d rows", symbol, len(df))
-            # Trim the data to the latest data_window entries if necessary
-            if len(df) > data_window:
-                df = df.tail(data_window)
-                logger.info("Trimmed %s data to latest %d rows", symbol, data_window)
-            # Print summary statistics
-            logger.info("%s data statistics:\n%s", symbol, df.describe())
-            # If needed, you can upload this data into your simulation or training modules here.
+    if not symbols:
+        logger.warning("No symbols configured in %s", config_path)
+        return pd.DataFrame()
+
+    started = time.perf_counter()
+    max_workers = min(max_workers or os.cpu_count() or 1, len(symbols))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_process_symbol, symbol, os.path.join(data_dir, f"{symbol}_historical_data.csv"),
+                        data_window, output_dir, output_format)
+            for symbol in symbols
+        ]
+        rows = [future.result() for future in futures]
+
+    for row in rows:
+        stats = row.pop('stats', None)
+        if row['error']:
+            logger.warning("%s: %s", row['symbol'], row['error'])
         else:
-            logger.warning("Data file for %s not found at %s", symbol, file_path)
+            logger.info("Prepared %s: %d of %d trailing rows valid", row['symbol'], row['rows'], row['rows_read'])
+            logger.info("%s data statistics:\n%s", row['symbol'], stats)
+    report = pd.DataFrame(rows)
+    logger.info("Processed %d symbols with %d workers in %.2fs", len(symbols), max_workers,
+                time.perf_counter() - started)
+    return report
 
 def main():
-    process_and_upload_data()
+    parser = argparse.ArgumentParser(description="Trim, validate and store the latest history of every symbol")
+    parser.add_argument('--config', default="config/mt5_config.json")
+    parser.add_argument('--data-dir', default="data")
+    parser.add_argument('--output-dir', default="data/processed")
+    parser.add_argument('--format', choices=('cache', 'store'), default='cache',
+                        help="per-symbol .npy cache directories, or a SegmentStore")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    report = process_and_upload_data(args.config, data_dir=args.data_dir, output_dir=args.output_dir,
+                                     output_format=args.format, max_workers=args.workers)
+    if len(report):
+        print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()